@@ -1,13 +1,58 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 from app.models import User, UserRole
-from app.utils.security import verify_token
+from app.utils.security import decode_token
+from app.utils.cache import user_cache
 from typing import Optional
+import os
+from dotenv import load_dotenv
+
+# Cargar variables de entorno
+load_dotenv()
+
+# Modo de autenticación:
+# - "claims": el usuario se arma con los claims del token verificado y la versión
+#   del token se valida contra el cache de usuarios (sin consultar la base por pedido)
+# - "database": se busca el usuario en la base en cada pedido
+AUTH_MODE = os.getenv("AUTH_MODE", "claims").lower()
 
 # Configurar el esquema de autenticación Bearer
 security = HTTPBearer()
+# Variante que no rechaza el pedido si no hay token (endpoints públicos)
+optional_security = HTTPBearer(auto_error=False)
+
+class Principal:
+    """
+    Usuario autenticado, tal como lo describen los claims del token.
+    Alcanza para los controles de rol; los endpoints que necesitan el
+    usuario completo usan get_current_user.
+    """
+    
+    def __init__(self, id: int, email: str, rol: UserRole, token_version: int = 0):
+        self.id = id
+        self.email = email
+        self.rol = rol
+        self.token_version = token_version
+    
+    @classmethod
+    def from_claims(cls, payload: dict) -> Optional["Principal"]:
+        """Construir el principal a partir del payload del JWT (None si faltan claims)"""
+        try:
+            return cls(
+                id=int(payload["user_id"]),
+                email=payload["sub"],
+                rol=UserRole(payload["role"]),
+                token_version=int(payload.get("tv", 0))
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+    
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(id=user.id, email=user.email, rol=user.rol, token_version=user.token_version)
 
 class AuthService:
     """Servicio para manejar autenticación y autorización"""
@@ -28,37 +73,86 @@ class AuthService:
     def get_user_by_email(db: Session, email: str) -> Optional[User]:
         """Obtener usuario por email"""
         return db.query(User).filter(User.email == email).first()
+    
+    @staticmethod
+    def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
+        """Obtener usuario por ID"""
+        return db.query(User).filter(User.id == user_id).first()
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """Obtener el usuario actual desde el token JWT"""
+async def get_cached_user(db: AsyncSession, user_id: int) -> Optional[User]:
+    """
+    Obtener un usuario por ID pasando por el cache de usuarios.
+    Los usuarios cacheados se separan de la sesión: son de solo lectura.
+    """
+    user = user_cache.get(user_id)
+    if user is None:
+        user = await db.run_sync(AuthService.get_user_by_id, user_id)
+        if user is not None:
+            db.expunge(user)
+            user_cache.set(user)
+        # Terminar la transacción de lectura: la conexión vuelve al pool antes
+        # de que corra el handler, que puede usar la misma sesión para escribir
+        await db.commit()
+    return user
+
+async def authenticate_token(db: AsyncSession, token: str) -> Optional[Principal]:
+    """Validar el token y obtener el principal (None si el token no es válido o fue revocado)"""
+    payload = decode_token(token)
+    if payload is None or payload.get("sub") is None:
+        return None
     
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="No se pudo validar las credenciales",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+    if AUTH_MODE == "database":
+        user = await db.run_sync(AuthService.get_user_by_email, payload["sub"])
+        # Liberar la conexión antes del handler (ver get_cached_user)
+        await db.commit()
+        if user is None or user.token_version != int(payload.get("tv", 0)):
+            return None
+        return Principal.from_user(user)
     
-    # Verificar el token
-    email = verify_token(credentials.credentials)
-    if email is None:
-        raise credentials_exception
+    principal = Principal.from_claims(payload)
+    if principal is None:
+        return None
     
-    # Buscar el usuario en la base de datos
-    user = AuthService.get_user_by_email(db, email=email)
+    # Los tokens emitidos antes de un cambio de rol o contraseña quedan revocados
+    user = await get_cached_user(db, principal.id)
+    if user is None or user.token_version != principal.token_version:
+        return None
+    return principal
+
+async def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    """Obtener el principal actual desde el token JWT"""
+    principal = await authenticate_token(db, credentials.credentials)
+    if principal is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="No se pudo validar las credenciales",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return principal
+
+async def get_current_user(
+    principal: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """Obtener el usuario completo actual (desde el cache de usuarios)"""
+    user = await get_cached_user(db, principal.id)
     if user is None:
-        raise credentials_exception
-    
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="No se pudo validar las credenciales",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
 
-def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+def get_current_active_user(current_user: Principal = Depends(get_current_principal)) -> Principal:
     """Obtener usuario activo (puedes agregar más validaciones aquí)"""
     # Aquí podrías agregar validaciones adicionales como usuario activo/bloqueado
     return current_user
 
-def require_admin(current_user: User = Depends(get_current_active_user)) -> User:
+def require_admin(current_user: Principal = Depends(get_current_active_user)) -> Principal:
     """Requerir que el usuario sea administrador"""
     if current_user.rol != UserRole.ADMINISTRADOR:
         raise HTTPException(
@@ -67,25 +161,20 @@ def require_admin(current_user: User = Depends(get_current_active_user)) -> User
         )
     return current_user
 
-def require_auth(current_user: User = Depends(get_current_active_user)) -> User:
+def require_auth(current_user: Principal = Depends(get_current_active_user)) -> Principal:
     """Requerir autenticación (alias para get_current_active_user)"""
     return current_user
 
 # Dependencias opcionales para cuando el usuario puede estar o no autenticado
-def get_current_user_optional(
-    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    db: Session = Depends(get_db)
-) -> Optional[User]:
+async def get_current_user_optional(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    db: AsyncSession = Depends(get_async_db)
+) -> Optional[Principal]:
     """Obtener usuario actual (opcional - puede ser None)"""
     if not credentials:
         return None
     
     try:
-        email = verify_token(credentials.credentials)
-        if email is None:
-            return None
-        
-        user = AuthService.get_user_by_email(db, email=email)
-        return user
+        return await authenticate_token(db, credentials.credentials)
     except Exception:
-        return None
\ No newline at end of file
+        return None
@@ -1,7 +1,11 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 import os
+from typing import Any, Dict
 from dotenv import load_dotenv
 
 # Cargar variables de entorno
@@ -10,19 +14,132 @@ load_dotenv()
 # URL de la base de datos desde el archivo .env
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./eventos.db")
 
+def env_flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+# Perfil de SQLite: PRAGMAs aplicados a cada conexión nueva (vacío = no se aplica)
+SQLITE_PRAGMAS = {
+    # WAL: los lectores no se bloquean mientras hay un escritor
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    # NORMAL es seguro con WAL y evita un fsync por commit
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    # Milisegundos que se espera un lock antes de fallar con "database is locked"
+    "busy_timeout": os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"),
+    # Negativo = KiB de cache de páginas por conexión
+    "cache_size": os.getenv("SQLITE_CACHE_SIZE", "-64000"),
+    "mmap_size": os.getenv("SQLITE_MMAP_SIZE", "268435456"),
+    "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+    "foreign_keys": "ON" if env_flag("SQLITE_FOREIGN_KEYS", "True") else "OFF",
+}
+
+# Manejo de transacciones en SQLite:
+# - "driver": el de pysqlite/aiosqlite (BEGIN implícito solo antes de INSERT/UPDATE/DELETE)
+# - "deferred" / "immediate": se desactiva el BEGIN del driver y SQLAlchemy emite
+#   BEGIN DEFERRED/IMMEDIATE al iniciar cada transacción; necesario para que los
+#   SAVEPOINT y el DDL transaccional funcionen correctamente
+SQLITE_TRANSACTION_MODE = os.getenv("SQLITE_TRANSACTION_MODE", "driver").lower()
+
+# Pool de conexiones (SQLite en archivo y motores de servidor)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Solo motores de servidor: reciclar conexiones viejas y verificarlas antes de usarlas
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = env_flag("DB_POOL_PRE_PING", "True")
+
+def is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+def is_memory_database(url: str) -> bool:
+    return is_sqlite(url) and make_url(url).database in (None, "", ":memory:")
+
+def build_engine_options(url: str, use_async: bool = False) -> Dict[str, Any]:
+    """Opciones de create_engine según el motor (pool y argumentos de conexión)"""
+    if is_sqlite(url):
+        options: Dict[str, Any] = {"connect_args": {"check_same_thread": False}}
+        # Las bases en memoria usan un pool propio de una sola conexión
+        if not is_memory_database(url):
+            if use_async:
+                # aiosqlite abre una conexión por sesión si no se indica el pool;
+                # reutilizarlas evita repetir la conexión y los PRAGMAs en cada pedido
+                options["poolclass"] = AsyncAdaptedQueuePool
+            options.update(
+                pool_size=DB_POOL_SIZE,
+                max_overflow=DB_MAX_OVERFLOW,
+                pool_timeout=DB_POOL_TIMEOUT,
+            )
+        return options
+    
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+def configure_sqlite(sync_engine: Engine, transaction_mode: str = SQLITE_TRANSACTION_MODE) -> None:
+    """Registrar los eventos que aplican el perfil de SQLite a cada conexión"""
+    
+    @event.listens_for(sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        if transaction_mode != "driver":
+            # Desactivar el BEGIN implícito del driver (lo emite el evento "begin")
+            dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma, value in SQLITE_PRAGMAS.items():
+            if value:
+                cursor.execute(f"PRAGMA {pragma} = {value}")
+        cursor.close()
+    
+    if transaction_mode != "driver":
+        @event.listens_for(sync_engine, "begin")
+        def do_begin(conn):
+            conn.exec_driver_sql(f"BEGIN {transaction_mode.upper()}")
+
 # Crear el motor de la base de datos
-engine = create_engine(
-    DATABASE_URL, 
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
-)
+engine = create_engine(DATABASE_URL, **build_engine_options(DATABASE_URL))
+if is_sqlite(DATABASE_URL):
+    configure_sqlite(engine)
 
 # Crear la clase de sesión
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Drivers asíncronos para cada motor (aiosqlite en local, asyncpg en servidor)
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+def get_async_database_url(url: str) -> str:
+    """Convertir la URL sincrónica en la equivalente con driver asíncrono"""
+    scheme, separator, rest = url.partition("://")
+    dialect = scheme.split("+")[0]
+    if dialect not in ASYNC_DRIVERS:
+        raise ValueError(f"No hay driver asíncrono configurado para '{dialect}'")
+    return f"{ASYNC_DRIVERS[dialect]}{separator}{rest}"
+
+# URL asíncrona: se puede definir explícitamente o se deriva de DATABASE_URL
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or get_async_database_url(DATABASE_URL)
+
+# Motor asíncrono para los endpoints (no bloquea el event loop mientras espera a la base)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, **build_engine_options(ASYNC_DATABASE_URL, use_async=True)
+)
+if is_sqlite(ASYNC_DATABASE_URL):
+    configure_sqlite(async_engine.sync_engine)
+
+# Sesiones asíncronas; expire_on_commit=False para poder leer los objetos
+# después del commit sin volver a consultar la base
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 # Crear la clase base para los modelos
 Base = declarative_base()
 
-# Función para obtener la sesión de base de datos
+# Función para obtener la sesión de base de datos (scripts y tareas sincrónicas)
 def get_db():
     db = SessionLocal()
     try:
@@ -30,6 +147,25 @@ def get_db():
     finally:
         db.close()
 
-# Función para crear todas las tablas
-def create_tables():
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+# Función para obtener la sesión asíncrona de base de datos (endpoints)
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def describe_database() -> Dict[str, Any]:
+    """Configuración efectiva de la base (para informarla al iniciar la aplicación)"""
+    description: Dict[str, Any] = {
+        "url": make_url(DATABASE_URL).render_as_string(hide_password=True),
+        "async_url": make_url(ASYNC_DATABASE_URL).render_as_string(hide_password=True),
+        "pool": engine.pool.status(),
+    }
+    if is_sqlite(DATABASE_URL):
+        # Leer los PRAGMAs desde una conexión real para confirmar que se aplicaron
+        with engine.connect() as conn:
+            description["pragmas"] = {
+                pragma: conn.exec_driver_sql(f"PRAGMA {pragma}").scalar()
+                for pragma in SQLITE_PRAGMAS
+            }
+        description["transaction_mode"] = SQLITE_TRANSACTION_MODE
+    return description
+
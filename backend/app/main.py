@@ -1,21 +1,36 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import create_tables, engine
-from app.models import Base
+from app.database import engine, async_engine, describe_database
+from app.migrations import run_migrations
+from app.utils.password_hashing import password_hasher
+from app.services.inscription_writer import inscription_writer
+from app.services.stats_service import stats_reconciler
+from app.services.category_registry import category_registry
+from app.utils.sql_profiling import SQL_PROFILING, SqlProfilingMiddleware, instrument_engine
+from app.utils.metrics import METRICS_ENABLED, MetricsMiddleware, metrics
+from app.utils.cache import response_cache, user_cache
+from app.utils.serialization import DefaultJSONResponse
+from sqlalchemy.pool import QueuePool
 import os
+import logging
 from dotenv import load_dotenv
 
 # Cargar variables de entorno
 load_dotenv()
 
-# Crear las tablas en la base de datos
-Base.metadata.create_all(bind=engine)
+# Logger de uvicorn para que los mensajes de inicio aparezcan junto a los del servidor
+logger = logging.getLogger("uvicorn.error")
+
+# Aplicar las migraciones pendientes del esquema (tablas, índices y búsqueda)
+run_migrations(engine)
 
 # Crear la aplicación FastAPI
 app = FastAPI(
     title=os.getenv("APP_NAME", "Sistema de Gestión de Eventos"),
     version=os.getenv("VERSION", "1.0.0"),
-    description="API REST para gestión de eventos con autenticación JWT"
+    description="API REST para gestión de eventos con autenticación JWT",
+    # orjson cuando está instalado (ver app/utils/serialization.py)
+    default_response_class=DefaultJSONResponse
 )
 
 # Configurar CORS
@@ -27,8 +42,48 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Medición de consultas SQL por pedido (Server-Timing y detección de N+1)
+if SQL_PROFILING:
+    instrument_engine(engine)
+    instrument_engine(async_engine.sync_engine)
+    app.add_middleware(SqlProfilingMiddleware)
+
+def collect_runtime_metrics() -> dict:
+    """Valores actuales de los componentes que llevan sus propios contadores"""
+    cache = response_cache.stats()
+    hasher = password_hasher.stats()
+    writer = inscription_writer.stats()
+    values = {
+        "cache_hits_total": cache["hits"],
+        "cache_misses_total": cache["misses"],
+        "cache_entries": cache["entries"],
+        "user_cache_hits_total": user_cache.hits,
+        "user_cache_misses_total": user_cache.misses,
+        "password_hash_pending": hasher["pending"],
+        "password_hash_capacity": hasher["capacity"],
+        "password_hash_rejected_total": hasher["rejected"],
+        "inscription_writer_queue_depth": writer["queued"],
+        "inscription_writer_batches_total": writer["batches"],
+        "category_registry_loads_total": category_registry.loads,
+    }
+    pool = async_engine.sync_engine.pool
+    if isinstance(pool, QueuePool):
+        values.update(
+            db_pool_checked_out=pool.checkedout(),
+            db_pool_overflow=max(0, pool.overflow()),
+            db_pool_size=pool.size(),
+        )
+    return values
+
+# Métricas de Prometheus por ruta, pool, caches, bcrypt e inscripciones (/metrics)
+if METRICS_ENABLED:
+    metrics.instrument_engine(async_engine.sync_engine)
+    metrics.register_collector(collect_runtime_metrics)
+    app.add_middleware(MetricsMiddleware, registry=metrics)
+
 # Importar y registrar los routers
-from app.routers import auth, users, events, categories, inscriptions, dashboard
+from app.routers import auth, users, categories, inscriptions
+from app.routers import event as events
 
 app.include_router(
     auth.router,
@@ -60,11 +115,52 @@ app.include_router(
     tags=["Inscripciones"]
 )
 
-app.include_router(
-    dashboard.router,
-    prefix="/dashboard",
-    tags=["Dashboard"]
-)
+@app.on_event("startup")
+def report_database_profile():
+    """Informar la configuración efectiva de la base (pool y PRAGMAs de SQLite)"""
+    logger.info("Base de datos: %s", describe_database())
+
+@app.on_event("startup")
+async def start_inscription_writer():
+    """Iniciar el escritor de inscripciones con group commit (si está activado)"""
+    await inscription_writer.start()
+
+@app.on_event("startup")
+async def start_stats_reconciler():
+    """Iniciar la reconciliación periódica de las estadísticas del dashboard"""
+    stats_reconciler.start()
+
+@app.on_event("startup")
+async def start_metrics():
+    """Iniciar el volcado periódico de métricas cuando hay varios workers"""
+    if METRICS_ENABLED:
+        metrics.start()
+
+@app.on_event("shutdown")
+async def stop_inscription_writer():
+    """Confirmar las inscripciones que quedan en cola antes de cerrar las conexiones"""
+    await inscription_writer.stop()
+
+@app.on_event("shutdown")
+async def stop_stats_reconciler():
+    await stats_reconciler.stop()
+
+@app.on_event("shutdown")
+def shutdown_password_hasher():
+    """Esperar los hashes en curso y liberar el pool de bcrypt"""
+    password_hasher.shutdown()
+
+@app.on_event("shutdown")
+async def close_database_connections():
+    """Cerrar las conexiones del pool (las de aiosqlite mantienen un hilo abierto cada una)"""
+    await async_engine.dispose()
+    engine.dispose()
+
+@app.on_event("shutdown")
+def stop_metrics():
+    """Dejar escritas las métricas finales del proceso"""
+    if METRICS_ENABLED:
+        metrics.stop()
 
 @app.get("/")
 async def root():
@@ -81,6 +177,12 @@ async def health_check():
     """Endpoint para verificar el estado de la API"""
     return {"status": "healthy", "message": "API funcionando correctamente"}
 
+if METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics_endpoint():
+        """Métricas en formato de texto de Prometheus"""
+        return Response(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # Manejo de errores globales
 @app.exception_handler(404)
 async def not_found_handler(request, exc):
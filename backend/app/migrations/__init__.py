@@ -0,0 +1,7 @@
+from .runner import run_migrations, get_pending_migrations, discover_migrations
+
+__all__ = [
+    "run_migrations",
+    "get_pending_migrations",
+    "discover_migrations"
+]
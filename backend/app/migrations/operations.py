@@ -0,0 +1,18 @@
+from typing import Sequence
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+# Operaciones idempotentes para escribir migraciones
+
+def add_column(conn: Connection, table: str, column: str, ddl: str) -> bool:
+    """Agregar una columna si no existe. Devuelve True si la agregó."""
+    existing_columns = {col["name"] for col in inspect(conn).get_columns(table)}
+    if column in existing_columns:
+        return False
+    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+    return True
+
+def create_index(conn: Connection, name: str, table: str, columns: Sequence[str], unique: bool = False) -> None:
+    """Crear un índice si no existe"""
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    conn.execute(text(f"CREATE {kind} IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"))
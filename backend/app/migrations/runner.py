@@ -0,0 +1,92 @@
+import importlib
+import logging
+import pkgutil
+from datetime import datetime
+from typing import Callable, List, Set
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+
+logger = logging.getLogger(__name__)
+
+# Tabla donde se registran las migraciones aplicadas
+MIGRATIONS_TABLE = "schema_migrations"
+
+# Paquete con las migraciones: módulos `vNNNN_descripcion.py` con una función upgrade(conn)
+VERSIONS_PACKAGE = "app.migrations.versions"
+
+class Migration:
+    """Una migración numerada del esquema"""
+    
+    def __init__(self, version: int, name: str, upgrade: Callable[[Connection], None]):
+        self.version = version
+        self.name = name
+        self.upgrade = upgrade
+    
+    def __repr__(self) -> str:
+        return f"{self.version:04d}_{self.name}"
+
+def discover_migrations() -> List[Migration]:
+    """Cargar las migraciones del paquete de versiones, ordenadas por número"""
+    package = importlib.import_module(VERSIONS_PACKAGE)
+    migrations = []
+    for module_info in pkgutil.iter_modules(package.__path__):
+        prefix, _, name = module_info.name.partition("_")
+        if not (prefix.startswith("v") and prefix[1:].isdigit()):
+            continue
+        module = importlib.import_module(f"{VERSIONS_PACKAGE}.{module_info.name}")
+        migrations.append(Migration(int(prefix[1:]), name, module.upgrade))
+    
+    migrations.sort(key=lambda migration: migration.version)
+    versions = [migration.version for migration in migrations]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError(f"Hay migraciones con el mismo número: {versions}")
+    return migrations
+
+def _ensure_migrations_table(engine: Engine) -> None:
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} ("
+            "version INTEGER PRIMARY KEY, "
+            "nombre VARCHAR(200) NOT NULL, "
+            "aplicada_en TIMESTAMP NOT NULL)"
+        ))
+
+def _applied_versions(engine: Engine) -> Set[int]:
+    with engine.connect() as conn:
+        return {row[0] for row in conn.execute(text(f"SELECT version FROM {MIGRATIONS_TABLE}"))}
+
+def get_pending_migrations(engine: Engine) -> List[Migration]:
+    """Migraciones que todavía no se aplicaron en la base"""
+    _ensure_migrations_table(engine)
+    applied = _applied_versions(engine)
+    return [migration for migration in discover_migrations() if migration.version not in applied]
+
+def run_migrations(engine: Engine) -> List[Migration]:
+    """
+    Aplicar en orden las migraciones pendientes, cada una en su propia transacción.
+    Las migraciones deben ser idempotentes (IF NOT EXISTS, verificar columnas),
+    porque las bases creadas antes de este mecanismo ya tienen parte del esquema.
+    Devuelve las migraciones aplicadas.
+    """
+    applied = []
+    for migration in get_pending_migrations(engine):
+        logger.info("Aplicando migración %r", migration)
+        try:
+            with engine.begin() as conn:
+                migration.upgrade(conn)
+                conn.execute(
+                    text(
+                        f"INSERT INTO {MIGRATIONS_TABLE} (version, nombre, aplicada_en) "
+                        "VALUES (:version, :nombre, :aplicada_en)"
+                    ),
+                    {"version": migration.version, "nombre": migration.name, "aplicada_en": datetime.utcnow()}
+                )
+        except IntegrityError:
+            # Otro proceso pudo aplicar la misma migración al mismo tiempo
+            if migration.version in _applied_versions(engine):
+                logger.info("La migración %r ya fue aplicada por otro proceso", migration)
+                continue
+            raise
+        applied.append(migration)
+    return applied
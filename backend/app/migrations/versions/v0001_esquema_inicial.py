@@ -0,0 +1,50 @@
+"""Tablas de usuarios, categorías, eventos e inscripciones"""
+from datetime import date
+from sqlalchemy import MetaData, Table, Column, Integer, String, Date, Enum, ForeignKey
+from sqlalchemy.engine import Connection
+
+# Esquema tal como era al crear esta migración (no depende de los modelos
+# actuales: las columnas e índices posteriores los agregan las migraciones siguientes)
+metadata = MetaData()
+
+usuarios = Table(
+    "usuarios", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("nombre", String(100), nullable=False),
+    Column("email", String(255), unique=True, index=True, nullable=False),
+    Column("contraseña", String(255), nullable=False),
+    # Enum(UserRole) guarda el nombre del miembro
+    Column("rol", Enum("ADMINISTRADOR", "CLIENTE", name="userrole"), nullable=False),
+)
+
+categorias = Table(
+    "categorias", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("nombre", String(100), nullable=False),
+    Column("descripcion", String(500)),
+)
+
+eventos = Table(
+    "eventos", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("nombre", String(200), nullable=False),
+    Column("descripcion", String(1000)),
+    Column("fecha_inicio", Date, nullable=False),
+    Column("fecha_fin", Date, nullable=False),
+    Column("lugar", String(200), nullable=False),
+    Column("cupos", Integer, nullable=False),
+    Column("categoria_id", Integer, ForeignKey("categorias.id"), nullable=False),
+)
+
+inscripciones = Table(
+    "inscripciones", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("evento_id", Integer, ForeignKey("eventos.id"), nullable=False),
+    Column("usuario_id", Integer, ForeignKey("usuarios.id"), nullable=False),
+    Column("fecha_inscripcion", Date, default=date.today, nullable=False),
+)
+
+def upgrade(conn: Connection) -> None:
+    # Solo crea las tablas que no existen: las bases anteriores a las
+    # migraciones ya las tienen y se completan en las migraciones siguientes
+    metadata.create_all(bind=conn)
@@ -0,0 +1,30 @@
+"""Contador de inscripciones, versiones para ETags, versión de token y unicidad de inscripciones"""
+import logging
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from app.migrations.operations import add_column, create_index
+
+logger = logging.getLogger(__name__)
+
+def upgrade(conn: Connection) -> None:
+    # El esquema original permitía inscribir dos veces al mismo usuario en un
+    # evento: se conserva la primera inscripción (menor ID) de cada par para
+    # poder crear el índice único
+    duplicates = conn.execute(text(
+        "DELETE FROM inscripciones WHERE id NOT IN "
+        "(SELECT MIN(id) FROM inscripciones GROUP BY evento_id, usuario_id)"
+    )).rowcount
+    if duplicates:
+        logger.warning("Se eliminaron %s inscripciones duplicadas (evento, usuario)", duplicates)
+    
+    if add_column(conn, "eventos", "inscripciones_count", "INTEGER NOT NULL DEFAULT 0") or duplicates:
+        # Calcular el contador a partir de las inscripciones existentes (ya sin duplicados)
+        conn.execute(text(
+            "UPDATE eventos SET inscripciones_count = "
+            "(SELECT COUNT(*) FROM inscripciones WHERE inscripciones.evento_id = eventos.id)"
+        ))
+    add_column(conn, "eventos", "version", "INTEGER NOT NULL DEFAULT 1")
+    add_column(conn, "categorias", "version", "INTEGER NOT NULL DEFAULT 1")
+    add_column(conn, "usuarios", "token_version", "INTEGER NOT NULL DEFAULT 0")
+    
+    create_index(conn, "uq_inscripciones_evento_usuario", "inscripciones", ["evento_id", "usuario_id"], unique=True)
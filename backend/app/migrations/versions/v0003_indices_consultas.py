@@ -0,0 +1,15 @@
+"""Índices para los filtros y ordenamientos de los listados y las inscripciones"""
+from sqlalchemy.engine import Connection
+from app.migrations.operations import create_index
+
+def upgrade(conn: Connection) -> None:
+    # Listados de eventos paginados por (fecha_inicio, id), general y por categoría
+    create_index(conn, "ix_eventos_fecha_inicio_id", "eventos", ["fecha_inicio", "id"])
+    create_index(conn, "ix_eventos_categoria_fecha_inicio", "eventos", ["categoria_id", "fecha_inicio", "id"])
+    # Eventos activos y eventos más populares
+    create_index(conn, "ix_eventos_fecha_fin", "eventos", ["fecha_fin"])
+    create_index(conn, "ix_eventos_inscripciones_count", "eventos", ["inscripciones_count"])
+    # Inscripciones de un usuario ordenadas por fecha
+    create_index(conn, "ix_inscripciones_usuario_fecha", "inscripciones", ["usuario_id", "fecha_inscripcion"])
+    # Búsqueda de categorías por nombre
+    create_index(conn, "ix_categorias_nombre", "categorias", ["nombre"])
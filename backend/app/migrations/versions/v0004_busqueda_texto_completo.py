@@ -0,0 +1,61 @@
+"""Índice de búsqueda de texto completo de eventos (FTS5, solo SQLite)"""
+import logging
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+logger = logging.getLogger(__name__)
+
+# Tabla FTS5 de contenido externo: el texto vive en `eventos` y el índice se
+# mantiene con triggers. `remove_diacritics 2` hace la búsqueda insensible a
+# acentos y mayúsculas; `prefix` agrega índices para búsquedas por prefijo.
+FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS eventos_fts USING fts5(
+        nombre, descripcion,
+        content='eventos', content_rowid='id',
+        tokenize="unicode61 remove_diacritics 2",
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS eventos_fts_ai AFTER INSERT ON eventos BEGIN
+        INSERT INTO eventos_fts(rowid, nombre, descripcion)
+        VALUES (new.id, new.nombre, new.descripcion);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS eventos_fts_ad AFTER DELETE ON eventos BEGIN
+        INSERT INTO eventos_fts(eventos_fts, rowid, nombre, descripcion)
+        VALUES ('delete', old.id, old.nombre, old.descripcion);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS eventos_fts_au AFTER UPDATE OF nombre, descripcion ON eventos BEGIN
+        INSERT INTO eventos_fts(eventos_fts, rowid, nombre, descripcion)
+        VALUES ('delete', old.id, old.nombre, old.descripcion);
+        INSERT INTO eventos_fts(rowid, nombre, descripcion)
+        VALUES (new.id, new.nombre, new.descripcion);
+    END
+    """,
+]
+
+def upgrade(conn: Connection) -> None:
+    # En otros motores o sin FTS5 la búsqueda usa su alternativa sin índice
+    if conn.dialect.name != "sqlite":
+        return
+    
+    exists = conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'eventos_fts'")
+    ).first() is not None
+    
+    try:
+        for statement in FTS_DDL:
+            conn.execute(text(statement))
+    except Exception as exc:
+        # SQLite compilado sin FTS5: se usa la búsqueda con ILIKE
+        logger.warning("FTS5 no disponible, se usará búsqueda sin índice: %s", exc)
+        return
+    
+    # Indexar los eventos que ya existían
+    if not exists:
+        conn.execute(text("INSERT INTO eventos_fts(eventos_fts) VALUES ('rebuild')"))
@@ -0,0 +1,56 @@
+"""Tablas de resumen del dashboard (contadores globales y totales por categoría)"""
+from datetime import date
+from sqlalchemy import MetaData, Table, Column, Integer, String, ForeignKey, text
+from sqlalchemy.engine import Connection
+
+metadata = MetaData()
+
+contadores_resumen = Table(
+    "contadores_resumen", metadata,
+    Column("clave", String(100), primary_key=True),
+    Column("valor", Integer, nullable=False, server_default="0"),
+)
+
+# Solo para resolver la clave foránea de resumen_categorias (no se crea)
+Table("categorias", metadata, Column("id", Integer, primary_key=True))
+
+resumen_categorias = Table(
+    "resumen_categorias", metadata,
+    Column("categoria_id", Integer, ForeignKey("categorias.id"), primary_key=True),
+    Column("eventos", Integer, nullable=False, server_default="0"),
+    Column("inscripciones", Integer, nullable=False, server_default="0"),
+)
+
+def upgrade(conn: Connection) -> None:
+    metadata.create_all(bind=conn, tables=[contadores_resumen, resumen_categorias])
+    
+    # Calcular los valores iniciales a partir de los datos existentes
+    # (se recalculan completos, así que la migración se puede repetir)
+    today = date.today()
+    conn.execute(text(
+        "DELETE FROM contadores_resumen WHERE clave IN ('eventos_total', 'eventos_activos', "
+        "'inscripciones_total', 'inscripciones_activas', 'activos_calculados_el')"
+    ))
+    conn.execute(
+        text(
+            "INSERT INTO contadores_resumen (clave, valor) "
+            "SELECT 'eventos_total', COUNT(*) FROM eventos "
+            "UNION ALL SELECT 'eventos_activos', COUNT(*) FROM eventos WHERE fecha_fin >= :hoy "
+            "UNION ALL SELECT 'inscripciones_total', COUNT(*) FROM inscripciones "
+            "UNION ALL SELECT 'inscripciones_activas', COUNT(*) FROM inscripciones "
+            "JOIN eventos ON eventos.id = inscripciones.evento_id WHERE eventos.fecha_fin >= :hoy "
+            # Día (ordinal) para el que se calcularon los contadores de activos
+            "UNION ALL SELECT 'activos_calculados_el', :dia"
+        ),
+        {"hoy": today.isoformat(), "dia": today.toordinal()}
+    )
+    
+    conn.execute(text("DELETE FROM resumen_categorias"))
+    conn.execute(text(
+        "INSERT INTO resumen_categorias (categoria_id, eventos, inscripciones) "
+        "SELECT categorias.id, "
+        "(SELECT COUNT(*) FROM eventos WHERE eventos.categoria_id = categorias.id), "
+        "(SELECT COUNT(*) FROM inscripciones JOIN eventos ON eventos.id = inscripciones.evento_id "
+        "WHERE eventos.categoria_id = categorias.id) "
+        "FROM categorias"
+    ))
@@ -0,0 +1,7 @@
+"""Índice para paginar los asistentes de un evento"""
+from sqlalchemy.engine import Connection
+from app.migrations.operations import create_index
+
+def upgrade(conn: Connection) -> None:
+    # Asistentes de un evento paginados por ID de inscripción, sin ordenar todo el evento
+    create_index(conn, "ix_inscripciones_evento_id", "inscripciones", ["evento_id", "id"])
@@ -0,0 +1,7 @@
+"""Índice para contar los eventos totales y activos de cada categoría"""
+from sqlalchemy.engine import Connection
+from app.migrations.operations import create_index
+
+def upgrade(conn: Connection) -> None:
+    # Cantidad de eventos por categoría sin leer la tabla de eventos
+    create_index(conn, "ix_eventos_categoria_fecha_fin", "eventos", ["categoria_id", "fecha_fin"])
@@ -0,0 +1,11 @@
+"""Versión del conjunto de categorías para el registro en memoria de cada worker"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+def upgrade(conn: Connection) -> None:
+    # Clave que lee y aumenta CategoryRegistry (CATEGORIES_VERSION)
+    conn.execute(text(
+        "INSERT INTO contadores_resumen (clave, valor) "
+        "SELECT 'categorias_version', 1 "
+        "WHERE NOT EXISTS (SELECT 1 FROM contadores_resumen WHERE clave = 'categorias_version')"
+    ))
@@ -2,5 +2,6 @@ from .user import User, UserRole
 from .category import Category
 from .event import Event
 from .inscription import Inscription
+from .stats import StatsCounter, CategoryStats
 
-__all__ = ["User", "UserRole", "Category", "Event", "Inscription"]
\ No newline at end of file
+__all__ = ["User", "UserRole", "Category", "Event", "Inscription", "StatsCounter", "CategoryStats"]
\ No newline at end of file
@@ -1,13 +1,19 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 class Category(Base):
     __tablename__ = "categorias"
+    __table_args__ = (
+        # Búsqueda por nombre (verificación de nombres repetidos)
+        Index("ix_categorias_nombre", "nombre"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     nombre = Column(String(100), nullable=False)
     descripcion = Column(String(500))
+    # Versión del recurso para ETags; aumenta con cada cambio de la categoría o de sus eventos
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     
     # Relaciones
     eventos = relationship("Event", back_populates="categoria")
\ No newline at end of file
@@ -1,9 +1,20 @@
-from sqlalchemy import Column, Integer, String, Date, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 class Event(Base):
     __tablename__ = "eventos"
+    __table_args__ = (
+        # Listados paginados por (fecha_inicio, id), general y por categoría
+        Index("ix_eventos_fecha_inicio_id", "fecha_inicio", "id"),
+        Index("ix_eventos_categoria_fecha_inicio", "categoria_id", "fecha_inicio", "id"),
+        # Cantidad de eventos (totales y activos) de cada categoría, solo desde el índice
+        Index("ix_eventos_categoria_fecha_fin", "categoria_id", "fecha_fin"),
+        # Eventos activos (fecha_fin >= hoy)
+        Index("ix_eventos_fecha_fin", "fecha_fin"),
+        # Eventos más populares
+        Index("ix_eventos_inscripciones_count", "inscripciones_count"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     nombre = Column(String(200), nullable=False)
@@ -13,6 +24,10 @@ class Event(Base):
     lugar = Column(String(200), nullable=False)
     cupos = Column(Integer, nullable=False)
     categoria_id = Column(Integer, ForeignKey("categorias.id"), nullable=False)
+    # Contador de inscripciones mantenido por InscriptionService en la misma transacción
+    inscripciones_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Versión del recurso para ETags; aumenta con cada cambio del evento o de sus inscripciones
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     
     # Relaciones
     categoria = relationship("Category", back_populates="eventos")
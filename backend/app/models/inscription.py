@@ -1,10 +1,19 @@
-from sqlalchemy import Column, Integer, Date, ForeignKey
+from sqlalchemy import Column, Integer, Date, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 from datetime import date
 
 class Inscription(Base):
     __tablename__ = "inscripciones"
+    __table_args__ = (
+        # Un usuario solo puede inscribirse una vez a cada evento; también sirve
+        # para buscar las inscripciones de un evento
+        Index("uq_inscripciones_evento_usuario", "evento_id", "usuario_id", unique=True),
+        # Inscripciones de un usuario ordenadas por fecha
+        Index("ix_inscripciones_usuario_fecha", "usuario_id", "fecha_inscripcion"),
+        # Asistentes de un evento paginados por ID de inscripción
+        Index("ix_inscripciones_evento_id", "evento_id", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     evento_id = Column(Integer, ForeignKey("eventos.id"), nullable=False)
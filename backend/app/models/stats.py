@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, ForeignKey
+from app.database import Base
+
+class StatsCounter(Base):
+    """
+    Contadores globales del dashboard (total de eventos, inscripciones, etc.).
+    Los mantiene StatsService en la misma transacción que cada escritura.
+    """
+    __tablename__ = "contadores_resumen"
+    
+    clave = Column(String(100), primary_key=True)
+    valor = Column(Integer, nullable=False, default=0, server_default="0")
+
+class CategoryStats(Base):
+    """Totales de eventos e inscripciones de cada categoría"""
+    __tablename__ = "resumen_categorias"
+    
+    categoria_id = Column(Integer, ForeignKey("categorias.id"), primary_key=True)
+    eventos = Column(Integer, nullable=False, default=0, server_default="0")
+    inscripciones = Column(Integer, nullable=False, default=0, server_default="0")
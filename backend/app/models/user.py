@@ -15,6 +15,8 @@ class User(Base):
     email = Column(String(255), unique=True, index=True, nullable=False)
     contraseña = Column(String(255), nullable=False)  # Será hasheada
     rol = Column(Enum(UserRole), default=UserRole.CLIENTE, nullable=False)
+    # Aumenta al cambiar el rol o la contraseña; revoca los tokens emitidos antes
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
     
     # Relaciones
     inscripciones = relationship("Inscription", back_populates="usuario")
\ No newline at end of file
@@ -1,27 +1,27 @@
 # app/routers/auth.py
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 from app.schemas import UserCreate, UserResponse, Token, UserLogin
-from app.services.auth_service import AuthService
+from app.services.async_services import AsyncAuthService
 
 router = APIRouter()
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register_user(user: UserCreate, db: Session = Depends(get_db)):
+async def register_user(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """Registrar un nuevo usuario"""
-    return AuthService.register_user(db, user)
+    return await AsyncAuthService.register_user(db, user)
 
 @router.post("/login", response_model=Token)
-async def login_user(user_credentials: UserLogin, db: Session = Depends(get_db)):
+async def login_user(user_credentials: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """Iniciar sesión y obtener token JWT"""
-    return AuthService.login_user(db, user_credentials)
+    return await AsyncAuthService.login_user(db, user_credentials)
 
 @router.post("/login/form", response_model=Token)
 async def login_with_form(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Login usando OAuth2PasswordRequestForm (para compatibilidad con formularios)"""
     
@@ -31,7 +31,7 @@ async def login_with_form(
         contraseña=form_data.password
     )
     
-    return AuthService.login_user(db, user_credentials)
+    return await AsyncAuthService.login_user(db, user_credentials)
 
 @router.post("/verify-token")
 async def verify_token_endpoint():
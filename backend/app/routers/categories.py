@@ -1,101 +1,126 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
-from app.models import Category, Event, User
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app.database import get_async_db
 from app.schemas import (
     CategoryCreate, CategoryUpdate, CategoryResponse, 
-    CategoryWithEvents, CategoryEventResponse
+    CategoryWithEvents, CategoryPage, CATEGORY_FIELDS, CATEGORY_EVENT_FIELDS
 )
-from app.auth import require_admin, get_current_user_optional
+from app.auth import Principal, require_admin, get_current_user_optional
+from app.services import AsyncCategoryService
+from app.utils.pagination import MAX_PAGE_SIZE
+from app.utils.cache import response_cache, CATEGORY_LIST_NAMESPACE, category_detail_namespace
+from app.utils.etag import make_etag, etag_matches, set_cache_headers, not_modified
+from app.utils.serialization import json_bytes_response
+from app.utils.fields import FIELDS_DESCRIPTION, parse_fields, sparse_items, sparse_page_json
 
 router = APIRouter()
 
-@router.get("/", response_model=List[CategoryResponse])
+@router.get("/", response_model=CategoryPage)
 async def get_categories(
-    db: Session = Depends(get_db),
-    skip: int = 0,
-    limit: int = 100
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
 ):
-    """Obtener lista de categorías (público)"""
+    """Obtener lista de categorías con la cantidad de eventos de cada una (público)"""
     
-    categories = db.query(Category).offset(skip).limit(limit).all()
-    return categories
+    selected_fields = parse_fields(fields, CATEGORY_FIELDS)
+    
+    # El cache guarda el JSON ya serializado
+    cache_key = response_cache.key(CATEGORY_LIST_NAMESPACE, request)
+    cached_page = response_cache.get(cache_key)
+    if cached_page is not None:
+        return json_bytes_response(cached_page)
+    
+    rows, next_cursor = await AsyncCategoryService.get_categories_page(
+        db, limit, cursor, fields=selected_fields
+    )
+    page = sparse_page_json(rows, selected_fields, next_cursor)
+    response_cache.set(cache_key, page)
+    return json_bytes_response(page)
 
 @router.get("/{category_id}", response_model=CategoryWithEvents)
 async def get_category_by_id(
     category_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user_optional)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Optional[Principal] = Depends(get_current_user_optional),
+    eventos_cursor: Optional[str] = Query(None, description="Cursor de la página siguiente de eventos"),
+    eventos_limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE, description="Eventos por página")
 ):
-    """Obtener categoría por ID con sus eventos"""
+    """Obtener categoría por ID con la cantidad de eventos y una página de ellos (por fecha de inicio)"""
     
-    category = db.query(Category).filter(Category.id == category_id).first()
+    # GET condicional: se compara el ETag con la versión antes de armar la respuesta
+    version = await AsyncCategoryService.get_category_version(db, category_id)
+    if version is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Categoría no encontrada"
+        )
+    etag = make_etag("categoria", category_id, version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_cache_headers(response, etag)
+    
+    cache_key = response_cache.key(category_detail_namespace(category_id), request)
+    cached_category = response_cache.get_for_etag(cache_key, etag)
+    if cached_category is not None:
+        return cached_category
+    
+    # La categoría con sus cantidades de eventos en una consulta agrupada
+    category = await AsyncCategoryService.get_category_summary(db, category_id)
     if not category:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Categoría no encontrada"
         )
     
-    # Obtener eventos de la categoría
-    events = db.query(Event).filter(Event.categoria_id == category_id).all()
-    
-    # Convertir eventos a respuesta
-    events_response = []
-    for event in events:
-        events_response.append(CategoryEventResponse(
-            id=event.id,
-            nombre=event.nombre,
-            fecha_inicio=event.fecha_inicio.isoformat(),
-            fecha_fin=event.fecha_fin.isoformat(),
-            cupos=event.cupos
-        ))
-    
-    return CategoryWithEvents(
-        id=category.id,
-        nombre=category.nombre,
-        descripcion=category.descripcion,
-        eventos=events_response
+    # Una página de eventos, sin cargar todos los de la categoría
+    rows, next_events_cursor = await AsyncCategoryService.get_category_events_page(
+        db, category_id, eventos_limit, eventos_cursor
     )
+    
+    category_response = CategoryWithEvents(
+        **category._asdict(),
+        eventos=sparse_items(rows, CATEGORY_EVENT_FIELDS),
+        eventos_next_cursor=next_events_cursor
+    )
+    response_cache.set_for_etag(cache_key, etag, category_response)
+    return category_response
 
 @router.post("/", response_model=CategoryResponse, status_code=status.HTTP_201_CREATED)
 async def create_category(
     category: CategoryCreate,
-    current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(require_admin),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Crear nueva categoría (solo administradores)"""
     
     # Verificar si ya existe una categoría con el mismo nombre
-    existing_category = db.query(Category).filter(Category.nombre == category.nombre).first()
+    existing_category = await AsyncCategoryService.get_category_by_name(db, category.nombre)
     if existing_category:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Ya existe una categoría con este nombre"
         )
     
-    db_category = Category(
-        nombre=category.nombre,
-        descripcion=category.descripcion
-    )
-    
-    db.add(db_category)
-    db.commit()
-    db.refresh(db_category)
-    
+    db_category = await AsyncCategoryService.create_category(db, category)
     return db_category
 
 @router.put("/{category_id}", response_model=CategoryResponse)
 async def update_category(
     category_id: int,
     category_update: CategoryUpdate,
-    current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(require_admin),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Actualizar categoría (solo administradores)"""
     
     # Buscar la categoría
-    db_category = db.query(Category).filter(Category.id == category_id).first()
+    db_category = await AsyncCategoryService.get_category_by_id(db, category_id)
     if not db_category:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -104,7 +129,7 @@ async def update_category(
     
     # Verificar nombre único si se está cambiando
     if category_update.nombre and category_update.nombre != db_category.nombre:
-        existing_category = db.query(Category).filter(Category.nombre == category_update.nombre).first()
+        existing_category = await AsyncCategoryService.get_category_by_name(db, category_update.nombre)
         if existing_category:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -112,26 +137,19 @@ async def update_category(
             )
     
     # Actualizar campos
-    if category_update.nombre:
-        db_category.nombre = category_update.nombre
-    if category_update.descripcion is not None:
-        db_category.descripcion = category_update.descripcion
-    
-    db.commit()
-    db.refresh(db_category)
-    
+    db_category = await AsyncCategoryService.update_category(db, category_id, category_update)
     return db_category
 
 @router.delete("/{category_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_category(
     category_id: int,
-    current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(require_admin),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Eliminar categoría (solo administradores)"""
     
     # Buscar la categoría
-    db_category = db.query(Category).filter(Category.id == category_id).first()
+    db_category = await AsyncCategoryService.get_category_by_id(db, category_id)
     if not db_category:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -139,14 +157,12 @@ async def delete_category(
         )
     
     # Verificar si hay eventos asociados
-    events_count = db.query(Event).filter(Event.categoria_id == category_id).count()
+    events_count = await AsyncCategoryService.count_category_events(db, category_id)
     if events_count > 0:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"No se puede eliminar la categoría. Hay {events_count} evento(s) asociado(s)"
         )
     
-    db.delete(db_category)
-    db.commit()
-    
+    await AsyncCategoryService.delete_category(db, category_id)
     return None
\ No newline at end of file
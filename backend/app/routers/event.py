@@ -1,227 +1,260 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.database import get_db
-from app.models import User, Category
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal, Optional
+from app.database import get_async_db
 from app.schemas import (
-    EventCreate, EventUpdate, EventResponse, EventListResponse,
-    EventWithInscriptions, EventInscriptionResponse
+    EventCreate, EventUpdate, EventResponse,
+    EventWithInscriptions, EventListPage,
+    EventImportReport, EVENT_LIST_FIELDS, EVENT_INSCRIPTION_FIELDS
 )
-from app.auth import require_admin, get_current_user_optional
-from app.services import EventService, CategoryService, InscriptionService
+from app.auth import Principal, require_admin, get_current_user_optional
+from app.services import (
+    EventService, AsyncEventService, AsyncCategoryService, AsyncInscriptionService,
+    AsyncEventImportService, AsyncStatsService
+)
+from app.services.event_import import IMPORT_FORMATS, ROW_READERS
+from app.utils.pagination import MAX_PAGE_SIZE
+from app.utils.cache import response_cache, EVENT_LIST_NAMESPACE, event_detail_namespace
+from app.utils.etag import make_etag, etag_matches, set_cache_headers, not_modified
+from app.utils.serialization import dumps_json, json_bytes_response
+from app.utils.fields import FIELDS_DESCRIPTION, parse_fields, sparse_items, sparse_page_json
+from app.utils.export import export_response
+from app.utils.uploads import spool_request_body
 from datetime import date
 
 router = APIRouter()
 
-def build_event_list_response(event, category_name: str, available_spots: int, total_inscriptions: int) -> EventListResponse:
-    """Helper para construir la respuesta de lista de eventos"""
-    return EventListResponse(
-        id=event.id,
-        nombre=event.nombre,
-        descripcion=event.descripcion,
-        fecha_inicio=event.fecha_inicio,
-        fecha_fin=event.fecha_fin,
-        lugar=event.lugar,
-        cupos=event.cupos,
-        categoria_id=event.categoria_id,
-        categoria_nombre=category_name,
-        cupos_disponibles=available_spots,
-        total_inscripciones=total_inscriptions
-    )
-
-@router.get("/", response_model=List[EventListResponse])
+@router.get("/", response_model=EventListPage)
 async def get_events(
-    db: Session = Depends(get_db),
-    skip: int = 0,
-    limit: int = 100,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
     categoria_id: Optional[int] = Query(None, description="Filtrar por categoría"),
-    current_user: User = Depends(get_current_user_optional)
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    current_user: Optional[Principal] = Depends(get_current_user_optional)
 ):
     """Obtener lista de eventos disponibles (público)"""
     
+    selected_fields = parse_fields(fields, EVENT_LIST_FIELDS)
+    
+    # El cache guarda el JSON ya serializado
+    cache_key = response_cache.key(EVENT_LIST_NAMESPACE, request)
+    cached_page = response_cache.get(cache_key)
+    if cached_page is not None:
+        return json_bytes_response(cached_page)
+    
     if categoria_id:
         # Verificar que la categoría existe
-        category = CategoryService.get_category_by_id(db, categoria_id)
+        category = await AsyncCategoryService.get_category_by_id(db, categoria_id)
         if not category:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Categoría no encontrada"
             )
-        events = EventService.get_events_by_category(db, categoria_id)
-    else:
-        # Usar paginación del service
-        events = EventService.get_all_events(db, skip, limit)
-    
-    result = []
-    for event in events:
-        # Obtener datos adicionales usando services
-        available_spots = EventService.get_event_available_spots(db, event.id)
-        total_inscriptions = len(InscriptionService.get_event_inscriptions(db, event.id))
-        category = CategoryService.get_category_by_id(db, event.categoria_id)
-        
-        result.append(build_event_list_response(
-            event, category.nombre, available_spots, total_inscriptions
-        ))
     
-    return result
+    # Una sola consulta por página, solo con las columnas pedidas
+    rows, next_cursor = await AsyncEventService.get_event_listing(
+        db, limit, cursor, category_id=categoria_id, fields=selected_fields
+    )
+    
+    page = sparse_page_json(rows, selected_fields, next_cursor)
+    response_cache.set(cache_key, page)
+    return json_bytes_response(page)
 
-@router.get("/search", response_model=List[EventListResponse])
+@router.get("/search", response_model=EventListPage)
 async def search_events(
     q: str = Query(..., description="Término de búsqueda"),
-    db: Session = Depends(get_db),
-    skip: int = 0,
-    limit: int = 100
+    db: AsyncSession = Depends(get_async_db),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
 ):
-    """Buscar eventos por nombre o descripción"""
+    """Buscar eventos por nombre o descripción (por prefijo, sin distinguir acentos)"""
     
-    # Usar el service para búsqueda
-    events = EventService.search_events(db, q)
+    selected_fields = parse_fields(fields, EVENT_LIST_FIELDS)
     
-    # Aplicar paginación manual ya que el service no la incluye en search
-    paginated_events = events[skip:skip + limit]
+    # Búsqueda con índice de texto completo, ordenada por relevancia
+    rows, next_cursor = await AsyncEventService.search_events(db, q, limit, cursor, fields=selected_fields)
     
-    result = []
-    for event in paginated_events:
-        available_spots = EventService.get_event_available_spots(db, event.id)
-        total_inscriptions = len(InscriptionService.get_event_inscriptions(db, event.id))
-        category = CategoryService.get_category_by_id(db, event.categoria_id)
-        
-        result.append(build_event_list_response(
-            event, category.nombre, available_spots, total_inscriptions
-        ))
-    
-    return result
+    return json_bytes_response(sparse_page_json(rows, selected_fields, next_cursor))
 
-@router.get("/category/{category_id}", response_model=List[EventListResponse])
+@router.get("/category/{category_id}", response_model=EventListPage)
 async def get_events_by_category(
     category_id: int,
-    db: Session = Depends(get_db),
-    skip: int = 0,
-    limit: int = 100
+    db: AsyncSession = Depends(get_async_db),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
 ):
     """Obtener eventos de una categoría específica"""
     
+    selected_fields = parse_fields(fields, EVENT_LIST_FIELDS)
+    
     # Verificar que la categoría existe usando service
-    category = CategoryService.get_category_by_id(db, category_id)
+    category = await AsyncCategoryService.get_category_by_id(db, category_id)
     if not category:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Categoría no encontrada"
         )
     
-    # Usar service para obtener eventos
-    events = EventService.get_events_by_category(db, category_id)
-    
-    # Aplicar paginación manual
-    paginated_events = events[skip:skip + limit]
-    
-    result = []
-    for event in paginated_events:
-        available_spots = EventService.get_event_available_spots(db, event.id)
-        total_inscriptions = len(InscriptionService.get_event_inscriptions(db, event.id))
-        
-        result.append(build_event_list_response(
-            event, category.nombre, available_spots, total_inscriptions
-        ))
+    # Usar el motor de listados del service
+    rows, next_cursor = await AsyncEventService.get_event_listing(
+        db, limit, cursor, category_id=category_id, fields=selected_fields
+    )
     
-    return result
+    return json_bytes_response(sparse_page_json(rows, selected_fields, next_cursor))
 
-@router.get("/active", response_model=List[EventListResponse])
+@router.get("/active", response_model=EventListPage)
 async def get_active_events(
-    db: Session = Depends(get_db),
-    skip: int = 0,
-    limit: int = 100
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
 ):
     """Obtener eventos activos (fecha de fin mayor o igual a hoy)"""
     
-    # Usar service para eventos disponibles
-    events = EventService.get_available_events(db)
+    selected_fields = parse_fields(fields, EVENT_LIST_FIELDS)
     
-    # Aplicar paginación manual
-    paginated_events = events[skip:skip + limit]
+    cache_key = response_cache.key(EVENT_LIST_NAMESPACE, request)
+    cached_page = response_cache.get(cache_key)
+    if cached_page is not None:
+        return json_bytes_response(cached_page)
     
-    result = []
-    for event in paginated_events:
-        available_spots = EventService.get_event_available_spots(db, event.id)
-        total_inscriptions = len(InscriptionService.get_event_inscriptions(db, event.id))
-        category = CategoryService.get_category_by_id(db, event.categoria_id)
-        
-        result.append(build_event_list_response(
-            event, category.nombre, available_spots, total_inscriptions
-        ))
+    # Solo eventos cuya fecha de fin no pasó
+    rows, next_cursor = await AsyncEventService.get_event_listing(
+        db, limit, cursor, only_active=True, fields=selected_fields
+    )
+    
+    page = sparse_page_json(rows, selected_fields, next_cursor)
+    response_cache.set(cache_key, page)
+    return json_bytes_response(page)
+
+@router.get("/export")
+async def export_events(
+    formato: Literal["csv", "ndjson"] = Query("csv", description="Formato del archivo"),
+    categoria_id: Optional[int] = Query(None, description="Filtrar por categoría"),
+    solo_activos: bool = Query(False, description="Solo eventos cuya fecha de fin no pasó"),
+    desde: Optional[date] = Query(None, description="Fecha de inicio mínima"),
+    hasta: Optional[date] = Query(None, description="Fecha de inicio máxima"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    current_user: Principal = Depends(require_admin)
+):
+    """Exportar eventos en CSV o NDJSON (solo administradores)"""
+    
+    selected_fields = parse_fields(fields, EVENT_LIST_FIELDS)
+    statement = AsyncEventService.export_statement(
+        selected_fields, category_id=categoria_id, only_active=solo_activos, date_from=desde, date_to=hasta
+    )
+    # Se envía por lotes a medida que se lee la base
+    return export_response(statement, selected_fields, formato, "eventos")
+
+@router.post("/import", response_model=EventImportReport)
+async def import_events(
+    request: Request,
+    dry_run: bool = Query(False, description="Solo validar, sin crear eventos"),
+    formato: Optional[Literal["csv", "json", "ndjson"]] = Query(
+        None, description="Formato del archivo (por defecto según el Content-Type)"
+    ),
+    current_user: Principal = Depends(require_admin),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Importar eventos en bloque desde CSV, JSON o NDJSON (solo administradores).
+    Cada fila se valida como en la creación individual; las válidas se crean
+    y el reporte indica el resultado de cada una.
+    """
+    
+    if formato is None:
+        content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+        formato = IMPORT_FORMATS.get(content_type)
+        if formato is None:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail=f"Formato no soportado. Tipos aceptados: {', '.join(IMPORT_FORMATS)}"
+            )
     
-    return result
+    # El archivo se guarda a medida que llega y se lee fila por fila
+    upload = await spool_request_body(request)
+    try:
+        report = await AsyncEventImportService.import_events(db, ROW_READERS[formato](upload), dry_run)
+    finally:
+        upload.close()
+    
+    return json_bytes_response(dumps_json(report))
 
 @router.get("/stats", response_model=dict)
 async def get_events_stats(
-    current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    top: int = Query(5, ge=1, le=50, description="Cantidad de eventos más populares"),
+    current_user: Principal = Depends(require_admin),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Obtener estadísticas de eventos (solo administradores)"""
     
-    # Usar services para obtener estadísticas
-    total_events = EventService.get_total_events_count(db)
-    active_inscriptions = InscriptionService.get_total_active_inscriptions_count(db)
-    avg_inscriptions = EventService.get_average_inscriptions_per_event(db)
-    most_popular_event = EventService.get_event_with_most_inscriptions(db)
-    
-    most_popular_event_data = None
-    if most_popular_event:
-        total_inscriptions = len(InscriptionService.get_event_inscriptions(db, most_popular_event.id))
-        most_popular_event_data = {
-            "id": most_popular_event.id,
-            "nombre": most_popular_event.nombre,
-            "total_inscripciones": total_inscriptions
-        }
-    
-    return {
-        "total_eventos": total_events,
-        "total_inscripciones_activas": active_inscriptions,
-        "promedio_inscripciones_por_evento": round(float(avg_inscriptions), 2),
-        "evento_mas_popular": most_popular_event_data
-    }
+    # Agregados mantenidos en las tablas de resumen en cada escritura
+    return await AsyncStatsService.get_summary(db, top)
 
 @router.get("/{event_id}", response_model=EventWithInscriptions)
 async def get_event_by_id(
     event_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user_optional)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Optional[Principal] = Depends(get_current_user_optional),
+    inscripciones_cursor: Optional[str] = Query(None, description="Cursor de la página siguiente de inscripciones"),
+    inscripciones_limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE, description="Inscripciones por página"),
+    solo_conteos: bool = Query(False, description="Solo los totales, sin la lista de inscripciones")
 ):
-    """Obtener evento por ID con detalles completos"""
+    """
+    Obtener evento por ID con detalles completos.
+    Los administradores reciben además una página de inscriptos.
+    """
+    
+    # Solo se cachea la vista pública (los administradores ven las inscripciones)
+    is_admin = current_user is not None and current_user.rol.value == "Administrador"
+    cache_key = response_cache.key(event_detail_namespace(event_id), request)
+    if not is_admin:
+        # GET condicional: se compara el ETag con la versión antes de armar la respuesta
+        versions = await AsyncEventService.get_event_version(db, event_id)
+        if versions is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Evento no encontrado"
+            )
+        etag = make_etag("evento", event_id, *versions)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_cache_headers(response, etag)
+        
+        cached_event = response_cache.get_for_etag(cache_key, etag)
+        if cached_event is not None:
+            return cached_event
     
     # Usar service para obtener evento
-    event = EventService.get_event_by_id(db, event_id)
+    event = await AsyncEventService.get_event_by_id(db, event_id)
     if not event:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Evento no encontrado"
         )
     
-    # Obtener datos adicionales usando services
-    available_spots = EventService.get_event_available_spots(db, event_id)
-    total_inscriptions = len(InscriptionService.get_event_inscriptions(db, event_id))
-    category = CategoryService.get_category_by_id(db, event.categoria_id)
+    # Cupos e inscripciones a partir del contador del evento
+    available_spots = EventService.compute_available_spots(event)
+    total_inscriptions = event.inscripciones_count
+    category = await AsyncCategoryService.get_category_by_id(db, event.categoria_id)
     
-    # Obtener inscripciones si es admin
+    # Una página de inscriptos si es admin (inscripción y usuario en una sola consulta)
     inscripciones = []
-    if current_user and current_user.rol.value == "Administrador":
-        db_inscripciones = InscriptionService.get_event_inscriptions(db, event_id)
-        
-        for inscripcion in db_inscripciones:
-            # Aquí necesitarías obtener los datos del usuario, podrías agregar esto al service
-            # o hacer la consulta directamente
-            from app.services import UserService
-            user = UserService.get_user_by_id(db, inscripcion.usuario_id)
-            
-            inscripciones.append(EventInscriptionResponse(
-                id=inscripcion.id,
-                usuario_id=inscripcion.usuario_id,
-                usuario_nombre=user.nombre,
-                usuario_email=user.email,
-                fecha_inscripcion=inscripcion.fecha_inscripcion
-            ))
-    
-    return EventWithInscriptions(
+    next_inscriptions_cursor = None
+    if is_admin and not solo_conteos:
+        rows, next_inscriptions_cursor = await AsyncInscriptionService.get_event_attendees_page(
+            db, event_id, inscripciones_limit, inscripciones_cursor
+        )
+        inscripciones = sparse_items(rows, EVENT_INSCRIPTION_FIELDS)
+    
+    event_response = EventWithInscriptions(
         id=event.id,
         nombre=event.nombre,
         descripcion=event.descripcion,
@@ -233,19 +266,45 @@ async def get_event_by_id(
         categoria_nombre=category.nombre,
         cupos_disponibles=available_spots,
         total_inscripciones=total_inscriptions,
-        inscripciones=inscripciones
+        inscripciones=inscripciones,
+        inscripciones_next_cursor=next_inscriptions_cursor
     )
+    
+    if not is_admin:
+        response_cache.set_for_etag(cache_key, etag, event_response)
+    return event_response
+
+@router.get("/{event_id}/inscriptions/export")
+async def export_event_inscriptions(
+    event_id: int,
+    formato: Literal["csv", "ndjson"] = Query("csv", description="Formato del archivo"),
+    current_user: Principal = Depends(require_admin),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Exportar los inscriptos de un evento en CSV o NDJSON (solo administradores)"""
+    
+    # Verificar que el evento existe antes de empezar a enviar el archivo
+    event = await AsyncEventService.get_event_by_id(db, event_id)
+    if not event:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Evento no encontrado"
+        )
+    
+    # Inscriptos y datos de cada usuario en una sola consulta, leída por lotes
+    statement = AsyncInscriptionService.event_attendees_statement(event_id)
+    return export_response(statement, EVENT_INSCRIPTION_FIELDS, formato, f"evento_{event_id}_inscriptos")
 
 @router.post("/", response_model=EventResponse, status_code=status.HTTP_201_CREATED)
 async def create_event(
     event: EventCreate,
-    current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(require_admin),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Crear nuevo evento (solo administradores)"""
     
     # Verificar que la categoría existe usando service
-    category = CategoryService.get_category_by_id(db, event.categoria_id)
+    category = await AsyncCategoryService.get_category_by_id(db, event.categoria_id)
     if not category:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -272,10 +331,10 @@ async def create_event(
         )
     
     # Crear evento usando service
-    db_event = EventService.create_event(db, event)
+    db_event = await AsyncEventService.create_event(db, event)
     
     # Obtener datos adicionales para la respuesta
-    available_spots = EventService.get_event_available_spots(db, db_event.id)
+    available_spots = EventService.compute_available_spots(db_event)
     total_inscriptions = 0  # Nuevo evento, sin inscripciones
     
     return EventResponse(
@@ -296,13 +355,13 @@ async def create_event(
 async def update_event(
     event_id: int,
     event_update: EventUpdate,
-    current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(require_admin),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Actualizar evento (solo administradores)"""
     
     # Verificar que el evento existe
-    db_event = EventService.get_event_by_id(db, event_id)
+    db_event = await AsyncEventService.get_event_by_id(db, event_id)
     if not db_event:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -311,7 +370,7 @@ async def update_event(
     
     # Verificar categoría si se está cambiando
     if event_update.categoria_id:
-        category = CategoryService.get_category_by_id(db, event_update.categoria_id)
+        category = await AsyncCategoryService.get_category_by_id(db, event_update.categoria_id)
         if not category:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -336,7 +395,7 @@ async def update_event(
     
     # Validar cupos si se están actualizando
     if event_update.cupos:
-        current_inscriptions = len(InscriptionService.get_event_inscriptions(db, event_id))
+        current_inscriptions = db_event.inscripciones_count
         if event_update.cupos < current_inscriptions:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -349,7 +408,7 @@ async def update_event(
             )
     
     # Actualizar usando service
-    updated_event = EventService.update_event(db, event_id, event_update)
+    updated_event = await AsyncEventService.update_event(db, event_id, event_update)
     if not updated_event:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -357,9 +416,9 @@ async def update_event(
         )
     
     # Obtener datos actualizados para la respuesta
-    category = CategoryService.get_category_by_id(db, updated_event.categoria_id)
-    available_spots = EventService.get_event_available_spots(db, updated_event.id)
-    total_inscriptions = len(InscriptionService.get_event_inscriptions(db, updated_event.id))
+    category = await AsyncCategoryService.get_category_by_id(db, updated_event.categoria_id)
+    available_spots = EventService.compute_available_spots(updated_event)
+    total_inscriptions = updated_event.inscripciones_count
     
     return EventResponse(
         id=updated_event.id,
@@ -378,29 +437,28 @@ async def update_event(
 @router.delete("/{event_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_event(
     event_id: int,
-    current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(require_admin),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Eliminar evento (solo administradores)"""
     
     # Verificar que el evento existe
-    db_event = EventService.get_event_by_id(db, event_id)
+    db_event = await AsyncEventService.get_event_by_id(db, event_id)
     if not db_event:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Evento no encontrado"
         )
     
-    # Verificar si hay inscripciones asociadas usando service
-    inscripciones = InscriptionService.get_event_inscriptions(db, event_id)
-    if len(inscripciones) > 0:
+    # Verificar si hay inscripciones asociadas usando el contador del evento
+    if db_event.inscripciones_count > 0:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"No se puede eliminar el evento porque tiene {len(inscripciones)} inscripciones asociadas"
+            detail=f"No se puede eliminar el evento porque tiene {db_event.inscripciones_count} inscripciones asociadas"
         )
     
     # Eliminar usando service
-    success = EventService.delete_event(db, event_id)
+    success = await AsyncEventService.delete_event(db, event_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -0,0 +1,36 @@
+# app/routers/inscriptions.py
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.schemas import InscriptionCreate, InscriptionResponse
+from app.auth import Principal, require_auth
+from app.services import InscriptionError
+from app.services.inscription_writer import inscription_writer
+
+router = APIRouter()
+
+@router.post("/", response_model=InscriptionResponse, status_code=status.HTTP_201_CREATED)
+async def create_inscription(
+    inscription_data: InscriptionCreate,
+    current_user: Principal = Depends(require_auth),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Inscribir al usuario actual en un evento"""
+    try:
+        return await inscription_writer.reserve_seat(db, inscription_data.evento_id, current_user.id)
+    except InscriptionError as exc:
+        raise exc.to_http_exception()
+
+@router.delete("/{inscription_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def cancel_inscription(
+    inscription_id: int,
+    current_user: Principal = Depends(require_auth),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Cancelar una inscripción del usuario actual"""
+    if not await inscription_writer.cancel_inscription(db, inscription_id, current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Inscripción no encontrada"
+        )
+    return None
@@ -1,75 +1,114 @@
 # app/routers/users.py
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app.database import get_async_db
 from app.models import User
 from app.schemas import (
-    UserResponse, UserUpdate, 
-    ActiveInscriptionResponse, InscriptionHistoryResponse
+    UserResponse, UserUpdate, UserRoleUpdate, USER_FIELDS,
+    ActiveInscriptionPage, InscriptionHistoryPage,
+    InscriptionStatus, ActiveInscriptionStatus,
+    ACTIVE_INSCRIPTION_FIELDS, INSCRIPTION_HISTORY_FIELDS
 )
-from app.auth import require_auth, require_admin
-from app.services.user_service import UserService
+from app.auth import Principal, require_auth, require_admin, get_current_user
+from app.services.async_services import AsyncUserService
+from app.utils.serialization import dumps_json, json_bytes_response
+from app.utils.fields import FIELDS_DESCRIPTION, parse_fields, sparse_items, sparse_page_json
+from app.utils.pagination import MAX_PAGE_SIZE
 
 router = APIRouter()
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_profile(current_user: User = Depends(require_auth)):
+async def get_current_user_profile(current_user: User = Depends(get_current_user)):
     """Obtener el perfil del usuario actual"""
     return current_user
 
 @router.put("/me", response_model=UserResponse)
 async def update_current_user_profile(
     user_update: UserUpdate,
-    current_user: User = Depends(require_auth),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Actualizar el perfil del usuario actual"""
-    return UserService.update_user_profile(db, current_user, user_update)
+    return await AsyncUserService.update_user_profile(db, current_user, user_update)
 
-@router.get("/me/inscriptions", response_model=List[ActiveInscriptionResponse])
+@router.get("/me/inscriptions", response_model=ActiveInscriptionPage)
 async def get_user_inscriptions(
-    current_user: User = Depends(require_auth),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(require_auth),
+    db: AsyncSession = Depends(get_async_db),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    estado: Optional[ActiveInscriptionStatus] = Query(None, description="Filtrar por estado del evento")
 ):
-    """Obtener las inscripciones activas del usuario actual"""
-    return UserService.get_user_active_inscriptions(db, current_user.id)
+    """Obtener las inscripciones activas del usuario actual (más recientes primero)"""
+    rows, next_cursor = await AsyncUserService.get_user_active_inscriptions(
+        db, current_user.id, limit, cursor, estado
+    )
+    return json_bytes_response(sparse_page_json(rows, ACTIVE_INSCRIPTION_FIELDS, next_cursor))
 
-@router.get("/me/inscriptions/history", response_model=List[InscriptionHistoryResponse])
+@router.get("/me/inscriptions/history", response_model=InscriptionHistoryPage)
 async def get_user_inscriptions_history(
-    current_user: User = Depends(require_auth),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(require_auth),
+    db: AsyncSession = Depends(get_async_db),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    estado: Optional[InscriptionStatus] = Query(None, description="Filtrar por estado del evento")
 ):
-    """Obtener el historial completo de inscripciones del usuario"""
-    return UserService.get_user_inscriptions_history(db, current_user.id)
+    """Obtener el historial de inscripciones del usuario (más recientes primero)"""
+    rows, next_cursor = await AsyncUserService.get_user_inscriptions_history(
+        db, current_user.id, limit, cursor, estado
+    )
+    return json_bytes_response(sparse_page_json(rows, INSCRIPTION_HISTORY_FIELDS, next_cursor))
 
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user_by_id(
     user_id: int,
-    current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(require_admin),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Obtener usuario por ID (solo administradores)"""
-    return UserService.get_user_by_id(db, user_id)
+    return await AsyncUserService.get_user_by_id(db, user_id)
 
-@router.get("/{user_id}/inscriptions", response_model=List[ActiveInscriptionResponse])
+@router.put("/{user_id}/role", response_model=UserResponse)
+async def change_user_role(
+    user_id: int,
+    role_update: UserRoleUpdate,
+    current_user: Principal = Depends(require_admin),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Cambiar el rol de un usuario (solo administradores)"""
+    return await AsyncUserService.change_user_role(db, user_id, role_update.rol)
+
+@router.get("/{user_id}/inscriptions", response_model=ActiveInscriptionPage)
 async def get_user_inscriptions_by_id(
     user_id: int,
-    current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(require_admin),
+    db: AsyncSession = Depends(get_async_db),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    estado: Optional[ActiveInscriptionStatus] = Query(None, description="Filtrar por estado del evento")
 ):
-    """Obtener inscripciones de un usuario específico (solo administradores)"""
+    """Obtener inscripciones activas de un usuario específico (solo administradores)"""
     # Verificar que el usuario existe
-    UserService.get_user_by_id(db, user_id)  # Esto lanza excepción si no existe
+    if not await AsyncUserService.user_exists(db, user_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Usuario no encontrado"
+        )
     
-    return UserService.get_user_active_inscriptions(db, user_id)
+    rows, next_cursor = await AsyncUserService.get_user_active_inscriptions(db, user_id, limit, cursor, estado)
+    return json_bytes_response(sparse_page_json(rows, ACTIVE_INSCRIPTION_FIELDS, next_cursor))
 
 @router.get("/", response_model=List[UserResponse])
 async def get_all_users(
-    current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_admin),
+    db: AsyncSession = Depends(get_async_db),
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
 ):
     """Obtener lista de todos los usuarios (solo administradores)"""
-    return UserService.get_all_users(db, skip, limit)
\ No newline at end of file
+    selected_fields = parse_fields(fields, USER_FIELDS)
+    # Solo las columnas pedidas, serializadas directamente a JSON
+    rows = await AsyncUserService.get_users_listing(db, skip, limit, selected_fields)
+    return json_bytes_response(dumps_json(sparse_items(rows, selected_fields)))
\ No newline at end of file
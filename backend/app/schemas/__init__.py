@@ -1,38 +1,48 @@
 from .user import (
-    UserBase, UserCreate, UserUpdate, UserResponse, 
+    UserBase, UserCreate, UserUpdate, UserRoleUpdate, UserResponse, 
     UserWithInscriptions, Token, TokenData, UserLogin,
-    UserInscriptionResponse
+    UserInscriptionResponse, USER_FIELDS
 )
 from .category import (
     CategoryBase, CategoryCreate, CategoryUpdate, 
-    CategoryResponse, CategoryWithEvents, CategoryEventResponse
+    CategoryResponse, CategoryWithEvents, CategoryEventResponse,
+    CategoryPage, CategoryListResponse, CATEGORY_FIELDS, CATEGORY_EVENT_FIELDS
 )
 from .event import (
     EventBase, EventCreate, EventUpdate, EventResponse,
-    EventListResponse, EventWithInscriptions, EventInscriptionResponse
+    EventListResponse, EventWithInscriptions, EventInscriptionResponse,
+    EventListPage, EVENT_LIST_FIELDS, EVENT_INSCRIPTION_FIELDS,
+    EventImportRowResult, EventImportReport
 )
 from .inscription import (
     InscriptionBase, InscriptionCreate, InscriptionResponse,
     InscriptionDetailResponse, ActiveInscriptionResponse,
-    InscriptionHistoryResponse
+    InscriptionHistoryResponse, ActiveInscriptionPage, InscriptionHistoryPage,
+    InscriptionStatus, ActiveInscriptionStatus,
+    ACTIVE_INSCRIPTION_FIELDS, INSCRIPTION_HISTORY_FIELDS
 )
 
 __all__ = [
     # User schemas
-    "UserBase", "UserCreate", "UserUpdate", "UserResponse", 
+    "UserBase", "UserCreate", "UserUpdate", "UserRoleUpdate", "UserResponse", 
     "UserWithInscriptions", "Token", "TokenData", "UserLogin",
-    "UserInscriptionResponse",
+    "UserInscriptionResponse", "USER_FIELDS",
     
     # Category schemas
     "CategoryBase", "CategoryCreate", "CategoryUpdate", 
     "CategoryResponse", "CategoryWithEvents", "CategoryEventResponse",
+    "CategoryPage", "CategoryListResponse", "CATEGORY_FIELDS", "CATEGORY_EVENT_FIELDS",
     
     # Event schemas
     "EventBase", "EventCreate", "EventUpdate", "EventResponse",
     "EventListResponse", "EventWithInscriptions", "EventInscriptionResponse",
+    "EventListPage", "EVENT_LIST_FIELDS", "EVENT_INSCRIPTION_FIELDS",
+    "EventImportRowResult", "EventImportReport",
     
     # Inscription schemas
     "InscriptionBase", "InscriptionCreate", "InscriptionResponse",
     "InscriptionDetailResponse", "ActiveInscriptionResponse",
-    "InscriptionHistoryResponse"
+    "InscriptionHistoryResponse", "ActiveInscriptionPage", "InscriptionHistoryPage",
+    "InscriptionStatus", "ActiveInscriptionStatus",
+    "ACTIVE_INSCRIPTION_FIELDS", "INSCRIPTION_HISTORY_FIELDS"
 ]
\ No newline at end of file
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from typing import Optional, List
+from datetime import date
 
 # Esquema base para Categoría
 class CategoryBase(BaseModel):
@@ -22,17 +23,36 @@ class CategoryResponse(CategoryBase):
     class Config:
         from_attributes = True
 
+# Esquema para categoría en listados, con la cantidad de eventos
+class CategoryListResponse(CategoryResponse):
+    total_eventos: int = 0
+    # Eventos que todavía no terminaron
+    eventos_activos: int = 0
+
+# Página de categorías con cursor para la página siguiente
+class CategoryPage(BaseModel):
+    items: List[CategoryListResponse] = []
+    next_cursor: Optional[str] = None
+
 # Esquema para evento básico en respuesta de categoría
 class CategoryEventResponse(BaseModel):
     id: int
     nombre: str
-    fecha_inicio: str
-    fecha_fin: str
+    fecha_inicio: date
+    fecha_fin: date
     cupos: int
     
     class Config:
         from_attributes = True
 
-# Esquema completo de categoría con eventos
-class CategoryWithEvents(CategoryResponse):
-    eventos: List[CategoryEventResponse] = []
\ No newline at end of file
+# Esquema completo de categoría con una página de sus eventos (por fecha de inicio)
+class CategoryWithEvents(CategoryListResponse):
+    eventos: List[CategoryEventResponse] = []
+    # Cursor de la página siguiente de eventos (None si no hay más)
+    eventos_next_cursor: Optional[str] = None
+
+# Campos que se pueden pedir con ?fields= en el listado de categorías
+CATEGORY_FIELDS = tuple(CategoryListResponse.model_fields)
+
+# Columnas de los eventos de una categoría
+CATEGORY_EVENT_FIELDS = tuple(CategoryEventResponse.model_fields)
@@ -71,6 +71,14 @@ class EventListResponse(BaseModel):
     class Config:
         from_attributes = True
 
+# Página de eventos con cursor para la página siguiente
+class EventListPage(BaseModel):
+    items: List[EventListResponse] = []
+    next_cursor: Optional[str] = None
+
+# Campos que se pueden pedir con ?fields= en los listados de eventos
+EVENT_LIST_FIELDS = tuple(EventListResponse.model_fields)
+
 # Esquema para inscripción en respuesta de evento
 class EventInscriptionResponse(BaseModel):
     id: int
@@ -82,6 +90,29 @@ class EventInscriptionResponse(BaseModel):
     class Config:
         from_attributes = True
 
-# Esquema completo de evento con inscripciones
+# Campos de la exportación de inscriptos de un evento
+EVENT_INSCRIPTION_FIELDS = tuple(EventInscriptionResponse.model_fields)
+
+# Esquema completo de evento con inscripciones (una página, solo para administradores)
 class EventWithInscriptions(EventResponse):
-    inscripciones: List[EventInscriptionResponse] = []
\ No newline at end of file
+    inscripciones: List[EventInscriptionResponse] = []
+    # Cursor de la página siguiente de inscripciones (None si no hay más)
+    inscripciones_next_cursor: Optional[str] = None
+
+# Resultado de una fila de la importación masiva de eventos
+class EventImportRowResult(BaseModel):
+    # Número de fila de datos (1 = primera fila después del encabezado)
+    fila: int
+    # "creado", "valido" (simulación) o "error"
+    estado: str
+    id: Optional[int] = None
+    errores: List[str] = []
+
+# Reporte de la importación masiva de eventos
+class EventImportReport(BaseModel):
+    dry_run: bool
+    total: int
+    validos: int
+    creados: int
+    con_errores: int
+    filas: List[EventImportRowResult] = []
\ No newline at end of file
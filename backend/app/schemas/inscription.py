@@ -1,7 +1,13 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Literal, Optional
 from datetime import date
 
+# Estado de un evento según sus fechas: "activo" (todavía no empezó),
+# "en_curso" o "finalizado"
+InscriptionStatus = Literal["activo", "en_curso", "finalizado"]
+# Estados de las inscripciones activas (eventos que no terminaron)
+ActiveInscriptionStatus = Literal["activo", "en_curso"]
+
 # Esquema base para Inscripción
 class InscriptionBase(BaseModel):
     evento_id: int
@@ -50,6 +56,14 @@ class ActiveInscriptionResponse(BaseModel):
     class Config:
         from_attributes = True
 
+# Página de inscripciones activas con cursor para la página siguiente
+class ActiveInscriptionPage(BaseModel):
+    items: List[ActiveInscriptionResponse] = []
+    next_cursor: Optional[str] = None
+
+# Columnas de las inscripciones activas
+ACTIVE_INSCRIPTION_FIELDS = tuple(ActiveInscriptionResponse.model_fields)
+
 # Esquema para historial de inscripciones
 class InscriptionHistoryResponse(BaseModel):
     id: int
@@ -60,7 +74,15 @@ class InscriptionHistoryResponse(BaseModel):
     evento_fecha_fin: date
     evento_lugar: str
     categoria_nombre: str
-    estado: str  # "activo", "finalizado", "cancelado"
+    estado: InscriptionStatus
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# Página del historial de inscripciones con cursor para la página siguiente
+class InscriptionHistoryPage(BaseModel):
+    items: List[InscriptionHistoryResponse] = []
+    next_cursor: Optional[str] = None
+
+# Columnas del historial de inscripciones
+INSCRIPTION_HISTORY_FIELDS = tuple(InscriptionHistoryResponse.model_fields)
\ No newline at end of file
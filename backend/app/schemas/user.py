@@ -19,6 +19,10 @@ class UserUpdate(BaseModel):
     email: Optional[EmailStr] = None
     contraseña: Optional[str] = None
 
+# Esquema para cambiar el rol de un usuario (solo administradores)
+class UserRoleUpdate(BaseModel):
+    rol: UserRole
+
 # Esquema para respuesta de usuario (sin contraseña)
 class UserResponse(UserBase):
     id: int
@@ -52,4 +56,7 @@ class TokenData(BaseModel):
 
 class UserLogin(BaseModel):
     email: EmailStr
-    contraseña: str
\ No newline at end of file
+    contraseña: str
+
+# Campos que se pueden pedir con ?fields= en el listado de usuarios
+USER_FIELDS = tuple(UserResponse.model_fields)
@@ -0,0 +1,165 @@
+# app/services/async_services.py
+import functools
+import inspect
+from datetime import date
+from typing import Any, Dict, Iterable, List, Set, Tuple
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import User
+from app.schemas import UserCreate, UserLogin, UserUpdate, EventCreate
+from app.utils.password_hashing import password_hasher
+from app.services.users_service import UserService
+from app.services.event_service import EventService
+from app.services.category_service import CategoryService
+from app.services.inscription_service import InscriptionService
+from app.services.event_import import EventImportService, RawRow, IMPORT_BATCH_SIZE
+from app.services.stats_service import StatsService
+from app.services.auth_service import AuthService
+
+def _run_on_async_session(function):
+    """Convertir un método sincrónico que recibe `db` en una corrutina que recibe una AsyncSession"""
+    @functools.wraps(function)
+    async def wrapper(db: AsyncSession, *args, **kwargs):
+        return await db.run_sync(function, *args, **kwargs)
+    return wrapper
+
+def make_async_service(service_cls: type) -> type:
+    """
+    Crea la versión asíncrona de un service sincrónico.
+    Los métodos cuyo primer parámetro es la sesión (`db`) pasan a ser corrutinas
+    que reciben una AsyncSession y ejecutan el método original con
+    AsyncSession.run_sync: las consultas se escriben una sola vez y la espera
+    de la base no bloquea el event loop. Los métodos que no usan la base se
+    copian tal cual.
+    """
+    attributes = {
+        "__doc__": f"Versión asíncrona de {service_cls.__name__} (ver make_async_service)",
+        "sync_service": service_cls,
+    }
+    for name, member in vars(service_cls).items():
+        if not isinstance(member, staticmethod):
+            continue
+        parameters = list(inspect.signature(member.__func__).parameters)
+        if parameters and parameters[0] == "db":
+            attributes[name] = staticmethod(_run_on_async_session(member.__func__))
+        else:
+            attributes[name] = member
+    return type(f"Async{service_cls.__name__}", (), attributes)
+
+class AsyncUserService(make_async_service(UserService)):
+    """
+    Versión asíncrona de UserService.
+    El cambio de contraseña del perfil ejecuta bcrypt en el pool de
+    password_hasher, como el registro.
+    """
+    
+    @staticmethod
+    async def update_user_profile(db: AsyncSession, current_user: User, user_update: UserUpdate) -> User:
+        """Actualizar el perfil del usuario"""
+        hashed_password = None
+        if user_update.contraseña:
+            # Validar el email antes de ocupar el pool de bcrypt
+            await db.run_sync(UserService.check_email_available, current_user, user_update.email)
+            hashed_password = await password_hasher.hash(user_update.contraseña)
+        return await db.run_sync(UserService.save_user_profile, current_user, user_update, hashed_password)
+
+AsyncEventService = make_async_service(EventService)
+AsyncCategoryService = make_async_service(CategoryService)
+AsyncInscriptionService = make_async_service(InscriptionService)
+
+class AsyncEventImportService(make_async_service(EventImportService)):
+    """
+    Versión asíncrona de EventImportService.
+    La lectura del archivo y la validación de cada tramo de filas corren en
+    el pool de threads; por la sesión asíncrona pasan solo la carga de las
+    categorías y los INSERT de los lotes.
+    """
+    
+    @staticmethod
+    async def import_events(
+        db: AsyncSession,
+        rows: Iterable[RawRow],
+        dry_run: bool = False,
+        batch_size: int = IMPORT_BATCH_SIZE
+    ) -> Dict[str, Any]:
+        """Validar e importar las filas leídas del archivo (ver EventImportService.import_events)"""
+        categories = await db.run_sync(EventImportService.load_category_lookup)
+        today = date.today()
+        rows = iter(rows)
+        results: List[Dict[str, Any]] = []
+        pending: List[Tuple[Dict[str, Any], EventCreate]] = []
+        touched_categories: Set[int] = set()
+        
+        while True:
+            validated = await run_in_threadpool(
+                EventImportService.validate_rows, rows, categories, today, batch_size
+            )
+            results.extend(result for result, _ in validated)
+            if not dry_run:
+                pending.extend((result, event) for result, event in validated if event is not None)
+            # Lotes completos, y el resto al terminar el archivo
+            while pending and (len(pending) >= batch_size or not validated):
+                touched_categories |= await db.run_sync(EventImportService.save_batch, pending[:batch_size])
+                del pending[:batch_size]
+            if not validated:
+                break
+        
+        return EventImportService.finish_import(results, touched_categories, dry_run)
+
+AsyncStatsService = make_async_service(StatsService)
+
+class AsyncAuthService(make_async_service(AuthService)):
+    """
+    Versión asíncrona de AuthService.
+    El registro y el login ejecutan bcrypt en el pool de password_hasher para
+    no bloquear el event loop; el login además regenera el hash si cambió
+    BCRYPT_ROUNDS.
+    """
+    
+    @staticmethod
+    async def register_user(db: AsyncSession, user_data: UserCreate) -> User:
+        """Registrar un nuevo usuario"""
+        # Verificar si el email ya existe
+        existing_user = await db.run_sync(AuthService.get_user_by_email, user_data.email)
+        if existing_user:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Ya existe un usuario con este email"
+            )
+        
+        hashed_password = await password_hasher.hash(user_data.contraseña)
+        return await db.run_sync(AuthService.create_user, user_data, hashed_password)
+    
+    @staticmethod
+    async def authenticate_user(db: AsyncSession, email: str, password: str):
+        """Autenticar usuario con email y contraseña (False si no coinciden)"""
+        user = await db.run_sync(AuthService.get_user_by_email, email)
+        if not user:
+            return False
+        
+        valid, new_hash = await password_hasher.verify_and_update(password, user.contraseña)
+        if not valid:
+            return False
+        if new_hash:
+            await db.run_sync(AuthService.update_password_hash, user.id, new_hash)
+        return user
+    
+    @staticmethod
+    async def login_user(db: AsyncSession, user_credentials: UserLogin) -> dict:
+        """Iniciar sesión y generar token"""
+        user = await AsyncAuthService.authenticate_user(
+            db,
+            email=user_credentials.email,
+            password=user_credentials.contraseña
+        )
+        
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Email o contraseña incorrectos",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        
+        # Crear token de acceso
+        return AuthService.create_user_token(user)
@@ -46,6 +46,11 @@ class AuthService:
         
         # Crear nuevo usuario
         hashed_password = get_password_hash(user_data.contraseña)
+        return AuthService.create_user(db, user_data, hashed_password)
+    
+    @staticmethod
+    def create_user(db: Session, user_data: UserCreate, hashed_password: str) -> User:
+        """Guardar un usuario nuevo con la contraseña ya hasheada"""
         db_user = User(
             nombre=user_data.nombre,
             email=user_data.email,
@@ -59,6 +64,15 @@ class AuthService:
         
         return db_user
     
+    @staticmethod
+    def update_password_hash(db: Session, user_id: int, hashed_password: str) -> None:
+        """Reemplazar el hash de la contraseña (al cambiar el costo de bcrypt)"""
+        db.query(User).filter(User.id == user_id).update(
+            {User.contraseña: hashed_password},
+            synchronize_session=False
+        )
+        db.commit()
+    
     @staticmethod
     def login_user(db: Session, user_credentials: UserLogin) -> dict:
         """Iniciar sesión y generar token"""
@@ -84,7 +98,7 @@ class AuthService:
         """Crear token JWT para el usuario"""
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
-            data={"sub": user.email, "role": user.rol.value, "user_id": user.id},
+            data={"sub": user.email, "role": user.rol.value, "user_id": user.id, "tv": user.token_version},
             expires_delta=access_token_expires
         )
         
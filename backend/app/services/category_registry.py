@@ -0,0 +1,121 @@
+import os
+import time
+from typing import Any, Dict, List, Optional, Union
+from sqlalchemy import select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from app.models.category import Category
+from app.models.stats import StatsCounter
+
+# Cargar variables de entorno
+load_dotenv()
+
+# Segundos entre verificaciones de la versión de las categorías en la base
+# (0 = verificar en cada acceso). Con varios workers es lo que tarda un
+# worker en ver los cambios hechos por otro.
+CATEGORY_REGISTRY_CHECK_INTERVAL = float(os.getenv("CATEGORY_REGISTRY_CHECK_INTERVAL", "5"))
+
+# Clave de contadores_resumen con la versión del conjunto de categorías
+CATEGORIES_VERSION = "categorias_version"
+
+class CategoryRegistry:
+    """
+    Registro en memoria de las categorías (ID, nombre y descripción), por ID
+    y por nombre. La tabla es chica y casi no se escribe, así que se carga
+    completa y se comparte en el proceso.
+    Cada escritura de categorías aumenta la versión en contadores_resumen
+    (bump_version, dentro de la transacción) e invalida el registro del
+    proceso; los demás workers comparan la versión cada
+    CATEGORY_REGISTRY_CHECK_INTERVAL segundos (una lectura por clave
+    primaria) y recargan si cambió. Una búsqueda sin resultado también
+    compara la versión, así que una categoría nueva se encuentra enseguida
+    en todos los workers.
+    Las entradas son filas de solo lectura (id, nombre, descripcion).
+    """
+    
+    def __init__(self, check_interval: float = CATEGORY_REGISTRY_CHECK_INTERVAL):
+        self.check_interval = check_interval
+        # Se reemplazan juntos para que una lectura nunca vea mapas de cargas distintas
+        self._maps: Optional[Dict[str, Dict[Any, Any]]] = None
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+        self.loads = 0
+    
+    @staticmethod
+    def bump_version(db: Union[Session, Connection]) -> None:
+        """Aumentar la versión de las categorías en la transacción de quien llama (no hace commit)"""
+        db.execute(
+            update(StatsCounter)
+            .where(StatsCounter.clave == CATEGORIES_VERSION)
+            .values(valor=StatsCounter.valor + 1)
+        )
+    
+    def invalidate(self) -> None:
+        """Descartar el registro del proceso; se recarga en el próximo acceso"""
+        self._maps = None
+    
+    def refresh(self, db: Session) -> Dict[str, Dict[Any, Any]]:
+        """
+        Comparar la versión guardada en la base y recargar las categorías si
+        cambió (o si el registro se invalidó).
+        La versión se lee antes que las filas: si cambia en el medio, la
+        próxima verificación vuelve a cargar.
+        """
+        version = db.execute(
+            select(StatsCounter.valor).where(StatsCounter.clave == CATEGORIES_VERSION)
+        ).scalar()
+        if self._maps is None or version != self._version:
+            rows = db.execute(
+                select(Category.id, Category.nombre, Category.descripcion).order_by(Category.id)
+            ).all()
+            self._maps = {
+                "id": {row.id: row for row in rows},
+                "nombre": {row.nombre: row for row in rows},
+            }
+            self._version = version
+            self.loads += 1
+        self._checked_at = time.monotonic()
+        return self._maps
+    
+    def _current(self, db: Session) -> Dict[str, Dict[Any, Any]]:
+        maps = self._maps
+        if maps is None or time.monotonic() - self._checked_at >= self.check_interval:
+            maps = self.refresh(db)
+        return maps
+    
+    def _lookup(self, db: Session, index: str, key: Any) -> Optional[Any]:
+        maps = self._maps
+        checked = maps is None or time.monotonic() - self._checked_at >= self.check_interval
+        if checked:
+            maps = self.refresh(db)
+        found = maps[index].get(key)
+        if found is None and not checked:
+            # Puede ser una categoría creada por otro worker después de la
+            # última verificación: se compara la versión antes de responder None
+            found = self.refresh(db)[index].get(key)
+        return found
+    
+    def get(self, db: Session, category_id: int) -> Optional[Any]:
+        """Categoría por ID, o None si no existe"""
+        return self._lookup(db, "id", category_id)
+    
+    def get_by_name(self, db: Session, nombre: str) -> Optional[Any]:
+        """Categoría por nombre exacto (los nombres son únicos), o None si no existe"""
+        return self._lookup(db, "nombre", nombre)
+    
+    def all(self, db: Session) -> List[Any]:
+        """Todas las categorías, ordenadas por ID"""
+        return list(self._current(db)["id"].values())
+    
+    def stats(self) -> Dict[str, Any]:
+        """Estado del registro (categorías cargadas, versión y cantidad de cargas)"""
+        maps = self._maps
+        return {
+            "categories": len(maps["id"]) if maps is not None else 0,
+            "version": self._version,
+            "loads": self.loads,
+        }
+
+# Instancia compartida por toda la aplicación
+category_registry = CategoryRegistry()
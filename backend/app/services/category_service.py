@@ -1,8 +1,17 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import or_, func, case
 from app.models.category import Category
-from app.schemas.category import CategoryCreate, CategoryUpdate
-from typing import Optional, List
+from app.models.event import Event
+from app.services.stats_service import StatsService
+from app.services.category_registry import category_registry
+from app.utils.cache import (
+    response_cache, CATEGORY_LIST_NAMESPACE, EVENTS_NAMESPACE, category_detail_namespace
+)
+from app.schemas.category import CategoryCreate, CategoryUpdate, CATEGORY_FIELDS, CATEGORY_EVENT_FIELDS
+from app.utils.pagination import decode_cursor, apply_keyset, split_page
+from app.utils.fields import projection
+from datetime import date
+from typing import Any, Dict, Optional, List, Sequence, Tuple
 
 class CategoryService:
     """
@@ -10,8 +19,15 @@ class CategoryService:
     Se conecta con:
     - Models: Category
     - Schemas: CategoryCreate, CategoryUpdate
+    Las búsquedas por ID y por nombre se resuelven con el registro en
+    memoria (category_registry); las escrituras aumentan su versión.
     """
     
+    # Tipos de las columnas del cursor de eventos de una categoría: (fecha_inicio, id)
+    EVENTS_CURSOR_TYPES = (date, int)
+    # Campos del listado que se calculan contando los eventos
+    COUNT_FIELDS = ("total_eventos", "eventos_activos")
+    
     @staticmethod
     def create_category(db: Session, category_data: CategoryCreate) -> Category:
         """
@@ -22,16 +38,44 @@ class CategoryService:
             descripcion=category_data.descripcion
         )
         db.add(db_category)
+        db.flush()
+        StatsService.add_category(db, db_category.id)
+        category_registry.bump_version(db)
         db.commit()
+        category_registry.invalidate()
+        response_cache.invalidate(CATEGORY_LIST_NAMESPACE)
         db.refresh(db_category)
         return db_category
     
     @staticmethod
-    def get_category_by_id(db: Session, category_id: int) -> Optional[Category]:
+    def get_category_by_id(db: Session, category_id: int):
+        """
+        Obtiene una categoría por su ID desde el registro en memoria
+        (fila de solo lectura con id, nombre y descripcion), o None.
+        """
+        return category_registry.get(db, category_id)
+    
+    @staticmethod
+    def get_category_by_name(db: Session, nombre: str):
         """
-        Obtiene una categoría por su ID.
+        Obtiene una categoría por su nombre (los nombres son únicos) desde el
+        registro en memoria, o None.
         """
-        return db.query(Category).filter(Category.id == category_id).first()
+        return category_registry.get_by_name(db, nombre)
+    
+    @staticmethod
+    def get_category_events(db: Session, category_id: int) -> List[Event]:
+        """
+        Obtiene los eventos de una categoría.
+        """
+        return db.query(Event).filter(Event.categoria_id == category_id).all()
+    
+    @staticmethod
+    def count_category_events(db: Session, category_id: int) -> int:
+        """
+        Cuenta los eventos asociados a una categoría.
+        """
+        return db.query(Event).filter(Event.categoria_id == category_id).count()
     
     @staticmethod
     def get_all_categories(db: Session, skip: int = 0, limit: int = 100) -> List[Category]:
@@ -40,6 +84,99 @@ class CategoryService:
         """
         return db.query(Category).offset(skip).limit(limit).all()
     
+    @staticmethod
+    def listing_columns(today: date) -> Dict[str, Any]:
+        """Expresión SQL de cada campo de CATEGORY_FIELDS"""
+        return {
+            "id": Category.id,
+            "nombre": Category.nombre,
+            "descripcion": Category.descripcion,
+            "total_eventos": func.count(Event.id),
+            "eventos_activos": func.count(case((Event.fecha_fin >= today, Event.id))),
+        }
+    
+    @staticmethod
+    def _listing_query(db: Session, fields: Sequence[str]):
+        """
+        Consulta de categorías con las columnas de `fields` (más el ID).
+        Las cantidades de eventos se cuentan en la misma consulta, agrupando
+        los eventos de cada categoría, solo si se pidieron.
+        """
+        columns = CategoryService.listing_columns(date.today())
+        query = db.query(*(columns[name].label(name) for name in projection(fields, ("id",))))
+        if any(name in CategoryService.COUNT_FIELDS for name in fields):
+            query = query.select_from(Category).outerjoin(
+                Event, Event.categoria_id == Category.id
+            ).group_by(Category.id)
+        return query
+    
+    @staticmethod
+    def get_categories_page(
+        db: Session,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        fields: Sequence[str] = CATEGORY_FIELDS
+    ) -> Tuple[List, Optional[str]]:
+        """
+        Obtiene una página de categorías ordenadas por ID usando paginación por cursor,
+        con la cantidad de eventos (totales y activos) de cada una.
+        Consulta solo las columnas de `fields` (más el ID del cursor); cada fila
+        trae primero esos campos, en orden.
+        Devuelve las filas y el cursor de la página siguiente.
+        """
+        after = decode_cursor(cursor, (int,))
+        query = CategoryService._listing_query(db, fields)
+        rows = apply_keyset(query, [Category.id], after, limit).all()
+        return split_page(rows, limit, lambda row: (row.id,))
+    
+    @staticmethod
+    def get_category_summary(db: Session, category_id: int):
+        """
+        Obtiene una categoría con la cantidad de eventos (totales y activos)
+        en una sola consulta. Devuelve None si la categoría no existe.
+        """
+        return CategoryService._listing_query(db, CATEGORY_FIELDS).filter(
+            Category.id == category_id
+        ).first()
+    
+    @staticmethod
+    def get_category_events_page(
+        db: Session,
+        category_id: int,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List, Optional[str]]:
+        """
+        Una página de eventos de una categoría ordenados por fecha de inicio,
+        paginada por clave sobre (fecha_inicio, id). Cada fila trae las
+        columnas de CategoryEventResponse; devuelve también el cursor de la
+        página siguiente.
+        """
+        columns = [getattr(Event, name).label(name) for name in CATEGORY_EVENT_FIELDS]
+        query = db.query(*columns).filter(Event.categoria_id == category_id)
+        after = decode_cursor(cursor, CategoryService.EVENTS_CURSOR_TYPES)
+        rows = apply_keyset(query, [Event.fecha_inicio, Event.id], after, limit).all()
+        return split_page(rows, limit, lambda row: (row.fecha_inicio, row.id))
+    
+    @staticmethod
+    def get_category_version(db: Session, category_id: int) -> Optional[int]:
+        """
+        Obtiene solo la versión de una categoría (para ETags).
+        Devuelve None si la categoría no existe.
+        """
+        return db.query(Category.version).filter(Category.id == category_id).scalar()
+    
+    @staticmethod
+    def bump_version(db: Session, category_id: int) -> None:
+        """
+        Aumenta la versión de una categoría dentro de la transacción de quien
+        lo llama (no hace commit). Se usa cuando cambian sus eventos.
+        """
+        db.query(Category).filter(Category.id == category_id).update(
+            {Category.version: Category.version + 1},
+            synchronize_session=False
+        )
+    
     @staticmethod
     def search_categories(db: Session, search_term: str) -> List[Category]:
         """
@@ -61,11 +198,19 @@ class CategoryService:
         if not db_category:
             return None
         
-        update_data = category_data.dict(exclude_unset=True)
+        # Los campos enviados como null no se modifican
+        update_data = category_data.dict(exclude_unset=True, exclude_none=True)
         for field, value in update_data.items():
             setattr(db_category, field, value)
+        db_category.version = Category.version + 1
+        category_registry.bump_version(db)
         
         db.commit()
+        category_registry.invalidate()
+        # Los eventos muestran el nombre de su categoría
+        response_cache.invalidate(
+            CATEGORY_LIST_NAMESPACE, category_detail_namespace(category_id), EVENTS_NAMESPACE
+        )
         db.refresh(db_category)
         return db_category
     
@@ -79,6 +224,10 @@ class CategoryService:
         if not db_category:
             return False
         
+        StatsService.remove_category(db, category_id)
         db.delete(db_category)
+        category_registry.bump_version(db)
         db.commit()
+        category_registry.invalidate()
+        response_cache.invalidate(CATEGORY_LIST_NAMESPACE, category_detail_namespace(category_id))
         return True
\ No newline at end of file
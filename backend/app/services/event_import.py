@@ -0,0 +1,256 @@
+import os
+import io
+import csv
+import json
+import itertools
+import logging
+from collections import Counter
+from datetime import date
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from app.models.event import Event
+from app.schemas.event import EventCreate
+from app.services.category_service import CategoryService
+from app.services.category_registry import category_registry
+from app.services.stats_service import StatsService
+from app.utils.cache import (
+    response_cache, EVENT_LIST_NAMESPACE, CATEGORY_LIST_NAMESPACE, category_detail_namespace
+)
+
+# Cargar variables de entorno
+load_dotenv()
+
+# Eventos que se insertan por transacción
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "500"))
+
+# Formatos aceptados y su tipo de contenido
+IMPORT_FORMATS = {
+    "text/csv": "csv",
+    "application/json": "json",
+    "application/x-ndjson": "ndjson",
+}
+
+logger = logging.getLogger("uvicorn.error")
+
+# Fila leída del archivo: (número de fila, valores) o (número de fila, error de lectura)
+RawRow = Tuple[int, Any]
+
+def iter_csv_rows(upload: BinaryIO) -> Iterator[RawRow]:
+    """Filas de un CSV con encabezado (acepta el BOM que agregan las planillas)"""
+    text = io.TextIOWrapper(upload, encoding="utf-8-sig", newline="")
+    number = 0
+    try:
+        for number, row in enumerate(csv.DictReader(text), start=1):
+            yield number, row
+    except (csv.Error, UnicodeDecodeError) as exc:
+        # El resto del archivo no se puede interpretar
+        yield number + 1, f"No se pudo leer el CSV: {exc}"
+    finally:
+        # Sin cerrar el archivo subido, que es de quien llama
+        text.detach()
+
+def iter_ndjson_rows(upload: BinaryIO) -> Iterator[RawRow]:
+    """Un objeto JSON por línea; las líneas vacías se ignoran"""
+    number = 0
+    for line in upload:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            yield number, json.loads(line)
+        except ValueError as exc:
+            yield number, f"JSON inválido: {exc}"
+
+def iter_json_rows(upload: BinaryIO) -> Iterator[RawRow]:
+    """Una lista JSON de objetos (se lee completa)"""
+    try:
+        payload = json.load(upload)
+    except ValueError as exc:
+        yield 1, f"JSON inválido: {exc}"
+        return
+    if not isinstance(payload, list):
+        yield 1, "Se esperaba una lista de eventos"
+        return
+    yield from enumerate(payload, start=1)
+
+ROW_READERS = {
+    "csv": iter_csv_rows,
+    "json": iter_json_rows,
+    "ndjson": iter_ndjson_rows,
+}
+
+class EventImportService:
+    """
+    Service para la importación masiva de eventos.
+    Se conecta con:
+    - Models: Event
+    - Services: category_registry (categorías por ID y por nombre)
+    - Schemas: EventCreate (mismas validaciones que la creación individual)
+    Las categorías se resuelven una sola vez con un mapa en memoria y los
+    eventos válidos se insertan en lotes (un INSERT con varias filas y un
+    commit por lote).
+    """
+    
+    @staticmethod
+    def load_category_lookup(db: Session) -> Dict[Any, int]:
+        """Mapa de ID y de nombre (sin distinguir mayúsculas) al ID de cada categoría"""
+        lookup: Dict[Any, int] = {}
+        for category in category_registry.all(db):
+            lookup[category.id] = category.id
+            lookup[category.nombre.casefold()] = category.id
+        return lookup
+    
+    @staticmethod
+    def validate_row(raw: Any, categories: Dict[Any, int], today: date) -> Tuple[Optional[EventCreate], List[str]]:
+        """
+        Validar una fila con las reglas de la creación de eventos.
+        La categoría se indica con categoria_id o con categoria_nombre.
+        Devuelve el evento validado o la lista de errores.
+        """
+        if isinstance(raw, str):
+            return None, [raw]
+        if not isinstance(raw, dict):
+            return None, ["Se esperaba un objeto con los datos del evento"]
+        
+        # Las celdas vacías de un CSV cuentan como campos no enviados
+        values = {key: value for key, value in raw.items() if key and value not in ("", None)}
+        category_name = values.pop("categoria_nombre", None)
+        if "categoria_id" not in values and isinstance(category_name, str):
+            category_id = categories.get(category_name.strip().casefold())
+            if category_id is None:
+                return None, [f"categoria_nombre: no existe la categoría '{category_name}'"]
+            values["categoria_id"] = category_id
+        
+        try:
+            event = EventCreate(**values)
+        except ValidationError as exc:
+            return None, [
+                f"{'.'.join(str(part) for part in error['loc']) or 'fila'}: {error['msg']}"
+                for error in exc.errors()
+            ]
+        
+        errors = []
+        if event.categoria_id not in categories:
+            errors.append("categoria_id: la categoría especificada no existe")
+        if event.fecha_inicio < today:
+            errors.append("fecha_inicio: la fecha de inicio no puede ser en el pasado")
+        return (None, errors) if errors else (event, [])
+    
+    @staticmethod
+    def insert_batch(db: Session, events: List[EventCreate]) -> List[Optional[int]]:
+        """
+        Insertar un lote de eventos en una transacción y devolver sus IDs en
+        el mismo orden (None si el motor no puede devolverlos en un INSERT
+        de varias filas).
+        """
+        rows = [event.model_dump() for event in events]
+        dialect = db.get_bind().dialect
+        if dialect.insert_executemany_returning_sort_by_parameter_order:
+            statement = insert(Event).returning(Event.id, sort_by_parameter_order=True)
+            ids = list(db.execute(statement, rows).scalars())
+        else:
+            db.execute(insert(Event), rows)
+            ids = [None] * len(rows)
+        
+        # Los eventos importados empiezan hoy o después, así que están activos
+        per_category = Counter(event.categoria_id for event in events)
+        for category_id, count in per_category.items():
+            CategoryService.bump_version(db, category_id)
+            StatsService.record_events(db, category_id, count, active=True)
+        db.commit()
+        return ids
+    
+    @staticmethod
+    def validate_rows(
+        rows: Iterator[RawRow],
+        categories: Dict[Any, int],
+        today: date,
+        limit: int
+    ) -> List[Tuple[Dict[str, Any], Optional[EventCreate]]]:
+        """
+        Leer y validar hasta `limit` filas del iterador (no usa la base).
+        Devuelve el resultado de cada fila con su evento validado, o None si
+        tiene errores; una lista vacía indica que el archivo terminó.
+        """
+        validated = []
+        for number, raw in itertools.islice(rows, limit):
+            event, errors = EventImportService.validate_row(raw, categories, today)
+            result = {"fila": number, "estado": "valido" if event else "error", "id": None, "errores": errors}
+            validated.append((result, event))
+        return validated
+    
+    @staticmethod
+    def save_batch(db: Session, pending: List[Tuple[Dict[str, Any], EventCreate]]) -> Set[int]:
+        """
+        Insertar un lote de filas válidas y marcar su resultado (creado o
+        error si falla el lote). Devuelve las categorías con eventos nuevos.
+        """
+        batch = [event for _, event in pending]
+        try:
+            ids = EventImportService.insert_batch(db, batch)
+        except SQLAlchemyError as exc:
+            db.rollback()
+            logger.exception("Error al insertar un lote de la importación de eventos")
+            for result, _ in pending:
+                result.update(estado="error", errores=[f"Error al guardar el lote: {exc.__class__.__name__}"])
+            return set()
+        for (result, _), event_id in zip(pending, ids):
+            result.update(estado="creado", id=event_id)
+        return {event.categoria_id for event in batch}
+    
+    @staticmethod
+    def finish_import(results: List[Dict[str, Any]], touched_categories: Set[int], dry_run: bool) -> Dict[str, Any]:
+        """Invalidar las respuestas cacheadas afectadas y armar el reporte (forma de EventImportReport)"""
+        if touched_categories:
+            response_cache.invalidate(
+                EVENT_LIST_NAMESPACE,
+                CATEGORY_LIST_NAMESPACE,
+                *(category_detail_namespace(category_id) for category_id in touched_categories)
+            )
+        
+        return {
+            "dry_run": dry_run,
+            "total": len(results),
+            "validos": sum(1 for result in results if result["estado"] != "error"),
+            "creados": sum(1 for result in results if result["estado"] == "creado"),
+            "con_errores": sum(1 for result in results if result["estado"] == "error"),
+            "filas": results
+        }
+    
+    @staticmethod
+    def import_events(
+        db: Session,
+        rows: Iterable[RawRow],
+        dry_run: bool = False,
+        batch_size: int = IMPORT_BATCH_SIZE
+    ) -> Dict[str, Any]:
+        """
+        Validar e importar las filas leídas del archivo.
+        Las filas válidas se insertan en lotes de `batch_size`; las inválidas
+        se informan y no impiden importar el resto. Con `dry_run` solo se
+        valida. Devuelve el reporte (forma de EventImportReport).
+        """
+        categories = EventImportService.load_category_lookup(db)
+        today = date.today()
+        rows = iter(rows)
+        results: List[Dict[str, Any]] = []
+        pending: List[Tuple[Dict[str, Any], EventCreate]] = []
+        touched_categories: Set[int] = set()
+        
+        while True:
+            validated = EventImportService.validate_rows(rows, categories, today, batch_size)
+            results.extend(result for result, _ in validated)
+            if not dry_run:
+                pending.extend((result, event) for result, event in validated if event is not None)
+            # Lotes completos, y el resto al terminar el archivo
+            while pending and (len(pending) >= batch_size or not validated):
+                touched_categories |= EventImportService.save_batch(db, pending[:batch_size])
+                del pending[:batch_size]
+            if not validated:
+                break
+        
+        return EventImportService.finish_import(results, touched_categories, dry_run)
@@ -1,10 +1,21 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, func
+from sqlalchemy import or_, and_, func, case, select
+from sqlalchemy.sql import Select
 from app.models.event import Event
+from app.models.category import Category
 from app.models.inscription import Inscription
-from app.schemas.event import EventCreate, EventUpdate
+from app.schemas.event import EventCreate, EventUpdate, EVENT_LIST_FIELDS
+from app.services.search_index import EventSearchIndex
+from app.services.category_service import CategoryService
+from app.services.stats_service import StatsService
+from app.utils.pagination import decode_cursor, apply_keyset, split_page
+from app.utils.fields import projection
+from app.utils.cache import (
+    response_cache, EVENT_LIST_NAMESPACE, CATEGORY_LIST_NAMESPACE,
+    event_detail_namespace, category_detail_namespace
+)
 from datetime import date
-from typing import Optional, List
+from typing import Any, Dict, Optional, List, Sequence, Tuple
 
 class EventService:
     """
@@ -14,6 +25,11 @@ class EventService:
     - Schemas: EventCreate, EventUpdate
     """
     
+    # Tipos de las columnas del cursor de listados: (fecha_inicio, id)
+    LISTING_CURSOR_TYPES = (date, int)
+    # Columnas del cursor; se consultan aunque no se pidan en ?fields=
+    LISTING_KEY_FIELDS = ("fecha_inicio", "id")
+    
     @staticmethod
     def create_event(db: Session, event_data: EventCreate) -> Event:
         """
@@ -29,8 +45,17 @@ class EventService:
             categoria_id=event_data.categoria_id
         )
         db.add(db_event)
+        CategoryService.bump_version(db, event_data.categoria_id)
+        StatsService.record_events(
+            db, event_data.categoria_id, 1, active=event_data.fecha_fin >= date.today()
+        )
         db.commit()
         db.refresh(db_event)
+        
+        # El listado de categorías muestra la cantidad de eventos
+        response_cache.invalidate(
+            EVENT_LIST_NAMESPACE, CATEGORY_LIST_NAMESPACE, category_detail_namespace(db_event.categoria_id)
+        )
         return db_event
     
     @staticmethod
@@ -55,19 +80,6 @@ class EventService:
         today = date.today()
         return db.query(Event).filter(Event.fecha_fin >= today).all()
     
-    @staticmethod
-    def search_events(db: Session, search_term: str) -> List[Event]:
-        """
-        Busca eventos por nombre o descripción.
-        Cumple con el requisito: "Buscar eventos por nombre o descripción"
-        """
-        return db.query(Event).filter(
-            or_(
-                Event.nombre.ilike(f"%{search_term}%"),
-                Event.descripcion.ilike(f"%{search_term}%")
-            )
-        ).all()
-    
     @staticmethod
     def get_events_by_category(db: Session, category_id: int) -> List[Event]:
         """
@@ -76,25 +88,208 @@ class EventService:
         """
         return db.query(Event).filter(Event.categoria_id == category_id).all()
     
+    @staticmethod
+    def available_spots_expression():
+        """
+        Expresión SQL de los cupos disponibles a partir del contador de inscripciones.
+        Los cupos solo se descuentan mientras el evento no haya terminado.
+        """
+        return case(
+            (Event.fecha_fin >= date.today(), Event.cupos - Event.inscripciones_count),
+            else_=Event.cupos
+        )
+    
+    @staticmethod
+    def compute_available_spots(event: Event) -> int:
+        """
+        Cupos disponibles de un evento ya cargado (misma regla que available_spots_expression).
+        """
+        if event.fecha_fin >= date.today():
+            return event.cupos - event.inscripciones_count
+        return event.cupos
+    
+    @staticmethod
+    def listing_columns() -> Dict[str, Any]:
+        """
+        Expresión SQL de cada campo de EventListResponse.
+        El total de inscripciones y los cupos disponibles se leen del contador
+        inscripciones_count, sin agrupar ni recorrer las inscripciones.
+        """
+        return {
+            "id": Event.id,
+            "nombre": Event.nombre,
+            "descripcion": Event.descripcion,
+            "fecha_inicio": Event.fecha_inicio,
+            "fecha_fin": Event.fecha_fin,
+            "lugar": Event.lugar,
+            "cupos": Event.cupos,
+            "categoria_id": Event.categoria_id,
+            "categoria_nombre": Category.nombre,
+            "cupos_disponibles": EventService.available_spots_expression(),
+            "total_inscripciones": Event.inscripciones_count,
+        }
+    
+    @staticmethod
+    def _listing_query(db: Session, fields: Sequence[str], *extra_columns):
+        """
+        Consulta base de los listados: solo las columnas de los campos pedidos
+        (más las del cursor), cada una con el nombre del campo. La categoría
+        solo se une si se pidió categoria_nombre.
+        Cada fila trae primero los campos de `fields`, en orden, y luego las
+        columnas del cursor que falten y `extra_columns`.
+        """
+        columns = EventService.listing_columns()
+        query = db.query(
+            *(columns[name].label(name) for name in projection(fields, EventService.LISTING_KEY_FIELDS)),
+            *extra_columns
+        ).select_from(Event)
+        if "categoria_nombre" in fields:
+            query = query.join(Category, Event.categoria_id == Category.id)
+        return query
+    
+    @staticmethod
+    def get_event_listing(
+        db: Session,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        category_id: Optional[int] = None,
+        only_active: bool = False,
+        fields: Sequence[str] = EVENT_LIST_FIELDS
+    ) -> Tuple[List, Optional[str]]:
+        """
+        Motor de listados de eventos.
+        Devuelve en una sola consulta cada evento junto con el nombre
+        de su categoría, el total de inscripciones y los cupos disponibles,
+        evitando las consultas por fila en los endpoints de listado.
+        Con `fields` se consultan solo esas columnas (ver _listing_query).
+        Pagina por clave sobre (fecha_inicio, id) y devuelve el cursor de la
+        página siguiente (None si no hay más resultados).
+        """
+        query = EventService._listing_query(db, fields)
+        
+        if category_id is not None:
+            query = query.filter(Event.categoria_id == category_id)
+        if only_active:
+            query = query.filter(Event.fecha_fin >= date.today())
+        
+        after = decode_cursor(cursor, EventService.LISTING_CURSOR_TYPES)
+        rows = apply_keyset(query, [Event.fecha_inicio, Event.id], after, limit).all()
+        
+        return split_page(rows, limit, lambda row: (row.fecha_inicio, row.id))
+    
+    @staticmethod
+    def export_statement(
+        fields: Sequence[str] = EVENT_LIST_FIELDS,
+        category_id: Optional[int] = None,
+        only_active: bool = False,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None
+    ) -> Select:
+        """
+        Consulta de la exportación de eventos: las mismas columnas que los
+        listados, ordenadas por (fecha_inicio, id) y sin límite, para
+        recorrerla con un cursor del servidor (ver app.utils.export).
+        `date_from`/`date_to` filtran por fecha de inicio (inclusive).
+        """
+        columns = EventService.listing_columns()
+        statement = select(*(columns[name].label(name) for name in fields)).select_from(Event)
+        if "categoria_nombre" in fields:
+            statement = statement.join(Category, Event.categoria_id == Category.id)
+        
+        if category_id is not None:
+            statement = statement.where(Event.categoria_id == category_id)
+        if only_active:
+            statement = statement.where(Event.fecha_fin >= date.today())
+        if date_from is not None:
+            statement = statement.where(Event.fecha_inicio >= date_from)
+        if date_to is not None:
+            statement = statement.where(Event.fecha_inicio <= date_to)
+        return statement.order_by(Event.fecha_inicio, Event.id)
+    
+    @staticmethod
+    def search_events(
+        db: Session,
+        search_term: str,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        fields: Sequence[str] = EVENT_LIST_FIELDS
+    ) -> Tuple[List, Optional[str]]:
+        """
+        Busca eventos por nombre o descripción.
+        Cumple con el requisito: "Buscar eventos por nombre o descripción"
+        Usa el índice de texto completo (EventSearchIndex) y ordena por relevancia;
+        el ranking y la paginación por cursor (rank, id) se resuelven en la base de datos.
+        Las filas tienen la misma forma que las de get_event_listing más `rank`.
+        """
+        matches = EventSearchIndex.ranked_matches(db, search_term)
+        if matches is None:
+            return [], None
+        
+        query = EventService._listing_query(db, fields, matches.c.rank).join(
+            matches, matches.c.event_id == Event.id
+        )
+        
+        after = decode_cursor(cursor, (float, int))
+        rows = apply_keyset(query, [matches.c.rank, Event.id], after, limit).all()
+        
+        return split_page(rows, limit, lambda row: (row.rank, row.id))
+    
     @staticmethod
     def get_event_available_spots(db: Session, event_id: int) -> int:
         """
         Calcula los cupos disponibles de un evento.
         cupos_disponibles = cupos_totales - inscripciones_activas
+        Lee el contador inscripciones_count en lugar de contar las inscripciones.
         """
-        event = db.query(Event).filter(Event.id == event_id).first()
-        if not event:
-            return 0
+        available_spots = db.query(
+            EventService.available_spots_expression()
+        ).filter(Event.id == event_id).scalar()
         
-        # Contar inscripciones activas (eventos que aún no terminaron)
-        inscriptions_count = db.query(Inscription).filter(
-            and_(
-                Inscription.evento_id == event_id,
-                Event.fecha_fin >= date.today()
-            )
-        ).join(Event).count()
+        return available_spots or 0
+    
+    @staticmethod
+    def get_event_version(db: Session, event_id: int) -> Optional[Tuple[int, int]]:
+        """
+        Obtiene solo las versiones del evento y de su categoría (para ETags),
+        sin cargar el evento completo. Devuelve None si el evento no existe.
+        """
+        return db.query(Event.version, Category.version).join(
+            Category, Event.categoria_id == Category.id
+        ).filter(Event.id == event_id).first()
+    
+    @staticmethod
+    def adjust_inscription_count(db: Session, event_id: int, delta: int) -> None:
+        """
+        Suma `delta` al contador de inscripciones de un evento y aumenta su versión.
+        Se ejecuta como UPDATE atómico dentro de la transacción de quien lo llama
+        (no hace commit), para que contador e inscripción se confirmen juntos.
+        """
+        db.query(Event).filter(Event.id == event_id).update(
+            {
+                Event.inscripciones_count: Event.inscripciones_count + delta,
+                Event.version: Event.version + 1
+            },
+            synchronize_session=False
+        )
+    
+    @staticmethod
+    def reconcile_inscription_counts(db: Session) -> int:
+        """
+        Recalcula en bloque el contador de inscripciones de todos los eventos
+        a partir de la tabla de inscripciones. Devuelve la cantidad de eventos corregidos.
+        """
+        actual_count = db.query(func.count(Inscription.id)).filter(
+            Inscription.evento_id == Event.id
+        ).scalar_subquery()
         
-        return event.cupos - inscriptions_count
+        corrected = db.query(Event).filter(
+            Event.inscripciones_count != actual_count
+        ).update(
+            {Event.inscripciones_count: actual_count, Event.version: Event.version + 1},
+            synchronize_session=False
+        )
+        db.commit()
+        return corrected
     
     @staticmethod
     def update_event(db: Session, event_id: int, event_data: EventUpdate) -> Optional[Event]:
@@ -105,12 +300,35 @@ class EventService:
         if not db_event:
             return None
         
+        previous_category_id = db_event.categoria_id
+        was_active = db_event.fecha_fin >= date.today()
         update_data = event_data.dict(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_event, field, value)
+        db_event.version = Event.version + 1
+        
+        CategoryService.bump_version(db, previous_category_id)
+        if db_event.categoria_id != previous_category_id:
+            CategoryService.bump_version(db, db_event.categoria_id)
+        StatsService.move_event(
+            db,
+            previous_category_id,
+            db_event.categoria_id,
+            db_event.inscripciones_count,
+            was_active,
+            db_event.fecha_fin >= date.today()
+        )
         
         db.commit()
         db.refresh(db_event)
+        
+        response_cache.invalidate(
+            EVENT_LIST_NAMESPACE,
+            CATEGORY_LIST_NAMESPACE,
+            event_detail_namespace(event_id),
+            category_detail_namespace(previous_category_id),
+            category_detail_namespace(db_event.categoria_id)
+        )
         return db_event
     
     @staticmethod
@@ -123,8 +341,18 @@ class EventService:
         if not db_event:
             return False
         
+        category_id = db_event.categoria_id
         db.delete(db_event)
+        CategoryService.bump_version(db, category_id)
+        StatsService.record_events(db, category_id, -1, active=db_event.fecha_fin >= date.today())
         db.commit()
+        
+        response_cache.invalidate(
+            EVENT_LIST_NAMESPACE,
+            CATEGORY_LIST_NAMESPACE,
+            event_detail_namespace(event_id),
+            category_detail_namespace(category_id)
+        )
         return True
     
     # Métodos para Dashboard
@@ -142,25 +370,17 @@ class EventService:
         Evento con más inscripciones.
         Para Dashboard: "Evento con más inscripciones"
         """
-        result = db.query(
-            Event.id,
-            func.count(Inscription.id).label('inscription_count')
-        ).join(Inscription).group_by(Event.id).order_by(
-            func.count(Inscription.id).desc()
+        return db.query(Event).filter(Event.inscripciones_count > 0).order_by(
+            Event.inscripciones_count.desc()
         ).first()
-        
-        if result:
-            return db.query(Event).filter(Event.id == result.id).first()
-        return None
     
     @staticmethod
     def get_average_inscriptions_per_event(db: Session) -> float:
         """
         Promedio de usuarios inscritos en cada evento.
         Para Dashboard: "Promedio de usuarios inscritos en cada evento"
+        Promedia el contador de cada evento (el dashboard usa StatsService.get_summary).
         """
-        result = db.query(
-            func.avg(func.count(Inscription.id))
-        ).join(Event).group_by(Event.id).scalar()
+        result = db.query(func.avg(Event.inscripciones_count)).scalar()
         
-        return result or 0.0
\ No newline at end of file
+        return float(result or 0.0)
\ No newline at end of file
@@ -1,11 +1,54 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, select
+from sqlalchemy.sql import Select
+from sqlalchemy.exc import IntegrityError
+from fastapi import HTTPException, status
 from app.models.inscription import Inscription
 from app.models.event import Event
+from app.models.user import User
 from app.schemas.inscription import InscriptionCreate
 from app.services.event_service import EventService
+from app.services.stats_service import StatsService
+from app.utils.cache import response_cache, EVENT_LIST_NAMESPACE, event_detail_namespace
+from app.utils.pagination import decode_cursor, apply_keyset, split_page
 from datetime import date
-from typing import Optional, List
+from typing import Optional, List, Tuple
+
+class InscriptionError(Exception):
+    """
+    Error de negocio al crear una inscripción.
+    `reason` identifica la causa para que cada capa la traduzca a su respuesta.
+    """
+    
+    EVENT_NOT_FOUND = "evento_no_encontrado"
+    EVENT_FINISHED = "evento_finalizado"
+    ALREADY_REGISTERED = "ya_inscrito"
+    NO_SPOTS = "sin_cupos"
+    
+    MESSAGES = {
+        EVENT_NOT_FOUND: "Evento no encontrado",
+        EVENT_FINISHED: "El evento ya finalizó",
+        ALREADY_REGISTERED: "El usuario ya está inscrito en este evento",
+        NO_SPOTS: "No hay cupos disponibles para este evento",
+    }
+    
+    STATUS_CODES = {
+        EVENT_NOT_FOUND: status.HTTP_404_NOT_FOUND,
+        EVENT_FINISHED: status.HTTP_400_BAD_REQUEST,
+        ALREADY_REGISTERED: status.HTTP_409_CONFLICT,
+        NO_SPOTS: status.HTTP_409_CONFLICT,
+    }
+    
+    def __init__(self, reason: str):
+        self.reason = reason
+        super().__init__(self.MESSAGES[reason])
+    
+    def to_http_exception(self) -> HTTPException:
+        """Convertir el error en la HTTPException correspondiente"""
+        return HTTPException(
+            status_code=self.STATUS_CODES[self.reason],
+            detail=self.MESSAGES[self.reason]
+        )
 
 class InscriptionService:
     """
@@ -21,43 +64,113 @@ class InscriptionService:
         """
         Crea una nueva inscripción verificando disponibilidad de cupos.
         Cumple con el requisito: "verificar previamente la disponibilidad del cupo"
+        Devuelve None si no se pudo inscribir; usar reserve_seat para conocer el motivo.
         """
-        # Verificar que el evento existe
-        event = EventService.get_event_by_id(db, inscription_data.evento_id)
-        if not event:
-            return None
-        
-        # Verificar que el evento no haya terminado
-        if event.fecha_fin < date.today():
+        try:
+            return InscriptionService.reserve_seat(db, inscription_data.evento_id, user_id)
+        except InscriptionError:
             return None
+    
+    @staticmethod
+    def reserve_seat(db: Session, event_id: int, user_id: int) -> Inscription:
+        """
+        Reserva un cupo e inscribe al usuario de forma atómica.
+        El cupo se toma con un único UPDATE condicional sobre el contador del
+        evento (solo si el evento sigue activo y quedan cupos) y la inscripción
+        queda protegida por la restricción única (evento_id, usuario_id), por lo
+        que dos pedidos concurrentes nunca pueden sobrevender ni duplicar.
+        Lanza InscriptionError con el motivo si no se pudo inscribir.
+        """
+        try:
+            db_inscription = InscriptionService._reserve_seat(db, event_id, user_id)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
         
-        # Verificar que el usuario no esté ya inscrito
-        existing_inscription = db.query(Inscription).filter(
-            and_(
-                Inscription.evento_id == inscription_data.evento_id,
-                Inscription.usuario_id == user_id
-            )
-        ).first()
+        InscriptionService._invalidate_event_cache(event_id)
+        db.refresh(db_inscription)
+        return db_inscription
+    
+    @staticmethod
+    def _reserve_seat(db: Session, event_id: int, user_id: int) -> Inscription:
+        """
+        Pasos de reserve_seat sin confirmar la transacción.
+        Si lanza una excepción, quien llama debe hacer rollback.
+        """
+        today = date.today()
         
-        if existing_inscription:
-            return None
+        # Tomar el cupo: el UPDATE solo afecta la fila si todavía hay lugar
+        reserved = db.query(Event).filter(
+            Event.id == event_id,
+            Event.fecha_fin >= today,
+            Event.inscripciones_count < Event.cupos
+        ).update(
+            {
+                Event.inscripciones_count: Event.inscripciones_count + 1,
+                Event.version: Event.version + 1
+            },
+            synchronize_session=False
+        )
         
-        # Verificar cupos disponibles
-        available_spots = EventService.get_event_available_spots(db, inscription_data.evento_id)
-        if available_spots <= 0:
-            return None
+        if not reserved:
+            raise InscriptionError(
+                InscriptionService._reservation_failure_reason(db, event_id, user_id)
+            )
         
-        # Crear la inscripción
         db_inscription = Inscription(
-            evento_id=inscription_data.evento_id,
+            evento_id=event_id,
             usuario_id=user_id,
-            fecha_inscripcion=date.today()
+            fecha_inscripcion=today
         )
         db.add(db_inscription)
-        db.commit()
-        db.refresh(db_inscription)
+        
+        try:
+            db.flush()
+        except IntegrityError as exc:
+            if InscriptionService._is_duplicate_error(exc):
+                raise InscriptionError(InscriptionError.ALREADY_REGISTERED) from exc
+            raise
+        
+        # El UPDATE anterior garantiza que el evento está activo
+        StatsService.record_inscription(db, event_id, 1, active=True)
         return db_inscription
     
+    @staticmethod
+    def _is_duplicate_error(exc: IntegrityError) -> bool:
+        """Verificar si el error proviene de la restricción única (evento_id, usuario_id)"""
+        message = str(exc.orig)
+        return "uq_inscripciones_evento_usuario" in message or (
+            "inscripciones.evento_id" in message and "inscripciones.usuario_id" in message
+        )
+    
+    @staticmethod
+    def _invalidate_event_cache(event_id: int) -> None:
+        """Invalidar las respuestas cacheadas que muestran los cupos del evento"""
+        response_cache.invalidate(EVENT_LIST_NAMESPACE, event_detail_namespace(event_id))
+    
+    @staticmethod
+    def _is_registered(db: Session, event_id: int, user_id: int) -> bool:
+        """Verificar si el usuario ya está inscrito en el evento"""
+        return db.query(Inscription.id).filter(
+            and_(
+                Inscription.evento_id == event_id,
+                Inscription.usuario_id == user_id
+            )
+        ).first() is not None
+    
+    @staticmethod
+    def _reservation_failure_reason(db: Session, event_id: int, user_id: int) -> str:
+        """Determinar por qué el UPDATE condicional no pudo tomar el cupo"""
+        event = db.query(Event.fecha_fin).filter(Event.id == event_id).first()
+        if not event:
+            return InscriptionError.EVENT_NOT_FOUND
+        if event.fecha_fin < date.today():
+            return InscriptionError.EVENT_FINISHED
+        if InscriptionService._is_registered(db, event_id, user_id):
+            return InscriptionError.ALREADY_REGISTERED
+        return InscriptionError.NO_SPOTS
+    
     @staticmethod
     def get_inscription_by_id(db: Session, inscription_id: int) -> Optional[Inscription]:
         """
@@ -89,6 +202,46 @@ class InscriptionService:
             Inscription.usuario_id == user_id
         ).order_by(Inscription.fecha_inscripcion.desc()).all()
     
+    @staticmethod
+    def _event_attendees_select(event_id: int) -> Select:
+        """
+        Inscriptos de un evento con el nombre y email de cada usuario, unidos
+        en la misma consulta; las columnas siguen EventInscriptionResponse.
+        """
+        return select(
+            Inscription.id.label("id"),
+            Inscription.usuario_id.label("usuario_id"),
+            User.nombre.label("usuario_nombre"),
+            User.email.label("usuario_email"),
+            Inscription.fecha_inscripcion.label("fecha_inscripcion")
+        ).join(User, Inscription.usuario_id == User.id).where(
+            Inscription.evento_id == event_id
+        )
+    
+    @staticmethod
+    def event_attendees_statement(event_id: int) -> Select:
+        """Todos los inscriptos de un evento ordenados por ID de inscripción (para exportar)"""
+        return InscriptionService._event_attendees_select(event_id).order_by(Inscription.id)
+    
+    @staticmethod
+    def get_event_attendees_page(
+        db: Session,
+        event_id: int,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List, Optional[str]]:
+        """
+        Una página de inscriptos de un evento (con los datos de cada usuario)
+        en una sola consulta, paginada por clave sobre el ID de inscripción.
+        Devuelve las filas y el cursor de la página siguiente.
+        """
+        after = decode_cursor(cursor, (int,))
+        statement = apply_keyset(
+            InscriptionService._event_attendees_select(event_id), [Inscription.id], after, limit
+        )
+        rows = db.execute(statement).all()
+        return split_page(rows, limit, lambda row: (row.id,))
+    
     @staticmethod
     def get_event_inscriptions(db: Session, event_id: int) -> List[Inscription]:
         """
@@ -102,18 +255,12 @@ class InscriptionService:
         Cancela una inscripción (elimina).
         Verifica que la inscripción pertenezca al usuario.
         """
-        db_inscription = db.query(Inscription).filter(
-            and_(
-                Inscription.id == inscription_id,
-                Inscription.usuario_id == user_id
-            )
-        ).first()
-        
-        if not db_inscription:
+        event_id = InscriptionService._remove_inscription(db, inscription_id, user_id)
+        if event_id is None:
             return False
-        
-        db.delete(db_inscription)
         db.commit()
+        
+        InscriptionService._invalidate_event_cache(event_id)
         return True
     
     @staticmethod
@@ -121,14 +268,38 @@ class InscriptionService:
         """
         Elimina una inscripción (para administradores).
         """
-        db_inscription = db.query(Inscription).filter(Inscription.id == inscription_id).first()
-        if not db_inscription:
+        event_id = InscriptionService._remove_inscription(db, inscription_id)
+        if event_id is None:
             return False
-        
-        db.delete(db_inscription)
         db.commit()
+        
+        InscriptionService._invalidate_event_cache(event_id)
         return True
     
+    @staticmethod
+    def _remove_inscription(db: Session, inscription_id: int, user_id: Optional[int] = None) -> Optional[int]:
+        """
+        Elimina la inscripción y libera el cupo sin confirmar la transacción.
+        Si se indica user_id, solo la elimina si pertenece a ese usuario.
+        Devuelve el id del evento, o None si la inscripción no existe.
+        """
+        query = db.query(Inscription).filter(Inscription.id == inscription_id)
+        if user_id is not None:
+            query = query.filter(Inscription.usuario_id == user_id)
+        db_inscription = query.first()
+        
+        if not db_inscription:
+            return None
+        
+        event_id = db_inscription.evento_id
+        event_end = db.query(Event.fecha_fin).filter(Event.id == event_id).scalar()
+        db.delete(db_inscription)
+        EventService.adjust_inscription_count(db, event_id, -1)
+        StatsService.record_inscription(
+            db, event_id, -1, active=event_end is not None and event_end >= date.today()
+        )
+        return event_id
+    
     # Métodos para Dashboard
     @staticmethod
     def get_total_active_inscriptions_count(db: Session) -> int:
@@ -0,0 +1,267 @@
+# app/services/inscription_writer.py
+import os
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
+from dotenv import load_dotenv
+from app.database import (
+    DATABASE_URL, engine, env_flag,
+    is_sqlite, is_memory_database, build_engine_options, configure_sqlite
+)
+from app.models.inscription import Inscription
+from app.services.inscription_service import InscriptionService
+from app.utils.metrics import metrics
+
+# Cargar variables de entorno
+load_dotenv()
+
+logger = logging.getLogger("uvicorn.error")
+
+# Activar el escritor único con group commit (si no, cada pedido confirma su propia transacción)
+INSCRIPTION_GROUP_COMMIT = env_flag("INSCRIPTION_GROUP_COMMIT", "False")
+# Máximo de operaciones confirmadas en una misma transacción
+INSCRIPTION_BATCH_MAX_SIZE = int(os.getenv("INSCRIPTION_BATCH_MAX_SIZE", "128"))
+# Milisegundos que se espera a que lleguen más operaciones antes de confirmar un lote incompleto
+INSCRIPTION_BATCH_MAX_WAIT_MS = float(os.getenv("INSCRIPTION_BATCH_MAX_WAIT_MS", "2"))
+# Operaciones que pueden esperar en cola; con la cola llena se responde 503
+INSCRIPTION_QUEUE_SIZE = int(os.getenv("INSCRIPTION_QUEUE_SIZE", "4096"))
+INSCRIPTION_RETRY_AFTER = os.getenv("INSCRIPTION_RETRY_AFTER", "1")
+
+class _WriteOperation:
+    """Operación encolada: función a aplicar sobre la sesión del escritor y futuro de quien la pidió"""
+    
+    __slots__ = ("function", "args", "future")
+    
+    def __init__(self, function: Callable, args: tuple, future: asyncio.Future):
+        self.function = function
+        self.args = args
+        self.future = future
+
+def _reserve(db: Session, event_id: int, user_id: int) -> Tuple[Inscription, int]:
+    return InscriptionService._reserve_seat(db, event_id, user_id), event_id
+
+def _remove(db: Session, inscription_id: int, user_id: Optional[int]) -> Tuple[bool, Optional[int]]:
+    event_id = InscriptionService._remove_inscription(db, inscription_id, user_id)
+    return event_id is not None, event_id
+
+class InscriptionWriter:
+    """
+    Escritor único para las inscripciones (group commit).
+    Los pedidos de inscripción y cancelación se encolan y una sola tarea los
+    aplica en lotes: cada operación corre en su propio SAVEPOINT (un error de
+    negocio solo descarta esa operación) y el lote entero se confirma con un
+    único COMMIT, es decir, un solo fsync y una sola toma del lock de escritura
+    de SQLite para muchas inscripciones. Cada pedido recibe su propio resultado
+    o excepción.
+    
+    Desactivado (INSCRIPTION_GROUP_COMMIT=False) o antes de start(), cada
+    operación se ejecuta con InscriptionService en su propia transacción,
+    sobre la sesión del pedido (la misma que usó la autenticación: un
+    pedido nunca toma dos conexiones del pool).
+    """
+    
+    def __init__(
+        self,
+        enabled: bool = INSCRIPTION_GROUP_COMMIT,
+        max_batch_size: int = INSCRIPTION_BATCH_MAX_SIZE,
+        max_wait_ms: float = INSCRIPTION_BATCH_MAX_WAIT_MS,
+        queue_size: int = INSCRIPTION_QUEUE_SIZE,
+    ):
+        self.enabled = enabled
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self.queue_size = queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._engine: Optional[Engine] = None
+        self._session_factory: Optional[sessionmaker] = None
+        self.batches = 0
+        self.operations = 0
+        self.largest_batch = 0
+        self.rejected = 0
+    
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+    
+    def _build_engine(self) -> Engine:
+        # Con pysqlite, SAVEPOINT solo funciona si SQLAlchemy controla el BEGIN;
+        # IMMEDIATE además toma el lock de escritura al empezar cada lote
+        if is_sqlite(DATABASE_URL) and not is_memory_database(DATABASE_URL):
+            writer_engine = create_engine(DATABASE_URL, **build_engine_options(DATABASE_URL))
+            configure_sqlite(writer_engine, transaction_mode="immediate")
+            return writer_engine
+        return engine
+    
+    async def start(self) -> None:
+        """Iniciar la tarea escritora (una por proceso)"""
+        if not self.enabled or self.running:
+            return
+        self._engine = self._build_engine()
+        self._session_factory = sessionmaker(
+            bind=self._engine, autoflush=False, expire_on_commit=False
+        )
+        # Un solo hilo: las transacciones del escritor nunca se solapan
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inscription-writer")
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            "Escritor de inscripciones iniciado (lote máximo %s, espera %s ms)",
+            self.max_batch_size, self.max_wait * 1000
+        )
+    
+    async def stop(self) -> None:
+        """Aplicar las operaciones que quedan en cola y detener la tarea"""
+        if not self.running:
+            return
+        task, self._task = self._task, None
+        # Las operaciones pedidas a partir de ahora usan el camino directo
+        await self._queue.put(None)
+        await task
+        self._executor.shutdown(wait=True)
+        self._executor = None
+        if self._engine is not engine:
+            self._engine.dispose()
+        self._engine = None
+    
+    async def reserve_seat(self, db: AsyncSession, event_id: int, user_id: int) -> Inscription:
+        """Inscribir al usuario (lanza InscriptionError con el motivo si no se pudo)"""
+        if not self.running:
+            inscription = await db.run_sync(InscriptionService.reserve_seat, event_id, user_id)
+        else:
+            inscription = await self._submit(_reserve, event_id, user_id)
+        metrics.inc("inscriptions_created_total")
+        return inscription
+    
+    async def cancel_inscription(self, db: AsyncSession, inscription_id: int, user_id: int) -> bool:
+        """Cancelar una inscripción del usuario (False si no existe o no es suya)"""
+        if not self.running:
+            removed = await db.run_sync(InscriptionService.cancel_inscription, inscription_id, user_id)
+        else:
+            removed = await self._submit(_remove, inscription_id, user_id)
+        if removed:
+            metrics.inc("inscriptions_cancelled_total")
+        return removed
+    
+    async def delete_inscription(self, db: AsyncSession, inscription_id: int) -> bool:
+        """Eliminar cualquier inscripción (administradores)"""
+        if not self.running:
+            removed = await db.run_sync(InscriptionService.delete_inscription, inscription_id)
+        else:
+            removed = await self._submit(_remove, inscription_id, None)
+        if removed:
+            metrics.inc("inscriptions_cancelled_total")
+        return removed
+    
+    async def _submit(self, function: Callable, *args: Any) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait(_WriteOperation(function, args, future))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="El servidor está ocupado, intente nuevamente en unos segundos",
+                headers={"Retry-After": INSCRIPTION_RETRY_AFTER},
+            )
+        # Si el cliente se desconecta, la operación ya encolada se aplica igual
+        return await asyncio.shield(future)
+    
+    async def _next_batch(self) -> Tuple[List[_WriteOperation], bool]:
+        """Esperar la primera operación y juntar las que lleguen hasta llenar el lote o agotar la espera"""
+        loop = asyncio.get_running_loop()
+        first = await self._queue.get()
+        if first is None:
+            return [], True
+        batch = [first]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            try:
+                # Lo que ya está en cola entra sin esperar
+                operation = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    operation = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            if operation is None:
+                return batch, True
+            batch.append(operation)
+        return batch, False
+    
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            batch, stopping = await self._next_batch()
+            if not batch:
+                continue
+            try:
+                outcomes = await loop.run_in_executor(self._executor, self._apply_batch, batch)
+            except Exception as exc:
+                outcomes = [(None, exc)] * len(batch)
+            for operation, (result, error) in zip(batch, outcomes):
+                if operation.future.done():
+                    continue
+                if error is not None:
+                    operation.future.set_exception(error)
+                else:
+                    operation.future.set_result(result)
+    
+    def _apply_batch(self, batch: List[_WriteOperation]) -> List[Tuple[Any, Optional[BaseException]]]:
+        """Aplicar el lote en una transacción (un SAVEPOINT por operación) y confirmarlo una sola vez"""
+        outcomes: List[Tuple[Any, Optional[BaseException]]] = []
+        event_ids = set()
+        db = self._session_factory()
+        try:
+            for operation in batch:
+                try:
+                    with db.begin_nested():
+                        result, event_id = operation.function(db, *operation.args)
+                except Exception as exc:
+                    outcomes.append((None, exc))
+                    continue
+                outcomes.append((result, None))
+                if event_id is not None:
+                    event_ids.add(event_id)
+            db.commit()
+        except Exception as exc:
+            # Falló el COMMIT: ninguna operación del lote quedó guardada
+            db.rollback()
+            logger.exception("No se pudo confirmar un lote de %s inscripciones", len(batch))
+            return [(None, exc)] * len(batch)
+        finally:
+            db.close()
+        
+        for event_id in event_ids:
+            InscriptionService._invalidate_event_cache(event_id)
+        self.batches += 1
+        self.operations += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        return outcomes
+    
+    def stats(self) -> Dict[str, Any]:
+        """Estado del escritor (lotes confirmados, tamaño medio y cola)"""
+        return {
+            "enabled": self.enabled,
+            "running": self.running,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "batches": self.batches,
+            "operations": self.operations,
+            "largest_batch": self.largest_batch,
+            "average_batch": round(self.operations / self.batches, 2) if self.batches else 0,
+            "rejected": self.rejected,
+        }
+
+# Instancia compartida por toda la aplicación
+inscription_writer = InscriptionWriter()
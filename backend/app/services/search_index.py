@@ -0,0 +1,85 @@
+import re
+from sqlalchemy import text, or_, case, func, literal, Integer, Float
+from sqlalchemy.orm import Session
+from app.models.event import Event
+
+# Palabras de la búsqueda (letras y números, incluyendo acentos y ñ)
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Peso relativo de cada columna en el ranking BM25: (nombre, descripcion)
+BM25_WEIGHTS = (10.0, 1.0)
+
+FTS_TABLE = "eventos_fts"
+
+class EventSearchIndex:
+    """
+    Índice de búsqueda de texto completo para eventos.
+    - SQLite: tabla virtual FTS5 sincronizada con `eventos` mediante triggers
+      (las crea la migración 0004), con ranking BM25 y búsqueda por prefijo.
+    - PostgreSQL: to_tsvector/to_tsquery con configuración 'spanish' y ts_rank.
+    - Otros motores: ILIKE, priorizando coincidencias en el nombre.
+    """
+    
+    @staticmethod
+    def tokenize(search_term: str) -> list:
+        """Separar el término de búsqueda en palabras"""
+        return TOKEN_PATTERN.findall(search_term or "")
+    
+    @staticmethod
+    def is_fts_available(db: Session) -> bool:
+        """Verificar si la tabla FTS5 existe en la base de datos actual"""
+        if db.get_bind().dialect.name != "sqlite":
+            return False
+        return db.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": FTS_TABLE}
+        ).first() is not None
+    
+    @staticmethod
+    def ranked_matches(db: Session, search_term: str):
+        """
+        Devuelve una subconsulta o CTE (event_id, rank) con los eventos que coinciden
+        con la búsqueda, donde un rank menor indica mayor relevancia.
+        Cada palabra se busca como prefijo y todas deben aparecer.
+        Devuelve None si el término no contiene palabras.
+        """
+        tokens = EventSearchIndex.tokenize(search_term)
+        if not tokens:
+            return None
+        
+        dialect = db.get_bind().dialect.name
+        
+        if EventSearchIndex.is_fts_available(db):
+            # Cada token va entre comillas para que no se interprete como sintaxis FTS5
+            match = " ".join('"{}"*'.format(token.replace('"', '""')) for token in tokens)
+            weights = ", ".join(str(weight) for weight in BM25_WEIGHTS)
+            # MATERIALIZED evita que SQLite aplane la subconsulta dentro de la
+            # consulta del listado, contexto en el que bm25() no puede evaluarse
+            return text(
+                f"SELECT rowid AS event_id, bm25({FTS_TABLE}, {weights}) AS rank "
+                f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match"
+            ).bindparams(match=match).columns(
+                event_id=Integer, rank=Float
+            ).cte("busqueda").prefix_with("MATERIALIZED")
+        
+        if dialect == "postgresql":
+            document = func.to_tsvector(
+                "spanish",
+                func.coalesce(Event.nombre, "") + " " + func.coalesce(Event.descripcion, "")
+            )
+            query = func.to_tsquery("spanish", " & ".join(f"{token}:*" for token in tokens))
+            return db.query(
+                Event.id.label("event_id"),
+                (-func.ts_rank(document, query)).label("rank")
+            ).filter(document.op("@@")(query)).subquery("busqueda")
+        
+        # Búsqueda sin índice: primero las coincidencias en el nombre
+        conditions = [
+            or_(Event.nombre.ilike(f"%{token}%"), Event.descripcion.ilike(f"%{token}%"))
+            for token in tokens
+        ]
+        name_match = case((Event.nombre.ilike(f"%{tokens[0]}%"), literal(0.0)), else_=literal(1.0))
+        return db.query(
+            Event.id.label("event_id"),
+            name_match.label("rank")
+        ).filter(*conditions).subquery("busqueda")
@@ -0,0 +1,318 @@
+import os
+import asyncio
+import logging
+from datetime import date
+from typing import Any, Dict, List, Optional, Union
+from sqlalchemy import select, insert, update, delete, func, case
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from app.database import AsyncSessionLocal
+from app.models.event import Event
+from app.models.category import Category
+from app.models.inscription import Inscription
+from app.models.stats import StatsCounter, CategoryStats
+
+# Cargar variables de entorno
+load_dotenv()
+
+# Segundos entre reconciliaciones de los contadores del dashboard (0 = desactivado)
+STATS_RECONCILE_INTERVAL = float(os.getenv("STATS_RECONCILE_INTERVAL", "3600"))
+
+logger = logging.getLogger("uvicorn.error")
+
+# Claves de contadores_resumen
+EVENTS_TOTAL = "eventos_total"
+EVENTS_ACTIVE = "eventos_activos"
+INSCRIPTIONS_TOTAL = "inscripciones_total"
+INSCRIPTIONS_ACTIVE = "inscripciones_activas"
+# Día (ordinal) para el que se calcularon los contadores de activos: los
+# eventos dejan de estar activos al pasar su fecha de fin sin que haya una escritura
+ACTIVE_AS_OF = "activos_calculados_el"
+
+class StatsService:
+    """
+    Service de los agregados del dashboard.
+    Se conecta con:
+    - Models: StatsCounter (contadores_resumen), CategoryStats (resumen_categorias)
+    - Services: EventService, InscriptionService, CategoryService y la
+      importación de eventos, que llaman a los métodos record_* dentro de
+      su transacción (no hacen commit)
+    El dashboard lee los contadores en lugar de recorrer eventos e
+    inscripciones; reconcile los recalcula desde las tablas para corregir
+    cualquier desvío.
+    """
+    
+    @staticmethod
+    def _add_counters(db: Session, deltas: Dict[str, int]) -> None:
+        """Sumar los deltas a los contadores globales con un único UPDATE"""
+        deltas = {key: delta for key, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        db.execute(
+            update(StatsCounter)
+            .where(StatsCounter.clave.in_(list(deltas)))
+            .values(valor=StatsCounter.valor + case(deltas, value=StatsCounter.clave, else_=0))
+        )
+    
+    @staticmethod
+    def _add_category(db: Session, category_id, events: int = 0, inscriptions: int = 0) -> None:
+        """`category_id` puede ser un valor o una subconsulta escalar"""
+        if not (events or inscriptions):
+            return
+        db.execute(
+            update(CategoryStats)
+            .where(CategoryStats.categoria_id == category_id)
+            .values(
+                eventos=CategoryStats.eventos + events,
+                inscripciones=CategoryStats.inscripciones + inscriptions
+            )
+        )
+    
+    @staticmethod
+    def record_events(db: Session, category_id: int, delta: int, active: bool) -> None:
+        """Registrar `delta` eventos creados (o eliminados, si es negativo) en una categoría"""
+        StatsService._add_counters(db, {
+            EVENTS_TOTAL: delta,
+            EVENTS_ACTIVE: delta if active else 0,
+        })
+        StatsService._add_category(db, category_id, events=delta)
+    
+    @staticmethod
+    def move_event(
+        db: Session,
+        from_category: int,
+        to_category: int,
+        inscriptions: int,
+        was_active: bool,
+        is_active: bool
+    ) -> None:
+        """Registrar el cambio de categoría o de fecha de fin de un evento con sus inscripciones"""
+        if from_category != to_category:
+            StatsService._add_category(db, from_category, events=-1, inscriptions=-inscriptions)
+            StatsService._add_category(db, to_category, events=1, inscriptions=inscriptions)
+        if was_active != is_active:
+            sign = 1 if is_active else -1
+            StatsService._add_counters(db, {
+                EVENTS_ACTIVE: sign,
+                INSCRIPTIONS_ACTIVE: sign * inscriptions,
+            })
+    
+    @staticmethod
+    def record_inscription(db: Session, event_id: int, delta: int, active: bool) -> None:
+        """Registrar una inscripción creada (delta 1) o eliminada (delta -1) en un evento"""
+        StatsService._add_counters(db, {
+            INSCRIPTIONS_TOTAL: delta,
+            INSCRIPTIONS_ACTIVE: delta if active else 0,
+        })
+        category_id = select(Event.categoria_id).where(Event.id == event_id).scalar_subquery()
+        StatsService._add_category(db, category_id, inscriptions=delta)
+    
+    @staticmethod
+    def add_category(db: Session, category_id: int) -> None:
+        """Crear la fila de totales de una categoría nueva"""
+        db.add(CategoryStats(categoria_id=category_id, eventos=0, inscripciones=0))
+    
+    @staticmethod
+    def remove_category(db: Session, category_id: int) -> None:
+        """Eliminar la fila de totales de una categoría (antes de eliminar la categoría)"""
+        db.execute(delete(CategoryStats).where(CategoryStats.categoria_id == category_id))
+    
+    # Recalcular desde las tablas
+    
+    @staticmethod
+    def _active_values(db: Union[Session, Connection], today: date) -> Dict[str, int]:
+        """Eventos e inscripciones activos (fecha de fin >= hoy) calculados desde las tablas"""
+        active = Event.fecha_fin >= today
+        events_active = db.execute(select(func.count(Event.id)).where(active)).scalar()
+        inscriptions_active = db.execute(
+            select(func.count(Inscription.id)).join(Event, Inscription.evento_id == Event.id).where(active)
+        ).scalar()
+        return {
+            EVENTS_ACTIVE: events_active,
+            INSCRIPTIONS_ACTIVE: inscriptions_active,
+            ACTIVE_AS_OF: today.toordinal(),
+        }
+    
+    @staticmethod
+    def _store_counters(db: Union[Session, Connection], values: Dict[str, int]) -> int:
+        """Escribir los valores calculados; devuelve cuántos contadores cambiaron"""
+        stored = dict(db.execute(select(StatsCounter.clave, StatsCounter.valor)).all())
+        changed = 0
+        for key, value in values.items():
+            if key not in stored:
+                db.execute(insert(StatsCounter).values(clave=key, valor=value))
+            elif stored[key] != value:
+                db.execute(update(StatsCounter).where(StatsCounter.clave == key).values(valor=value))
+            else:
+                continue
+            # El día de cálculo cambia solo: no es un desvío
+            if key != ACTIVE_AS_OF:
+                changed += 1
+        return changed
+    
+    @staticmethod
+    def rebuild(db: Union[Session, Connection]) -> int:
+        """
+        Recalcular todos los agregados a partir de eventos e inscripciones, sin
+        confirmar la transacción (sirve con una sesión o con la conexión de una
+        migración). Devuelve cuántos valores estaban desviados.
+        """
+        today = date.today()
+        values = StatsService._active_values(db, today)
+        values[EVENTS_TOTAL] = db.execute(select(func.count(Event.id))).scalar()
+        values[INSCRIPTIONS_TOTAL] = db.execute(select(func.count(Inscription.id))).scalar()
+        changed = StatsService._store_counters(db, values)
+        
+        # Totales por categoría en una sola consulta agrupada
+        event_counts = (
+            select(Event.categoria_id, func.count(Event.id).label("eventos"))
+            .group_by(Event.categoria_id)
+            .subquery()
+        )
+        inscription_counts = (
+            select(Event.categoria_id, func.count(Inscription.id).label("inscripciones"))
+            .join(Event, Inscription.evento_id == Event.id)
+            .group_by(Event.categoria_id)
+            .subquery()
+        )
+        computed = {
+            row.id: (row.eventos, row.inscripciones)
+            for row in db.execute(
+                select(
+                    Category.id,
+                    func.coalesce(event_counts.c.eventos, 0).label("eventos"),
+                    func.coalesce(inscription_counts.c.inscripciones, 0).label("inscripciones")
+                )
+                .outerjoin(event_counts, event_counts.c.categoria_id == Category.id)
+                .outerjoin(inscription_counts, inscription_counts.c.categoria_id == Category.id)
+            )
+        }
+        stored = {
+            row.categoria_id: (row.eventos, row.inscripciones)
+            for row in db.execute(select(CategoryStats.categoria_id, CategoryStats.eventos, CategoryStats.inscripciones))
+        }
+        for category_id, (events, inscriptions) in computed.items():
+            if category_id not in stored:
+                db.execute(insert(CategoryStats).values(
+                    categoria_id=category_id, eventos=events, inscripciones=inscriptions
+                ))
+            elif stored[category_id] != (events, inscriptions):
+                db.execute(
+                    update(CategoryStats)
+                    .where(CategoryStats.categoria_id == category_id)
+                    .values(eventos=events, inscripciones=inscriptions)
+                )
+            else:
+                continue
+            changed += 1
+        
+        orphaned = set(stored) - set(computed)
+        if orphaned:
+            db.execute(delete(CategoryStats).where(CategoryStats.categoria_id.in_(orphaned)))
+            changed += len(orphaned)
+        return changed
+    
+    @staticmethod
+    def reconcile(db: Session) -> int:
+        """Recalcular y confirmar todos los agregados; devuelve cuántos valores se corrigieron"""
+        changed = StatsService.rebuild(db)
+        db.commit()
+        return changed
+    
+    # Lectura para el dashboard
+    
+    @staticmethod
+    def get_summary(db: Session, top: int = 5) -> Dict[str, Any]:
+        """
+        Agregados del dashboard leídos de las tablas de resumen: no depende de
+        la cantidad de eventos ni de inscripciones (salvo el primer pedido de
+        cada día, que recalcula los activos).
+        Los eventos más populares salen del índice sobre inscripciones_count.
+        """
+        counters = dict(db.execute(select(StatsCounter.clave, StatsCounter.valor)).all())
+        today = date.today()
+        if counters.get(ACTIVE_AS_OF) != today.toordinal():
+            active = StatsService._active_values(db, today)
+            StatsService._store_counters(db, active)
+            db.commit()
+            counters.update(active)
+        
+        total_events = counters.get(EVENTS_TOTAL, 0)
+        total_inscriptions = counters.get(INSCRIPTIONS_TOTAL, 0)
+        
+        top_events = db.execute(
+            select(Event.id, Event.nombre, Event.inscripciones_count)
+            .where(Event.inscripciones_count > 0)
+            .order_by(Event.inscripciones_count.desc(), Event.id.desc())
+            .limit(top)
+        ).all()
+        categories = db.execute(
+            select(Category.id, Category.nombre, CategoryStats.eventos, CategoryStats.inscripciones)
+            .join(CategoryStats, CategoryStats.categoria_id == Category.id)
+            .order_by(Category.id)
+        ).all()
+        
+        most_popular: List[Dict[str, Any]] = [
+            {"id": event_id, "nombre": nombre, "total_inscripciones": count}
+            for event_id, nombre, count in top_events
+        ]
+        return {
+            "total_eventos": total_events,
+            "eventos_activos": counters.get(EVENTS_ACTIVE, 0),
+            "total_inscripciones": total_inscriptions,
+            "total_inscripciones_activas": counters.get(INSCRIPTIONS_ACTIVE, 0),
+            "promedio_inscripciones_por_evento": round(total_inscriptions / total_events, 2) if total_events else 0.0,
+            "evento_mas_popular": most_popular[0] if most_popular else None,
+            "eventos_mas_populares": most_popular,
+            "por_categoria": [
+                {
+                    "categoria_id": category_id,
+                    "categoria_nombre": nombre,
+                    "total_eventos": events,
+                    "total_inscripciones": inscriptions
+                }
+                for category_id, nombre, events, inscriptions in categories
+            ]
+        }
+
+class StatsReconciler:
+    """
+    Tarea periódica que recalcula los agregados del dashboard
+    (cada STATS_RECONCILE_INTERVAL segundos) y registra si había desvíos.
+    """
+    
+    def __init__(self, interval: float = STATS_RECONCILE_INTERVAL):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+    
+    async def reconcile_once(self) -> int:
+        async with AsyncSessionLocal() as db:
+            changed = await db.run_sync(StatsService.reconcile)
+        if changed:
+            logger.warning("Reconciliación de estadísticas: %s valor(es) corregido(s)", changed)
+        return changed
+    
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.reconcile_once()
+            except Exception:
+                logger.exception("Error al reconciliar las estadísticas")
+    
+    def start(self) -> None:
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+    
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+# Instancia compartida por toda la aplicación
+stats_reconciler = StatsReconciler()
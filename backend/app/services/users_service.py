@@ -1,15 +1,20 @@
 # app/services/user_service.py
+from sqlalchemy import and_, case
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
-from typing import List
+from typing import List, Optional, Sequence, Tuple
 from datetime import date
-from app.models import User, Inscription, Event, Category
+from app.models import User, UserRole, Inscription, Event, Category
 from app.schemas import (
     UserUpdate, 
-    ActiveInscriptionResponse, 
-    InscriptionHistoryResponse
+    ACTIVE_INSCRIPTION_FIELDS, 
+    INSCRIPTION_HISTORY_FIELDS,
+    USER_FIELDS
 )
 from app.utils.security import get_password_hash
+from app.utils.cache import user_cache
+from app.utils.fields import projection
+from app.utils.pagination import decode_cursor, apply_keyset, split_page
 
 class UserService:
     
@@ -30,92 +35,175 @@ class UserService:
         return db.query(User).offset(skip).limit(limit).all()
     
     @staticmethod
-    def update_user_profile(db: Session, current_user: User, user_update: UserUpdate) -> User:
-        """Actualizar el perfil del usuario"""
-        
-        # Verificar si el email ya existe (si se está cambiando)
-        if user_update.email and user_update.email != current_user.email:
-            existing_user = db.query(User).filter(User.email == user_update.email).first()
+    def get_users_listing(db: Session, skip: int = 0, limit: int = 100, fields: Sequence[str] = USER_FIELDS) -> List:
+        """
+        Listado de usuarios consultando solo las columnas de `fields`
+        (cada fila trae esos campos, en orden), sin cargar la contraseña.
+        """
+        columns = [getattr(User, name).label(name) for name in fields]
+        return db.query(*columns).order_by(User.id).offset(skip).limit(limit).all()
+    
+    @staticmethod
+    def check_email_available(db: Session, current_user: User, email: Optional[str]) -> None:
+        """Verificar que el email no lo use otro usuario (si se está cambiando)"""
+        if email and email != current_user.email:
+            existing_user = db.query(User).filter(User.email == email).first()
             if existing_user:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Ya existe un usuario con este email"
                 )
+    
+    @staticmethod
+    def update_user_profile(db: Session, current_user: User, user_update: UserUpdate) -> User:
+        """Actualizar el perfil del usuario"""
+        hashed_password = get_password_hash(user_update.contraseña) if user_update.contraseña else None
+        return UserService.save_user_profile(db, current_user, user_update, hashed_password)
+    
+    @staticmethod
+    def save_user_profile(
+        db: Session,
+        current_user: User,
+        user_update: UserUpdate,
+        hashed_password: Optional[str] = None
+    ) -> User:
+        """Guardar el perfil del usuario con la contraseña nueva ya hasheada (si cambia)"""
+        
+        # Verificar si el email ya existe (si se está cambiando)
+        UserService.check_email_available(db, current_user, user_update.email)
+        
+        # El usuario autenticado puede venir del cache (separado de la sesión)
+        db_user = UserService.get_user_by_id(db, current_user.id)
         
         # Actualizar campos
         if user_update.nombre:
-            current_user.nombre = user_update.nombre
+            db_user.nombre = user_update.nombre
         if user_update.email:
-            current_user.email = user_update.email
-        if user_update.contraseña:
-            current_user.contraseña = get_password_hash(user_update.contraseña)
+            db_user.email = user_update.email
+        if hashed_password:
+            db_user.contraseña = hashed_password
+            # Cambiar la contraseña revoca los tokens emitidos antes
+            db_user.token_version = User.token_version + 1
         
         db.commit()
-        db.refresh(current_user)
+        db.refresh(db_user)
+        user_cache.invalidate(db_user.id)
         
-        return current_user
+        return db_user
     
     @staticmethod
-    def get_user_active_inscriptions(db: Session, user_id: int) -> List[ActiveInscriptionResponse]:
-        """Obtener inscripciones activas de un usuario"""
+    def change_user_role(db: Session, user_id: int, rol: UserRole) -> User:
+        """Cambiar el rol de un usuario (revoca los tokens emitidos con el rol anterior)"""
+        db_user = UserService.get_user_by_id(db, user_id)
+        if db_user.rol != rol:
+            db_user.rol = rol
+            db_user.token_version = User.token_version + 1
+            db.commit()
+            db.refresh(db_user)
+            user_cache.invalidate(user_id)
+        return db_user
+    
+    # Tipos de las columnas del cursor de las inscripciones (fecha_inscripcion, id)
+    INSCRIPTION_CURSOR_TYPES = (date, int)
+    
+    @staticmethod
+    def _status_expression(today: date):
+        """Estado del evento según sus fechas (mismos valores que InscriptionStatus)"""
+        return case(
+            (Event.fecha_fin < today, "finalizado"),
+            (Event.fecha_inicio <= today, "en_curso"),
+            else_="activo"
+        )
+    
+    @staticmethod
+    def _status_condition(status_name: str, today: date):
+        """Filtro equivalente a _status_expression == status_name, sobre las fechas"""
+        if status_name == "finalizado":
+            return Event.fecha_fin < today
+        if status_name == "en_curso":
+            return and_(Event.fecha_inicio <= today, Event.fecha_fin >= today)
+        return and_(Event.fecha_inicio > today, Event.fecha_fin >= today)
+    
+    @staticmethod
+    def _get_inscriptions_page(
+        db: Session,
+        user_id: int,
+        fields: Sequence[str],
+        limit: int,
+        cursor: Optional[str],
+        only_active: bool = False,
+        estado: Optional[str] = None
+    ) -> Tuple[List, Optional[str]]:
+        """
+        Inscripciones de un usuario con los datos del evento y su categoría en
+        una sola consulta (columnas `fields`, en orden, más las del cursor),
+        con el estado calculado en SQL y filtrado opcional por estado.
+        Más recientes primero, paginadas por clave sobre (fecha_inscripcion, id).
+        """
+        today = date.today()
+        columns = {
+            "id": Inscription.id,
+            "evento_id": Inscription.evento_id,
+            "fecha_inscripcion": Inscription.fecha_inscripcion,
+            "evento_nombre": Event.nombre,
+            "evento_fecha_inicio": Event.fecha_inicio,
+            "evento_fecha_fin": Event.fecha_fin,
+            "evento_lugar": Event.lugar,
+            "categoria_nombre": Category.nombre,
+            "estado": UserService._status_expression(today),
+        }
+        selected = projection(fields, ("fecha_inscripcion", "id"))
+        query = db.query(*(columns[name].label(name) for name in selected)).select_from(Inscription).join(
+            Event, Inscription.evento_id == Event.id
+        ).join(
+            Category, Event.categoria_id == Category.id
+        ).filter(Inscription.usuario_id == user_id)
+        if only_active:
+            query = query.filter(Event.fecha_fin >= today)
+        if estado:
+            query = query.filter(UserService._status_condition(estado, today))
         
-        inscriptions = db.query(Inscription).join(Event).join(Category).filter(
-            Inscription.usuario_id == user_id,
-            Event.fecha_fin >= date.today()  # Solo eventos futuros o en curso
+        after = decode_cursor(cursor, UserService.INSCRIPTION_CURSOR_TYPES)
+        rows = apply_keyset(
+            query, [Inscription.fecha_inscripcion, Inscription.id], after, limit, descending=True
         ).all()
-        
-        result = []
-        for inscription in inscriptions:
-            result.append(ActiveInscriptionResponse(
-                id=inscription.id,
-                evento_id=inscription.evento_id,
-                fecha_inscripcion=inscription.fecha_inscripcion,
-                evento_nombre=inscription.evento.nombre,
-                evento_fecha_inicio=inscription.evento.fecha_inicio,
-                evento_fecha_fin=inscription.evento.fecha_fin,
-                evento_lugar=inscription.evento.lugar,
-                categoria_nombre=inscription.evento.categoria.nombre
-            ))
-        
-        return result
+        return split_page(rows, limit, lambda row: (row.fecha_inscripcion, row.id))
     
     @staticmethod
-    def get_user_inscriptions_history(db: Session, user_id: int) -> List[InscriptionHistoryResponse]:
-        """Obtener el historial completo de inscripciones del usuario"""
-        
-        inscriptions = db.query(Inscription).join(Event).join(Category).filter(
-            Inscription.usuario_id == user_id
-        ).order_by(Inscription.fecha_inscripcion.desc()).all()
-        
-        result = []
-        for inscription in inscriptions:
-            # Determinar estado del evento
-            estado = UserService._determine_event_status(inscription.evento)
-            
-            result.append(InscriptionHistoryResponse(
-                id=inscription.id,
-                evento_id=inscription.evento_id,
-                fecha_inscripcion=inscription.fecha_inscripcion,
-                evento_nombre=inscription.evento.nombre,
-                evento_fecha_inicio=inscription.evento.fecha_inicio,
-                evento_fecha_fin=inscription.evento.fecha_fin,
-                evento_lugar=inscription.evento.lugar,
-                categoria_nombre=inscription.evento.categoria.nombre,
-                estado=estado
-            ))
-        
-        return result
+    def get_user_active_inscriptions(
+        db: Session,
+        user_id: int,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        estado: Optional[str] = None
+    ) -> Tuple[List, Optional[str]]:
+        """
+        Una página de inscripciones activas (eventos futuros o en curso) de un
+        usuario, opcionalmente solo las de un estado. Cada fila trae las
+        columnas de ActiveInscriptionResponse; devuelve también el cursor de
+        la página siguiente.
+        """
+        return UserService._get_inscriptions_page(
+            db, user_id, ACTIVE_INSCRIPTION_FIELDS, limit, cursor, only_active=True, estado=estado
+        )
     
     @staticmethod
-    def _determine_event_status(event: Event) -> str:
-        """Determinar el estado de un evento basado en las fechas"""
-        today = date.today()
-        if event.fecha_fin < today:
-            return "finalizado"
-        elif event.fecha_inicio <= today <= event.fecha_fin:
-            return "en_curso"
-        else:
-            return "activo"
+    def get_user_inscriptions_history(
+        db: Session,
+        user_id: int,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        estado: Optional[str] = None
+    ) -> Tuple[List, Optional[str]]:
+        """
+        Una página del historial de inscripciones del usuario, con el estado
+        de cada evento calculado en la consulta. Cada fila trae las columnas
+        de InscriptionHistoryResponse; devuelve también el cursor de la
+        página siguiente.
+        """
+        return UserService._get_inscriptions_page(
+            db, user_id, INSCRIPTION_HISTORY_FIELDS, limit, cursor, estado=estado
+        )
     
     @staticmethod
     def user_exists(db: Session, user_id: int) -> bool:
@@ -5,11 +5,14 @@ from .security import (
     verify_token,
     decode_token
 )
+from .pagination import encode_cursor, decode_cursor
 
 __all__ = [
     "verify_password", 
     "get_password_hash", 
     "create_access_token", 
     "verify_token",
-    "decode_token"
+    "decode_token",
+    "encode_cursor",
+    "decode_cursor"
 ]
\ No newline at end of file
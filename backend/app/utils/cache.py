@@ -0,0 +1,186 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from fastapi import Request
+from dotenv import load_dotenv
+
+# Cargar variables de entorno
+load_dotenv()
+
+# Configuración del cache de respuestas (run.py baja el TTL a
+# MULTI_WORKER_CACHE_TTL cuando hay varios workers)
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "True").lower() in ("1", "true", "yes")
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "30"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+
+class MemoryCacheBackend:
+    """Cache LRU en memoria del proceso, con vencimiento por TTL y cantidad máxima de entradas"""
+    
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def delete_prefix(self, prefix: str) -> int:
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+    
+    def size(self) -> int:
+        return len(self._entries)
+
+class ResponseCache:
+    """
+    Cache de lectura para respuestas de endpoints públicos.
+    Las claves se forman con un espacio de nombres, la ruta y los parámetros
+    de consulta; las escrituras invalidan por prefijo de espacio de nombres.
+    """
+    
+    def __init__(self, backend: MemoryCacheBackend, ttl: float = CACHE_TTL_SECONDS, enabled: bool = CACHE_ENABLED):
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+    
+    @staticmethod
+    def key(namespace: str, request: Request) -> str:
+        """Construir la clave a partir del espacio de nombres, la ruta y los parámetros"""
+        params = "&".join(f"{name}={value}" for name, value in sorted(request.query_params.multi_items()))
+        return f"{namespace}{request.url.path}?{params}"
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Obtener una respuesta cacheada (None si no está o venció)"""
+        if not self.enabled:
+            return None
+        value = self.backend.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+    
+    def set(self, key: str, value: Any) -> None:
+        """Guardar una respuesta en el cache"""
+        if self.enabled:
+            self.backend.set(key, value, self.ttl)
+    
+    def get_for_etag(self, key: str, etag: str) -> Optional[Any]:
+        """
+        Obtener una respuesta guardada con set_for_etag solo si corresponde al
+        ETag actual. La invalidación es local a cada worker: si otro worker
+        modificó el recurso, la entrada queda con un ETag anterior y se
+        descarta en lugar de enviar un cuerpo viejo con el ETag nuevo.
+        """
+        if not self.enabled:
+            return None
+        entry = self.backend.get(key)
+        if entry is None or entry[0] != etag:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1]
+    
+    def set_for_etag(self, key: str, etag: str, value: Any) -> None:
+        """Guardar una respuesta junto con el ETag de la versión con la que se armó"""
+        self.set(key, (etag, value))
+    
+    def invalidate(self, *namespaces: str) -> None:
+        """Eliminar las respuestas de los espacios de nombres indicados (por prefijo)"""
+        for namespace in namespaces:
+            self.invalidations += self.backend.delete_prefix(namespace)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Contadores de aciertos y fallos del cache"""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "backend": type(self.backend).__name__,
+            "entries": self.backend.size(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+# Espacios de nombres de las respuestas cacheadas. Terminan en "|" para que
+# invalidar el evento 1 no invalide también al 10, 11, ...
+EVENTS_NAMESPACE = "events:"
+EVENT_LIST_NAMESPACE = "events:list|"
+CATEGORY_LIST_NAMESPACE = "categories:list|"
+
+def event_detail_namespace(event_id: int) -> str:
+    return f"events:detail:{event_id}|"
+
+def category_detail_namespace(category_id: int) -> str:
+    return f"categories:detail:{category_id}|"
+
+# Instancia compartida por toda la aplicación
+response_cache = ResponseCache(MemoryCacheBackend())
+
+# Configuración del cache de usuarios de la autenticación (run.py baja el
+# TTL a MULTI_WORKER_USER_CACHE_TTL cuando hay varios workers)
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "4096"))
+
+class UserCache:
+    """
+    Cache de usuarios por ID para la autenticación (LRU con TTL, en memoria).
+    Las escrituras invalidan la entrada del proceso actual; en los demás
+    workers el cambio se ve al vencer el TTL.
+    """
+    
+    def __init__(self, ttl: float = USER_CACHE_TTL_SECONDS, max_entries: int = USER_CACHE_MAX_ENTRIES):
+        self.backend = MemoryCacheBackend(max_entries)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def key(user_id: int) -> str:
+        return f"user:{user_id}|"
+    
+    def get(self, user_id: int) -> Optional[Any]:
+        user = self.backend.get(self.key(user_id))
+        if user is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return user
+    
+    def set(self, user: Any) -> None:
+        if self.ttl > 0:
+            self.backend.set(self.key(user.id), user, self.ttl)
+    
+    def invalidate(self, user_id: int) -> None:
+        self.backend.delete_prefix(self.key(user_id))
+
+user_cache = UserCache()
@@ -0,0 +1,43 @@
+import os
+from datetime import date
+from fastapi import Request, Response
+from dotenv import load_dotenv
+
+# Cargar variables de entorno
+load_dotenv()
+
+# Segundos que un cliente puede reutilizar la respuesta sin revalidar (0 = revalidar siempre)
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", "0"))
+
+PUBLIC_CACHE_CONTROL = f"public, max-age={HTTP_CACHE_MAX_AGE}, must-revalidate"
+
+def make_etag(resource: str, resource_id: int, *versions: int) -> str:
+    """
+    Construir un ETag fuerte a partir del recurso y sus versiones.
+    Incluye la fecha actual porque los cupos disponibles dependen de si el
+    evento ya terminó.
+    """
+    parts = [resource, str(resource_id), *(str(version) for version in versions), str(date.today().toordinal())]
+    return '"' + "-".join(parts) + '"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Verificar si el ETag coincide con alguno de los enviados en If-None-Match"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    # If-None-Match usa comparación débil: se ignora el prefijo W/
+    return "*" in candidates or any(
+        candidate.removeprefix("W/") == etag for candidate in candidates
+    )
+
+def set_cache_headers(response: Response, etag: str, cache_control: str = PUBLIC_CACHE_CONTROL) -> None:
+    """Agregar ETag y Cache-Control a la respuesta"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+
+def not_modified(etag: str, cache_control: str = PUBLIC_CACHE_CONTROL) -> Response:
+    """Respuesta 304 sin cuerpo para un recurso que no cambió"""
+    response = Response(status_code=304)
+    set_cache_headers(response, etag, cache_control)
+    return response
@@ -0,0 +1,69 @@
+import os
+import io
+import csv
+from typing import AsyncIterator, List, Sequence
+from fastapi.responses import StreamingResponse
+from sqlalchemy.sql import Select
+from dotenv import load_dotenv
+from app.database import AsyncSessionLocal
+from app.utils.serialization import dumps_json
+
+# Cargar variables de entorno
+load_dotenv()
+
+# Filas que se leen de la base (y se escriben en la respuesta) por vez
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+# Formatos de exportación y su tipo de contenido
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+async def stream_row_batches(statement: Select, batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[List]:
+    """
+    Recorrer el resultado de una consulta en lotes de `batch_size` filas con
+    un cursor del lado del servidor (yield_per), sin cargarlo entero.
+    Abre su propia sesión: la respuesta se sigue enviando después de que
+    termina la función de la ruta y su sesión.
+    """
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(statement.execution_options(yield_per=batch_size))
+        async for rows in result.partitions():
+            yield rows
+
+def encode_csv(rows, header: Sequence[str] = ()) -> bytes:
+    """Filas (y opcionalmente el encabezado) en CSV; las fechas quedan en formato ISO"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(header)
+    writer.writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+def encode_ndjson(rows, fields: Sequence[str]) -> bytes:
+    """Un objeto JSON por línea con los campos `fields` de cada fila"""
+    return b"".join(dumps_json(dict(zip(fields, row))) + b"\n" for row in rows)
+
+async def _export_chunks(statement: Select, fields: Sequence[str], export_format: str) -> AsyncIterator[bytes]:
+    if export_format == "csv":
+        # El encabezado sale aunque no haya filas
+        yield encode_csv((), fields)
+        async for rows in stream_row_batches(statement):
+            yield encode_csv(rows)
+    else:
+        async for rows in stream_row_batches(statement):
+            yield encode_ndjson(rows, fields)
+
+def export_response(statement: Select, fields: Sequence[str], export_format: str, filename: str) -> StreamingResponse:
+    """
+    Respuesta que descarga el resultado de `statement` en CSV o NDJSON.
+    Las primeras columnas de la consulta deben ser los campos `fields`, en
+    orden. Se envía un bloque por lote, así que la memoria usada no depende
+    de la cantidad de filas.
+    """
+    return StreamingResponse(
+        _export_chunks(statement, fields, export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'}
+    )
@@ -0,0 +1,44 @@
+from typing import Iterable, Optional, Sequence, Tuple
+from fastapi import HTTPException, status
+from app.utils.serialization import dumps_json
+
+# Descripción del parámetro ?fields= de los listados
+FIELDS_DESCRIPTION = "Campos a incluir, separados por coma (por defecto todos)"
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str]) -> Tuple[str, ...]:
+    """
+    Interpretar el parámetro ?fields= de un listado.
+    Devuelve los campos pedidos en el orden de `allowed` (el del esquema de
+    respuesta), sin repetidos; sin el parámetro devuelve todos.
+    """
+    if not fields:
+        return tuple(allowed)
+    
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested.difference(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Campos desconocidos: {', '.join(sorted(unknown))}. Disponibles: {', '.join(allowed)}"
+        )
+    if not requested:
+        return tuple(allowed)
+    return tuple(name for name in allowed if name in requested)
+
+def projection(fields: Sequence[str], always: Iterable[str] = ()) -> Tuple[str, ...]:
+    """
+    Columnas a consultar: primero los campos pedidos y después las que se
+    necesitan siempre (por ejemplo las del cursor) y no se pidieron.
+    """
+    return tuple(fields) + tuple(name for name in always if name not in fields)
+
+def sparse_items(rows, fields: Sequence[str]) -> list:
+    """
+    Elementos de un listado a partir de filas consultadas con `projection`:
+    las primeras columnas de cada fila son los campos pedidos, en orden.
+    """
+    return [dict(zip(fields, row)) for row in rows]
+
+def sparse_page_json(rows, fields: Sequence[str], next_cursor: Optional[str]) -> bytes:
+    """JSON de una página ({items, next_cursor}) con solo los campos pedidos"""
+    return dumps_json({"items": sparse_items(rows, fields), "next_cursor": next_cursor})
@@ -0,0 +1,342 @@
+import os
+import json
+import time
+import asyncio
+import logging
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from dotenv import load_dotenv
+
+# Cargar variables de entorno
+load_dotenv()
+
+# Registrar métricas de los pedidos y exponerlas en /metrics
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True").lower() in ("1", "true", "yes")
+# Con varios workers, cada proceso escribe sus métricas en este directorio y
+# /metrics suma las de todos (vacío = solo las del proceso que responde)
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR", "")
+# Segundos entre escrituras del archivo de métricas del proceso
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+# Límites (en segundos) de los buckets del histograma de latencia
+LATENCY_BUCKETS = tuple(
+    float(bound) for bound in os.getenv(
+        "METRICS_LATENCY_BUCKETS", "0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10"
+    ).split(",")
+)
+# Límites (en segundos) de los buckets del histograma de espera por una conexión del pool
+POOL_WAIT_BUCKETS = tuple(
+    float(bound) for bound in os.getenv(
+        "METRICS_POOL_WAIT_BUCKETS", "0.0005,0.001,0.0025,0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10"
+    ).split(",")
+)
+
+logger = logging.getLogger("uvicorn.error")
+
+# Tipo y descripción de las métricas simples (contadores y gauges)
+METRIC_DEFINITIONS = {
+    "db_pool_checkouts_total": ("counter", "Conexiones entregadas por el pool"),
+    "db_pool_connections_created_total": ("counter", "Conexiones nuevas abiertas contra la base"),
+    "db_pool_checked_out": ("gauge", "Conexiones del pool en uso"),
+    "db_pool_overflow": ("gauge", "Conexiones abiertas por encima del tamaño del pool"),
+    "db_pool_size": ("gauge", "Tamaño configurado del pool"),
+    "cache_hits_total": ("counter", "Aciertos del cache de respuestas"),
+    "cache_misses_total": ("counter", "Fallos del cache de respuestas"),
+    "cache_entries": ("gauge", "Respuestas guardadas en el cache"),
+    "user_cache_hits_total": ("counter", "Aciertos del cache de usuarios de la autenticación"),
+    "user_cache_misses_total": ("counter", "Fallos del cache de usuarios de la autenticación"),
+    "password_hash_pending": ("gauge", "Operaciones de bcrypt en ejecución o en cola"),
+    "password_hash_capacity": ("gauge", "Operaciones de bcrypt admitidas antes de responder 503"),
+    "password_hash_rejected_total": ("counter", "Operaciones de bcrypt rechazadas por saturación"),
+    "inscriptions_created_total": ("counter", "Inscripciones confirmadas"),
+    "inscriptions_cancelled_total": ("counter", "Inscripciones canceladas o eliminadas"),
+    "inscription_writer_queue_depth": ("gauge", "Operaciones esperando al escritor de inscripciones"),
+    "inscription_writer_batches_total": ("counter", "Lotes confirmados por el escritor de inscripciones"),
+    "category_registry_loads_total": ("counter", "Cargas completas del registro de categorías"),
+}
+
+# Buckets y descripción de los histogramas sin etiquetas
+HISTOGRAM_DEFINITIONS = {
+    "db_pool_wait_seconds": (
+        POOL_WAIT_BUCKETS,
+        "Tiempo hasta obtener una conexión del pool (espera y apertura de conexiones nuevas)"
+    ),
+}
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(**labels: str) -> str:
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+class Metrics:
+    """
+    Métricas del proceso en formato de texto de Prometheus.
+    Todas las actualizaciones se hacen desde el event loop, así que no usan
+    locks; con varios workers cada proceso vuelca su estado en un archivo
+    propio (METRICS_MULTIPROC_DIR) y /metrics suma los archivos de todos.
+    Los valores que ya mantienen otros componentes (cache, bcrypt, pool) se
+    leen al momento de generar la respuesta mediante colectores.
+    """
+    
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS, multiproc_dir: str = METRICS_MULTIPROC_DIR):
+        self.buckets = buckets
+        self.multiproc_dir = multiproc_dir
+        # (método, ruta, estado) -> cantidad de pedidos
+        self.requests: Dict[Tuple[str, str, str], int] = {}
+        # (método, ruta) -> [cantidad por bucket (no acumulada; el último es +Inf), suma]
+        self.latency: Dict[Tuple[str, str], list] = {}
+        self.values: Dict[str, float] = {}
+        # nombre -> [cantidad por bucket (no acumulada; el último es +Inf), suma]
+        self.histograms: Dict[str, list] = {}
+        self._collectors: List[Callable[[], Dict[str, float]]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+    
+    def observe_request(self, method: str, route: str, status_code: int, seconds: float) -> None:
+        key = (method, route, str(status_code))
+        self.requests[key] = self.requests.get(key, 0) + 1
+        histogram = self.latency.get((method, route))
+        if histogram is None:
+            histogram = self.latency[(method, route)] = [[0] * (len(self.buckets) + 1), 0.0]
+        histogram[0][bisect_left(self.buckets, seconds)] += 1
+        histogram[1] += seconds
+    
+    def inc(self, name: str, amount: float = 1) -> None:
+        self.values[name] = self.values.get(name, 0) + amount
+    
+    def observe(self, name: str, seconds: float) -> None:
+        """Registrar una observación en un histograma de HISTOGRAM_DEFINITIONS"""
+        buckets = HISTOGRAM_DEFINITIONS[name][0]
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = [[0] * (len(buckets) + 1), 0.0]
+        histogram[0][bisect_left(buckets, seconds)] += 1
+        histogram[1] += seconds
+    
+    def register_collector(self, collector: Callable[[], Dict[str, float]]) -> None:
+        """Registrar una función que devuelve valores actuales {nombre de métrica: valor}"""
+        self._collectors.append(collector)
+    
+    def instrument_engine(self, sync_engine: Engine) -> None:
+        """Contar las conexiones que entrega y abre el pool del motor y medir cuánto se espera por ellas"""
+        raw_connection = sync_engine.raw_connection
+        
+        # El pool no tiene un evento de inicio del pedido de conexión: se mide
+        # alrededor de raw_connection (incluye la espera en la cola del pool
+        # cuando está lleno y la apertura de conexiones nuevas)
+        def timed_raw_connection(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return raw_connection(*args, **kwargs)
+            finally:
+                self.observe("db_pool_wait_seconds", time.perf_counter() - started)
+        
+        sync_engine.raw_connection = timed_raw_connection
+        
+        @event.listens_for(sync_engine, "checkout")
+        def count_checkout(dbapi_connection, connection_record, connection_proxy):
+            self.inc("db_pool_checkouts_total")
+        
+        @event.listens_for(sync_engine, "connect")
+        def count_connection(dbapi_connection, connection_record):
+            self.inc("db_pool_connections_created_total")
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Estado actual del proceso (serializable a JSON)"""
+        values = dict(self.values)
+        for collector in self._collectors:
+            try:
+                for name, value in collector().items():
+                    values[name] = values.get(name, 0) + value
+            except Exception:
+                logger.exception("Error al leer un colector de métricas")
+        return {
+            "pid": os.getpid(),
+            "values": values,
+            "requests": [[*key, count] for key, count in self.requests.items()],
+            "latency": [[*key, counts, total] for key, (counts, total) in self.latency.items()],
+            "histograms": [[name, counts, total] for name, (counts, total) in self.histograms.items()],
+        }
+    
+    # Varios workers
+    
+    def _snapshot_path(self, pid: int) -> str:
+        return os.path.join(self.multiproc_dir, f"metrics_{pid}.json")
+    
+    def flush(self) -> None:
+        """Escribir el estado del proceso en su archivo (reemplazo atómico)"""
+        if not self.multiproc_dir:
+            return
+        os.makedirs(self.multiproc_dir, exist_ok=True)
+        path = self._snapshot_path(os.getpid())
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(self.snapshot(), file)
+        os.replace(temporary, path)
+    
+    def _load_snapshots(self) -> List[Dict[str, Any]]:
+        self.flush()
+        snapshots = []
+        for name in os.listdir(self.multiproc_dir):
+            if not (name.startswith("metrics_") and name.endswith(".json")):
+                continue
+            try:
+                with open(os.path.join(self.multiproc_dir, name), encoding="utf-8") as file:
+                    snapshots.append(json.load(file))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+    
+    @staticmethod
+    def _is_alive(pid: int) -> bool:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+    
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(METRICS_FLUSH_INTERVAL)
+            try:
+                self.flush()
+            except OSError:
+                logger.exception("No se pudo escribir el archivo de métricas")
+    
+    def start(self) -> None:
+        """Iniciar el volcado periódico del archivo de métricas (solo con METRICS_MULTIPROC_DIR)"""
+        if self.multiproc_dir and self._flush_task is None:
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_periodically())
+    
+    def stop(self) -> None:
+        """Detener el volcado y dejar escrito el estado final del proceso"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        self.flush()
+    
+    # Formato de texto
+    
+    def render(self) -> str:
+        """Métricas en formato de texto de Prometheus (sumando todos los workers si corresponde)"""
+        snapshots = self._load_snapshots() if self.multiproc_dir else [self.snapshot()]
+        
+        values: Dict[str, float] = {}
+        requests: Dict[Tuple[str, str, str], int] = {}
+        latency: Dict[Tuple[str, str], list] = {}
+        histograms: Dict[str, list] = {}
+        for snapshot in snapshots:
+            alive = snapshot["pid"] == os.getpid() or self._is_alive(snapshot["pid"])
+            for name, value in snapshot["values"].items():
+                # Los gauges de procesos que ya terminaron no se suman
+                if alive or METRIC_DEFINITIONS.get(name, ("gauge",))[0] == "counter":
+                    values[name] = values.get(name, 0) + value
+            for method, route, status_code, count in snapshot["requests"]:
+                key = (method, route, status_code)
+                requests[key] = requests.get(key, 0) + count
+            for method, route, counts, total in snapshot["latency"]:
+                merged = latency.setdefault((method, route), [[0] * len(counts), 0.0])
+                merged[0] = [a + b for a, b in zip(merged[0], counts)]
+                merged[1] += total
+            for name, counts, total in snapshot.get("histograms", []):
+                merged = histograms.setdefault(name, [[0] * len(counts), 0.0])
+                merged[0] = [a + b for a, b in zip(merged[0], counts)]
+                merged[1] += total
+        
+        lines = [
+            "# HELP http_requests_total Pedidos HTTP atendidos",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status_code), count in sorted(requests.items()):
+            lines.append(f"http_requests_total{_labels(method=method, route=route, status=status_code)} {count}")
+        
+        lines += [
+            "# HELP http_request_duration_seconds Latencia de los pedidos HTTP",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), (counts, total) in sorted(latency.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(
+                    f"http_request_duration_seconds_bucket{_labels(method=method, route=route, le=_format_value(bound))} {cumulative}"
+                )
+            cumulative += counts[-1]
+            lines.append(f"http_request_duration_seconds_bucket{_labels(method=method, route=route, le='+Inf')} {cumulative}")
+            lines.append(f"http_request_duration_seconds_sum{_labels(method=method, route=route)} {total!r}")
+            lines.append(f"http_request_duration_seconds_count{_labels(method=method, route=route)} {cumulative}")
+        
+        for name, (buckets, description) in HISTOGRAM_DEFINITIONS.items():
+            if name not in histograms:
+                continue
+            counts, total = histograms[name]
+            lines += [f"# HELP {name} {description}", f"# TYPE {name} histogram"]
+            cumulative = 0
+            for bound, count in zip(buckets, counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(le=_format_value(bound))} {cumulative}")
+            cumulative += counts[-1]
+            lines.append(f"{name}_bucket{_labels(le='+Inf')} {cumulative}")
+            lines.append(f"{name}_sum {total!r}")
+            lines.append(f"{name}_count {cumulative}")
+        
+        for name, (metric_type, description) in METRIC_DEFINITIONS.items():
+            if name in values:
+                lines += [
+                    f"# HELP {name} {description}",
+                    f"# TYPE {name} {metric_type}",
+                    f"{name} {_format_value(values[name])}",
+                ]
+        return "\n".join(lines) + "\n"
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que registra cantidad y latencia de los pedidos por método,
+    plantilla de ruta (/events/{event_id}, no la URL concreta) y estado.
+    """
+    
+    def __init__(self, app, registry: Metrics):
+        self.app = app
+        self.registry = registry
+        self._templates: Optional[Dict[Any, str]] = None
+    
+    def _route_template(self, scope) -> str:
+        if self._templates is None:
+            # El router de Starlette deja el endpoint elegido en el scope
+            self._templates = {
+                route.endpoint: route.path
+                for route in scope["app"].routes
+                if hasattr(route, "endpoint")
+            }
+        # Las rutas inexistentes se agrupan para no crear una serie por URL
+        return self._templates.get(scope.get("endpoint"), "<sin ruta>")
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        started = time.perf_counter()
+        status_code = 500
+        
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.registry.observe_request(
+                scope["method"], self._route_template(scope), status_code, time.perf_counter() - started
+            )
+
+# Instancia compartida por toda la aplicación
+metrics = Metrics()
@@ -0,0 +1,60 @@
+import base64
+import json
+from datetime import date
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import tuple_
+
+# Límite máximo de elementos por página en los listados
+MAX_PAGE_SIZE = 1000
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Codificar los valores de la última fila de una página en un cursor opaco"""
+    payload = [value.isoformat() if isinstance(value, date) else value for value in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: Optional[str], types: Sequence[type]) -> Optional[Tuple]:
+    """
+    Decodificar un cursor opaco.
+    `types` indica el tipo de cada columna de ordenamiento (date, int, float, str).
+    """
+    if not cursor:
+        return None
+    
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(payload, list) or len(payload) != len(types):
+            raise ValueError("Cantidad de valores incorrecta")
+        return tuple(
+            date.fromisoformat(value) if value_type is date else value_type(value)
+            for value, value_type in zip(payload, types)
+        )
+    except (ValueError, TypeError, UnicodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de paginación inválido"
+        )
+
+def apply_keyset(query, columns: Sequence, after: Optional[Tuple], limit: int, descending: bool = False):
+    """
+    Aplicar paginación por clave (keyset) a una consulta.
+    Ordena por `columns` (todas ascendentes o, con `descending`, todas
+    descendentes) y filtra las filas posteriores al cursor; pide una fila
+    extra para saber si existe una página siguiente.
+    """
+    if descending:
+        if after is not None:
+            query = query.filter(tuple_(*columns) < tuple_(*after))
+        return query.order_by(*(column.desc() for column in columns)).limit(limit + 1)
+    if after is not None:
+        query = query.filter(tuple_(*columns) > tuple_(*after))
+    return query.order_by(*columns).limit(limit + 1)
+
+def split_page(rows: List, limit: int, key: Callable[[Any], Sequence[Any]]) -> Tuple[List, Optional[str]]:
+    """Separar la fila extra y construir el cursor de la página siguiente"""
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    return page, encode_cursor(key(page[-1]))
@@ -0,0 +1,90 @@
+import os
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+from fastapi import HTTPException, status
+from dotenv import load_dotenv
+from app.utils.security import get_password_hash, verify_and_update_password
+
+# Cargar variables de entorno
+load_dotenv()
+
+# Hilos dedicados a bcrypt (bcrypt libera el GIL, así que los hilos corren en paralelo)
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Operaciones que pueden esperar en cola además de las que se están ejecutando;
+# con la cola llena se responde 503 en lugar de acumular logins lentos
+PASSWORD_HASH_QUEUE_SIZE = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", "32"))
+# Segundos sugeridos al cliente para reintentar cuando el pool está saturado
+PASSWORD_HASH_RETRY_AFTER = os.getenv("PASSWORD_HASH_RETRY_AFTER", "1")
+
+class PasswordHasher:
+    """
+    Ejecuta bcrypt en un pool de hilos de tamaño limitado, fuera del event loop.
+    Admite como máximo `workers + queue_size` operaciones pendientes; las que
+    exceden ese límite se rechazan con 503 (contrapresión).
+    """
+    
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, queue_size: int = PASSWORD_HASH_QUEUE_SIZE):
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.rejected = 0
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Se crea al primer uso para que cada worker del servidor tenga su propio pool
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+    
+    def _acquire(self) -> None:
+        with self._lock:
+            if self.pending >= self.capacity:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="El servidor está ocupado, intente nuevamente en unos segundos",
+                    headers={"Retry-After": PASSWORD_HASH_RETRY_AFTER},
+                )
+            self.pending += 1
+    
+    def _release(self) -> None:
+        with self._lock:
+            self.pending -= 1
+    
+    async def run(self, function: Callable, *args: Any) -> Any:
+        """Ejecutar una función de hashing en el pool y esperar su resultado"""
+        self._acquire()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), function, *args)
+        finally:
+            self._release()
+    
+    async def hash(self, password: str) -> str:
+        """Generar el hash de una contraseña"""
+        return await self.run(get_password_hash, password)
+    
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Verificar una contraseña; devuelve también el hash nuevo si hay que regenerarlo"""
+        return await self.run(verify_and_update_password, plain_password, hashed_password)
+    
+    def stats(self) -> Dict[str, int]:
+        """Estado del pool (operaciones pendientes, capacidad y rechazos)"""
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "capacity": self.capacity,
+            "rejected": self.rejected,
+        }
+    
+    def shutdown(self) -> None:
+        """Esperar a que terminen las operaciones en curso y liberar los hilos"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+# Instancia compartida por toda la aplicación
+password_hasher = PasswordHasher()
@@ -1,15 +1,18 @@
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 import os
 from dotenv import load_dotenv
 
 # Cargar variables de entorno
 load_dotenv()
 
+# Factor de costo de bcrypt; los hashes con otro costo se regeneran en el próximo login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
 # Configuración de encriptación de contraseñas
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 
 # Configuración JWT
 SECRET_KEY = os.getenv("SECRET_KEY", "tu_clave_secreta_super_segura")
@@ -20,6 +23,13 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verificar si la contraseña coincide con el hash"""
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verificar la contraseña y, si el hash usa otro costo que el configurado,
+    devolver también el hash nuevo (o None si no hace falta actualizarlo)
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
 def get_password_hash(password: str) -> str:
     """Generar hash de la contraseña"""
     return pwd_context.hash(password)
@@ -0,0 +1,44 @@
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Dict, Optional
+from fastapi import Response
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional: sin él se usa el json de la biblioteca estándar
+    orjson = None
+
+if orjson is not None:
+    from fastapi.responses import ORJSONResponse as DefaultJSONResponse
+else:
+    DefaultJSONResponse = JSONResponse
+
+JSON_MEDIA_TYPE = "application/json"
+
+def _json_default(value: Any) -> Any:
+    # Tipos que el json estándar no sabe codificar (orjson los maneja solo)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Tipo no serializable a JSON: {type(value).__name__}")
+
+def dumps_json(payload: Any) -> bytes:
+    """
+    Serializar dicts/listas de valores simples (incluidas fechas) a JSON.
+    Para cuerpos armados a mano desde filas ya tipadas, sin modelos intermedios.
+    """
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, default=_json_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def json_bytes_response(content: bytes, status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+    """
+    Respuesta con un cuerpo JSON ya serializado.
+    Al devolver un Response, FastAPI no vuelve a validar ni a codificar el
+    resultado contra el response_model de la ruta (que queda solo para la
+    documentación).
+    """
+    return Response(content=content, status_code=status_code, headers=headers, media_type=JSON_MEDIA_TYPE)
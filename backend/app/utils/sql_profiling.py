@@ -0,0 +1,140 @@
+import os
+import re
+import json
+import time
+import logging
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from dotenv import load_dotenv
+
+# Cargar variables de entorno
+load_dotenv()
+
+# Medir las consultas SQL de cada pedido (cantidad, tiempo y sentencias repetidas)
+SQL_PROFILING = os.getenv("SQL_PROFILING", "False").lower() in ("1", "true", "yes")
+# Una misma sentencia ejecutada más de N veces en un pedido se marca como posible N+1
+SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "5"))
+# Agregar el header Server-Timing a las respuestas
+SQL_PROFILING_HEADER = os.getenv("SQL_PROFILING_HEADER", "True").lower() in ("1", "true", "yes")
+
+logger = logging.getLogger("uvicorn.error")
+
+# Listas de parámetros de IN (?, ?, ?) con distinta longitud cuentan como la misma forma
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+def statement_shape(statement: str) -> str:
+    """Forma normalizada de una sentencia parametrizada (sin espacios extra ni largo de las listas IN)"""
+    return _IN_LIST.sub("(?...)", _WHITESPACE.sub(" ", statement).strip())
+
+class RequestSqlProfile:
+    """Sentencias ejecutadas durante un pedido"""
+    
+    __slots__ = ("statements", "db_time", "shapes")
+    
+    def __init__(self):
+        self.statements = 0
+        self.db_time = 0.0
+        self.shapes: Counter = Counter()
+    
+    def record(self, statement: str, elapsed: float) -> None:
+        self.statements += 1
+        self.db_time += elapsed
+        self.shapes[statement_shape(statement)] += 1
+    
+    def repeated(self, threshold: int = SQL_N_PLUS_ONE_THRESHOLD) -> List[Dict[str, Any]]:
+        """Sentencias que se ejecutaron más de `threshold` veces (posibles N+1)"""
+        return [
+            {"sql": shape[:200], "count": count}
+            for shape, count in self.shapes.most_common()
+            if count > threshold
+        ]
+    
+    def server_timing(self) -> str:
+        return f'db;dur={self.db_time * 1000:.2f};desc="{self.statements} queries"'
+
+# Perfil del pedido en curso (None fuera de un pedido o con la medición desactivada)
+_current_profile: ContextVar[Optional[RequestSqlProfile]] = ContextVar("sql_profile", default=None)
+
+def current_profile() -> Optional[RequestSqlProfile]:
+    return _current_profile.get()
+
+def instrument_engine(sync_engine: Engine) -> None:
+    """
+    Registrar los eventos que miden cada sentencia.
+    Para el motor asíncrono se pasa async_engine.sync_engine; las sentencias
+    ejecutadas con run_sync también quedan asociadas al pedido porque el
+    contexto se propaga al greenlet.
+    """
+    
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        if _current_profile.get() is not None:
+            conn.info.setdefault("sql_profiling_start", []).append(time.perf_counter())
+    
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        profile = _current_profile.get()
+        starts = conn.info.get("sql_profiling_start")
+        if profile is not None and starts:
+            profile.record(statement, time.perf_counter() - starts.pop())
+
+class SqlProfilingMiddleware:
+    """
+    Middleware ASGI que mide las consultas SQL de cada pedido.
+    Agrega el header Server-Timing con el tiempo de base y la cantidad de
+    sentencias, y escribe una línea de log JSON por pedido; si alguna
+    sentencia se repite más de SQL_N_PLUS_ONE_THRESHOLD veces el log sale
+    con nivel WARNING y la lista de sentencias repetidas.
+    """
+    
+    def __init__(self, app, threshold: int = SQL_N_PLUS_ONE_THRESHOLD, add_header: bool = SQL_PROFILING_HEADER):
+        self.app = app
+        self.threshold = threshold
+        self.add_header = add_header
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        profile = RequestSqlProfile()
+        token = _current_profile.set(profile)
+        started = time.perf_counter()
+        status_code = 500
+        
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.add_header:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", profile.server_timing().encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_profile.reset(token)
+            self._log(scope, status_code, profile, time.perf_counter() - started)
+    
+    def _log(self, scope, status_code: int, profile: RequestSqlProfile, elapsed: float) -> None:
+        repeated = profile.repeated(self.threshold)
+        level = logging.WARNING if repeated else logging.INFO
+        if not logger.isEnabledFor(level):
+            return
+        record = {
+            "method": scope["method"],
+            "path": scope["path"],
+            "status": status_code,
+            "duration_ms": round(elapsed * 1000, 2),
+            "queries": profile.statements,
+            "db_ms": round(profile.db_time * 1000, 2),
+        }
+        if repeated:
+            record["n_plus_one"] = repeated
+        logger.log(level, json.dumps(record, ensure_ascii=False))
@@ -0,0 +1,35 @@
+import os
+import tempfile
+from fastapi import HTTPException, Request, status
+from dotenv import load_dotenv
+
+# Cargar variables de entorno
+load_dotenv()
+
+# Tamaño máximo de un archivo subido (bytes)
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(50 * 1024 * 1024)))
+# Hasta este tamaño el archivo se guarda en memoria; después, en un archivo temporal
+UPLOAD_SPOOL_MEMORY = int(os.getenv("UPLOAD_SPOOL_MEMORY", str(1024 * 1024)))
+
+async def spool_request_body(request: Request, max_bytes: int = UPLOAD_MAX_BYTES) -> tempfile.SpooledTemporaryFile:
+    """
+    Guardar el cuerpo del pedido a medida que llega, sin cargarlo entero en
+    memoria, y devolverlo posicionado al principio (quien llama lo cierra).
+    Responde 413 si supera `max_bytes`.
+    """
+    spooled = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_MEMORY)
+    received = 0
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > max_bytes:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"El archivo supera el máximo de {max_bytes} bytes"
+                )
+            spooled.write(chunk)
+    except BaseException:
+        spooled.close()
+        raise
+    spooled.seek(0)
+    return spooled
@@ -1,16 +1,178 @@
-import uvicorn
+"""
+Punto de entrada del servidor.
+
+Producción (por defecto): varios workers de uvicorn (uno por núcleo si no se
+indica SERVER_WORKERS), con uvloop/httptools cuando están instalados. Antes de
+lanzar los workers se importa la aplicación en el proceso principal (se
+aplican las migraciones una sola vez) y se verifica que la base responda y no
+queden migraciones pendientes; si algo falla el servidor no arranca.
+
+Al recibir SIGTERM/SIGINT uvicorn deja de aceptar conexiones, espera hasta
+SERVER_GRACEFUL_TIMEOUT segundos a los pedidos en curso y luego ejecuta los
+eventos de shutdown (el escritor de inscripciones confirma lo que tiene en cola).
+
+Uso (desde el directorio backend):
+    python run.py                 # producción
+    python run.py --reload        # desarrollo (un proceso, recarga automática)
+    python run.py --check         # solo la verificación de inicio
+"""
+import argparse
+import logging
 import os
+import sys
+import tempfile
+import uvicorn
 from dotenv import load_dotenv
 
 # Cargar variables de entorno
 load_dotenv()
 
-if __name__ == "__main__":
-    # Configuración para desarrollo
+APP_IMPORT_STRING = "app.main:app"
+
+SERVER_HOST = os.getenv("SERVER_HOST", "0.0.0.0")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "8000"))
+# "auto" = un worker por núcleo disponible
+SERVER_WORKERS = os.getenv("SERVER_WORKERS", "auto")
+# Conexiones pendientes de aceptar en el socket
+SERVER_BACKLOG = int(os.getenv("SERVER_BACKLOG", "2048"))
+# Segundos que se mantiene abierta una conexión keep-alive sin pedidos
+SERVER_KEEPALIVE = int(os.getenv("SERVER_KEEPALIVE", "5"))
+# Conexiones simultáneas por worker antes de responder 503 (vacío = sin límite)
+SERVER_LIMIT_CONCURRENCY = os.getenv("SERVER_LIMIT_CONCURRENCY", "")
+# Segundos que se espera a los pedidos en curso al apagar
+SERVER_GRACEFUL_TIMEOUT = int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30"))
+# Modo desarrollo: un proceso con recarga automática
+SERVER_RELOAD = os.getenv("SERVER_RELOAD", "False").lower() in ("1", "true", "yes")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "info")
+SERVER_ACCESS_LOG = os.getenv("SERVER_ACCESS_LOG", "True").lower() in ("1", "true", "yes")
+# TTL del cache de usuarios con varios workers (si no se fijó USER_CACHE_TTL_SECONDS):
+# la invalidación es por proceso y los demás workers ven los cambios de rol,
+# contraseña o email recién cuando vence la entrada
+MULTI_WORKER_USER_CACHE_TTL = os.getenv("MULTI_WORKER_USER_CACHE_TTL", "5")
+# TTL del cache de respuestas con varios workers (si no se fijó CACHE_TTL_SECONDS):
+# las escrituras invalidan solo el cache del worker que las atendió, así que los
+# listados de los demás quedan desactualizados hasta que vence la entrada
+MULTI_WORKER_CACHE_TTL = os.getenv("MULTI_WORKER_CACHE_TTL", "2")
+
+logger = logging.getLogger("run")
+
+def available_cores() -> int:
+    """Núcleos que puede usar el proceso (respeta los límites de afinidad del contenedor)"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+def resolve_workers(value: str) -> int:
+    if value == "auto":
+        return available_cores()
+    return max(1, int(value))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Servidor de la API de eventos")
+    parser.add_argument("--reload", action="store_true", default=SERVER_RELOAD, help="Modo desarrollo con recarga automática")
+    parser.add_argument("--workers", default=SERVER_WORKERS, help="Cantidad de workers o 'auto'")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--check", action="store_true", help="Ejecutar la verificación de inicio y salir")
+    return parser.parse_args()
+
+def event_loop_implementation() -> str:
+    try:
+        import uvloop  # noqa: F401
+        return "uvloop"
+    except ImportError:
+        return "asyncio"
+
+def http_implementation() -> str:
+    try:
+        import httptools  # noqa: F401
+        return "httptools"
+    except ImportError:
+        return "h11"
+
+def self_check():
+    """
+    Importar la aplicación y verificar que pueda atender pedidos.
+    Devuelve la aplicación ya cargada; termina el proceso si algo falla.
+    """
+    try:
+        from app.main import app
+        from app.database import engine, describe_database
+        from app.migrations import get_pending_migrations
+        
+        pending = get_pending_migrations(engine)
+        if pending:
+            raise RuntimeError(
+                "Migraciones pendientes: " + ", ".join(repr(migration) for migration in pending)
+            )
+        logger.info("Base de datos: %s", describe_database())
+        logger.info("Rutas registradas: %s", len(app.routes))
+    except Exception:
+        logger.exception("La verificación de inicio falló; el servidor no se inicia")
+        sys.exit(1)
+    
+    # Los workers abren sus propias conexiones
+    engine.dispose()
+    return app
+
+def prepare_metrics_dir(workers: int) -> None:
+    """Con varios workers las métricas se suman desde archivos por proceso"""
+    if workers > 1 and not os.getenv("METRICS_MULTIPROC_DIR"):
+        os.environ["METRICS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="eventos-metrics-")
+    directory = os.getenv("METRICS_MULTIPROC_DIR")
+    if directory and os.path.isdir(directory):
+        # Descartar los archivos de una ejecución anterior
+        for name in os.listdir(directory):
+            if name.startswith("metrics_"):
+                os.remove(os.path.join(directory, name))
+
+def prepare_caches(workers: int) -> None:
+    """Con varios workers los caches en memoria usan un TTL corto (cada proceso invalida solo el suyo)"""
+    if workers > 1:
+        os.environ.setdefault("USER_CACHE_TTL_SECONDS", MULTI_WORKER_USER_CACHE_TTL)
+        os.environ.setdefault("CACHE_TTL_SECONDS", MULTI_WORKER_CACHE_TTL)
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=LOG_LEVEL.upper(), format="%(levelname)s:     %(message)s")
+    
+    if args.reload:
+        # Configuración para desarrollo
+        uvicorn.run(
+            APP_IMPORT_STRING,
+            host=args.host,
+            port=args.port,
+            reload=True,  # Recarga automática durante desarrollo
+            log_level=LOG_LEVEL
+        )
+        return
+    
+    workers = resolve_workers(args.workers)
+    prepare_metrics_dir(workers)
+    prepare_caches(workers)
+    app = self_check()
+    if args.check:
+        logger.info("Verificación de inicio correcta")
+        return
+    
+    loop, http = event_loop_implementation(), http_implementation()
+    logger.info("Iniciando %s workers (loop: %s, http: %s)", workers, loop, http)
     uvicorn.run(
-        "app.main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,  # Recarga automática durante desarrollo
-        log_level="info"
-    )
\ No newline at end of file
+        # Con un solo worker se usa la aplicación ya cargada; con varios cada
+        # proceso la importa de nuevo (las migraciones ya están aplicadas)
+        app if workers == 1 else APP_IMPORT_STRING,
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        loop=loop,
+        http=http,
+        backlog=SERVER_BACKLOG,
+        timeout_keep_alive=SERVER_KEEPALIVE,
+        limit_concurrency=int(SERVER_LIMIT_CONCURRENCY) if SERVER_LIMIT_CONCURRENCY else None,
+        timeout_graceful_shutdown=SERVER_GRACEFUL_TIMEOUT,
+        log_level=LOG_LEVEL,
+        access_log=SERVER_ACCESS_LOG
+    )
+
+if __name__ == "__main__":
+    main()
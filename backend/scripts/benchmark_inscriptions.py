@@ -0,0 +1,157 @@
+# scripts/benchmark_inscriptions.py
+"""
+Prueba de estrés de inscripciones concurrentes.
+
+Lanza miles de inscripciones simultáneas (desde varios hilos, cada uno con su
+propia sesión) contra un único evento y verifica que no haya sobreventa ni
+inscripciones duplicadas. Informa el throughput y la cantidad de pedidos
+rechazados por cada motivo.
+
+Uso (desde el directorio backend):
+    python scripts/benchmark_inscriptions.py --usuarios 2000 --cupos 500 --hilos 32
+
+Con --group-commit los pedidos se envían al escritor único de inscripciones
+(InscriptionWriter), que los confirma en lotes; --lote y --espera-ms ajustan
+el tamaño máximo del lote y la espera para completarlo.
+
+Por defecto usa una base SQLite temporal; con --database-url se puede apuntar
+a otra base (se crean tablas y datos de prueba en ella).
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Prueba de estrés de inscripciones concurrentes")
+    parser.add_argument("--usuarios", type=int, default=2000, help="Usuarios distintos que intentan inscribirse")
+    parser.add_argument("--cupos", type=int, default=500, help="Cupos del evento")
+    parser.add_argument("--hilos", type=int, default=32, help="Hilos concurrentes")
+    parser.add_argument("--reintentos", type=int, default=1, help="Pedidos por usuario (>1 prueba duplicados)")
+    parser.add_argument("--group-commit", action="store_true", help="Usar el escritor único con group commit")
+    parser.add_argument("--lote", type=int, default=128, help="Tamaño máximo del lote (con --group-commit)")
+    parser.add_argument("--espera-ms", type=float, default=2, help="Espera máxima para completar un lote (con --group-commit)")
+    parser.add_argument("--database-url", default=None, help="URL de la base (por defecto SQLite temporal)")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    
+    # La URL debe definirse antes de importar app.database
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        db_path = os.path.join(tempfile.mkdtemp(), "benchmark_inscripciones.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    
+    from sqlalchemy import func
+    from app.database import SessionLocal, AsyncSessionLocal, engine
+    from app.migrations import run_migrations
+    from app.models import User, UserRole, Category, Event, Inscription
+    from app.services.inscription_service import InscriptionService, InscriptionError
+    from app.services.inscription_writer import InscriptionWriter
+    
+    run_migrations(engine)
+    
+    # Datos de prueba: una categoría, un evento y los usuarios
+    db = SessionLocal()
+    category = Category(nombre="Benchmark")
+    db.add(category)
+    db.flush()
+    event = Event(
+        nombre="Lanzamiento de entradas",
+        fecha_inicio=date.today() + timedelta(days=30),
+        fecha_fin=date.today() + timedelta(days=31),
+        lugar="Estadio",
+        cupos=args.cupos,
+        categoria_id=category.id
+    )
+    db.add(event)
+    prefix = f"bench{int(time.time())}"
+    users = [
+        User(nombre=f"Usuario {i}", email=f"{prefix}_{i}@example.com", contraseña="x", rol=UserRole.CLIENTE)
+        for i in range(args.usuarios)
+    ]
+    db.add_all(users)
+    db.commit()
+    event_id = event.id
+    user_ids = [user.id for user in users] * args.reintentos
+    db.close()
+    
+    def register(user_id: int) -> str:
+        session = SessionLocal()
+        try:
+            InscriptionService.reserve_seat(session, event_id, user_id)
+            return "ok"
+        except InscriptionError as exc:
+            return exc.reason
+        except Exception as exc:
+            return f"error: {type(exc).__name__}"
+        finally:
+            session.close()
+    
+    async def register_group_commit() -> Counter:
+        # Los pedidos concurrentes se encolan en el escritor, que los confirma en lotes
+        writer = InscriptionWriter(enabled=True, max_batch_size=args.lote, max_wait_ms=args.espera_ms)
+        await writer.start()
+        
+        async def register_one(user_id: int) -> str:
+            try:
+                # Con el escritor en marcha la sesión no llega a usarse
+                async with AsyncSessionLocal() as session:
+                    await writer.reserve_seat(session, event_id, user_id)
+                return "ok"
+            except InscriptionError as exc:
+                return exc.reason
+            except Exception as exc:
+                return f"error: {type(exc).__name__}"
+        
+        outcomes = Counter(await asyncio.gather(*(register_one(user_id) for user_id in user_ids)))
+        await writer.stop()
+        stats = writer.stats()
+        print(f"Lotes: {stats['batches']} | promedio: {stats['average_batch']} | máximo: {stats['largest_batch']}")
+        return outcomes
+    
+    start = time.perf_counter()
+    if args.group_commit:
+        results = asyncio.run(register_group_commit())
+    else:
+        with ThreadPoolExecutor(max_workers=args.hilos) as pool:
+            results = Counter(pool.map(register, user_ids))
+    elapsed = time.perf_counter() - start
+    
+    # Verificaciones: sin sobreventa, sin duplicados y contador consistente
+    db = SessionLocal()
+    inscriptions = db.query(func.count(Inscription.id)).filter(Inscription.evento_id == event_id).scalar()
+    distinct_users = db.query(func.count(func.distinct(Inscription.usuario_id))).filter(
+        Inscription.evento_id == event_id
+    ).scalar()
+    counter = db.query(Event.inscripciones_count).filter(Event.id == event_id).scalar()
+    db.close()
+    
+    total = len(user_ids)
+    mode = f"group commit (lote {args.lote})" if args.group_commit else f"hilos: {args.hilos}"
+    print(f"Pedidos: {total} | {mode} | cupos: {args.cupos}")
+    print(f"Tiempo: {elapsed:.2f} s | throughput: {total / elapsed:.0f} pedidos/s")
+    for reason, count in sorted(results.items()):
+        print(f"  {reason}: {count}")
+    print(f"Inscripciones: {inscriptions} | usuarios distintos: {distinct_users} | contador: {counter}")
+    
+    expected = min(args.cupos, args.usuarios)
+    assert inscriptions <= args.cupos, f"Sobreventa: {inscriptions} inscripciones para {args.cupos} cupos"
+    assert inscriptions == distinct_users, "Hay inscripciones duplicadas"
+    assert counter == inscriptions, f"Contador inconsistente: {counter} != {inscriptions}"
+    assert results["ok"] == inscriptions, "Las inscripciones confirmadas no coinciden con las guardadas"
+    if not any(reason.startswith("error") for reason in results):
+        assert inscriptions == expected, f"Se esperaban {expected} inscripciones y hay {inscriptions}"
+    print("OK: sin sobreventa ni duplicados")
+
+if __name__ == "__main__":
+    main()
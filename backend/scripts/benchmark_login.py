@@ -0,0 +1,120 @@
+# scripts/benchmark_login.py
+"""
+Benchmark de throughput de login con distintos niveles de concurrencia.
+
+Levanta la aplicación en memoria (sin servidor HTTP) sobre una base SQLite
+temporal, registra un usuario y lanza logins concurrentes contra /auth/login.
+Mientras tanto mide la latencia de un endpoint trivial (/ping) para verificar
+que bcrypt no bloquea el event loop. Informa throughput, latencias p50/p95 y
+cuántos pedidos fueron rechazados con 503 por saturación del pool.
+
+Uso (desde el directorio backend):
+    python scripts/benchmark_login.py --logins 200 --concurrencia 1 8 32 128
+
+El costo de bcrypt y el tamaño del pool se toman de BCRYPT_ROUNDS,
+PASSWORD_HASH_WORKERS y PASSWORD_HASH_QUEUE_SIZE.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark de throughput de login")
+    parser.add_argument("--logins", type=int, default=200, help="Logins por nivel de concurrencia")
+    parser.add_argument("--concurrencia", type=int, nargs="+", default=[1, 8, 32, 128], help="Niveles de concurrencia")
+    return parser.parse_args()
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+async def run_level(client, total: int, concurrency: int):
+    credentials = {"email": "benchmark@example.com", "contraseña": "benchmark"}
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    statuses = Counter()
+    ping_latencies = []
+    done = asyncio.Event()
+    
+    async def login():
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post("/auth/login", json=credentials)
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] += 1
+    
+    async def ping():
+        # Sondeo del event loop mientras corren los logins
+        while not done.is_set():
+            start = time.perf_counter()
+            await client.get("/ping")
+            ping_latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(0.01)
+    
+    pinger = asyncio.create_task(ping())
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await pinger
+    
+    print(
+        f"concurrencia {concurrency:>4} | {total / elapsed:7.1f} logins/s | "
+        f"p50 {percentile(latencies, 0.5) * 1000:7.1f} ms | p95 {percentile(latencies, 0.95) * 1000:7.1f} ms | "
+        f"ping p95 {percentile(ping_latencies, 0.95) * 1000:6.1f} ms | "
+        f"estados {dict(sorted(statuses.items()))}"
+    )
+
+async def main():
+    args = parse_args()
+    
+    # La URL debe definirse antes de importar app.database
+    db_path = os.path.join(tempfile.mkdtemp(), "benchmark_login.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    
+    import httpx
+    from fastapi import FastAPI
+    from app.database import engine, async_engine
+    from app.migrations import run_migrations
+    from app.routers import auth
+    from app.utils.password_hashing import password_hasher
+    from app.utils.security import BCRYPT_ROUNDS
+    
+    run_migrations(engine)
+    
+    app = FastAPI()
+    app.include_router(auth.router, prefix="/auth")
+    
+    @app.get("/ping")
+    async def ping():
+        return {"status": "ok"}
+    
+    pool = password_hasher.stats()
+    print(f"bcrypt rounds: {BCRYPT_ROUNDS} | hilos: {pool['workers']} | capacidad: {pool['capacity']}")
+    
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        response = await client.post("/auth/register", json={
+            "nombre": "Benchmark",
+            "email": "benchmark@example.com",
+            "contraseña": "benchmark"
+        })
+        response.raise_for_status()
+        
+        for concurrency in args.concurrencia:
+            await run_level(client, args.logins, concurrency)
+    
+    password_hasher.shutdown()
+    await async_engine.dispose()
+    print(f"Rechazados por saturación: {password_hasher.rejected}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,170 @@
+# scripts/benchmark_serialization.py
+"""
+Costo de serialización de las páginas de eventos.
+
+Arma una página de N eventos (por defecto 1000) a partir de filas como las que
+devuelve EventService.get_event_listing (todos los campos) y compara:
+
+- antes: EventListResponse(...) validado, response_model de FastAPI (que
+  vuelve a validar y convierte a dict) y JSONResponse con el json estándar
+- TypeAdapter: una sola validación y el serializador precompilado de
+  pydantic (dump_json), devuelto como Response
+- después: dicts armados desde las filas y dumps_json (orjson si está
+  instalado), devuelto como Response; es lo que usan las rutas de listados
+- ?fields=: lo mismo con solo id, nombre, fecha_inicio y cupos_disponibles
+
+Se mide la función de la ruta más la codificación, y también el pedido
+completo a través de la aplicación ASGI (sin base de datos ni red).
+
+Uso (desde el directorio backend):
+    python scripts/benchmark_serialization.py --eventos 1000 --repeticiones 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+from datetime import date, timedelta
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Costo de serialización de las páginas de eventos")
+    parser.add_argument("--eventos", type=int, default=1000, help="Eventos por página")
+    parser.add_argument("--repeticiones", type=int, default=50, help="Repeticiones de cada medición")
+    return parser.parse_args()
+
+def build_rows(count: int, fields):
+    """Filas con la forma de get_event_listing: una columna por campo, con su nombre"""
+    today = date.today()
+    Row = namedtuple("Row", fields)
+    rows = []
+    for i in range(count):
+        rows.append(Row(
+            id=i + 1,
+            nombre=f"Evento número {i}",
+            descripcion="Descripción del evento con algo de texto para que el cuerpo tenga un tamaño realista",
+            fecha_inicio=today + timedelta(days=i % 90),
+            fecha_fin=today + timedelta(days=i % 90 + 1),
+            lugar="Centro de convenciones",
+            cupos=100,
+            categoria_id=i % 7 + 1,
+            categoria_nombre="Música",
+            cupos_disponibles=100 - i % 100,
+            total_inscripciones=i % 100
+        ))
+    return rows
+
+def measure(function, repetitions: int) -> float:
+    """Mejor tiempo (segundos) de `repetitions` ejecuciones"""
+    best = float("inf")
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    args = parse_args()
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    
+    import httpx
+    from fastapi import FastAPI
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_response_field
+    from pydantic import TypeAdapter
+    from app.schemas import EventListResponse, EventListPage, EVENT_LIST_FIELDS
+    from app.utils.fields import projection, sparse_items, sparse_page_json
+    from app.utils.serialization import DefaultJSONResponse, json_bytes_response
+    
+    rows = build_rows(args.eventos, EVENT_LIST_FIELDS)
+    # Filas de un pedido con ?fields=id,nombre,fecha_inicio,cupos_disponibles
+    sparse_fields = ("id", "nombre", "fecha_inicio", "cupos_disponibles")
+    sparse_columns = projection(sparse_fields, ("fecha_inicio", "id"))
+    sparse_rows = [tuple(getattr(row, name) for name in sparse_columns) for row in rows]
+    response_field = create_response_field(name="benchmark", type_=EventListPage)
+    page_adapter = TypeAdapter(EventListPage)
+    loop = asyncio.new_event_loop()
+    
+    def build_validated_page():
+        # Construcción anterior: cada elemento se validaba al crearlo
+        return EventListPage(items=[
+            EventListResponse(
+                id=row.id,
+                nombre=row.nombre,
+                descripcion=row.descripcion,
+                fecha_inicio=row.fecha_inicio,
+                fecha_fin=row.fecha_fin,
+                lugar=row.lugar,
+                cupos=row.cupos,
+                categoria_id=row.categoria_id,
+                categoria_nombre=row.categoria_nombre,
+                cupos_disponibles=row.cupos_disponibles,
+                total_inscripciones=row.total_inscripciones
+            )
+            for row in rows
+        ], next_cursor=None)
+    
+    def before():
+        content = loop.run_until_complete(
+            serialize_response(field=response_field, response_content=build_validated_page())
+        )
+        return JSONResponse(content).body
+    
+    def type_adapter():
+        page = page_adapter.validate_python({
+            "items": sparse_items(rows, EVENT_LIST_FIELDS),
+            "next_cursor": None
+        })
+        return json_bytes_response(page_adapter.dump_json(page)).body
+    
+    def after():
+        return json_bytes_response(sparse_page_json(rows, EVENT_LIST_FIELDS, None)).body
+    
+    def sparse():
+        return json_bytes_response(sparse_page_json(sparse_rows, sparse_fields, None)).body
+    
+    variants = (("antes", before), ("TypeAdapter", type_adapter), ("después", after))
+    bodies = [json.loads(function()) for _, function in variants]
+    assert all(body == bodies[0] for body in bodies), "Todas las variantes deben devolver el mismo JSON"
+    
+    print(f"Página de {args.eventos} eventos | respuesta por defecto: {DefaultJSONResponse.__name__}")
+    results = {}
+    for name, function in variants + (("?fields=", sparse),):
+        elapsed = measure(function, args.repeticiones)
+        results[name] = elapsed
+        print(f"  {name:<11} construcción + serialización: {elapsed * 1000:8.2f} ms | {elapsed / args.eventos * 1e6:6.2f} µs por evento | {len(function()) / 1024:7.1f} KiB")
+    
+    # Pedido completo a través de FastAPI
+    app = FastAPI(default_response_class=DefaultJSONResponse)
+    
+    @app.get("/antes", response_model=EventListPage, response_class=JSONResponse)
+    async def page_before():
+        return build_validated_page()
+    
+    @app.get("/despues", response_model=EventListPage)
+    async def page_after():
+        return json_bytes_response(sparse_page_json(rows, EVENT_LIST_FIELDS, None))
+    
+    async def measure_requests():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            before_body = (await client.get("/antes")).json()
+            after_body = (await client.get("/despues")).json()
+            assert before_body == after_body, "Las dos rutas deben devolver el mismo JSON"
+            for name, path in (("antes", "/antes"), ("después", "/despues")):
+                best = float("inf")
+                for _ in range(args.repeticiones):
+                    start = time.perf_counter()
+                    response = await client.get(path)
+                    best = min(best, time.perf_counter() - start)
+                    response.raise_for_status()
+                print(f"  {name:<11} pedido completo:              {best * 1000:8.2f} ms | {best / args.eventos * 1e6:6.2f} µs por evento")
+    
+    loop.close()
+    asyncio.run(measure_requests())
+    print(f"Mejora en construcción + serialización: {results['antes'] / results['después']:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+# scripts/check_inscriptions.py
+"""
+Verificación automática de las inscripciones concurrentes.
+
+Envía una ráfaga de POST /inscriptions/ simultáneos a la aplicación completa
+(autenticación, dependencias y pool de conexiones incluidos) contra un evento
+con pocos cupos, primero con el camino directo y después con el escritor
+único (group commit). Cada usuario pide su inscripción más de una vez.
+Verifica en cada modo:
+- sin sobreventa: las inscripciones guardadas no superan los cupos
+- sin duplicados: un usuario aparece una sola vez y los pedidos repetidos reciben 409
+- el contador inscripciones_count coincide con COUNT(*) de las inscripciones
+- ningún pedido termina con un error del servidor (5xx)
+Termina con código 1 si alguna verificación falla.
+
+Uso (desde el directorio backend):
+    python scripts/check_inscriptions.py
+    python scripts/check_inscriptions.py --usuarios 40 --cupos 3 --reintentos 2
+
+Usa una base SQLite temporal y no necesita preparación previa.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from collections import Counter
+from datetime import date, timedelta
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Verificación de inscripciones concurrentes")
+    parser.add_argument("--usuarios", type=int, default=20, help="Usuarios distintos que intentan inscribirse")
+    parser.add_argument("--cupos", type=int, default=3, help="Cupos del evento")
+    parser.add_argument("--reintentos", type=int, default=2, help="Pedidos simultáneos por usuario")
+    parser.add_argument("--timeout", type=float, default=60, help="Segundos máximos por modo")
+    return parser.parse_args()
+
+async def post(app, path: str, body: dict, token: str) -> int:
+    """Enviar un POST a la aplicación ASGI y devolver el código de estado"""
+    payload = json.dumps(body).encode()
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"host", b"testserver"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(payload)).encode()),
+            (b"authorization", f"Bearer {token}".encode()),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    messages = [{"type": "http.request", "body": payload, "more_body": False}]
+    status_code = 500
+    
+    async def receive():
+        if messages:
+            return messages.pop()
+        # Sin más cuerpo: esperar como lo haría una conexión abierta
+        await asyncio.Event().wait()
+    
+    async def send(message):
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+    
+    try:
+        await app(scope, receive, send)
+    except Exception:
+        # Los errores no manejados llegan hasta acá (el servidor respondería 500)
+        return 500
+    return status_code
+
+def main():
+    args = parse_args()
+    
+    # La URL debe definirse antes de importar app.database
+    db_path = os.path.join(tempfile.mkdtemp(), "check_inscripciones.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    # Con el pool agotado el pedido falla en segundos en lugar de esperar 30
+    os.environ.setdefault("DB_POOL_TIMEOUT", "5")
+    
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    
+    from sqlalchemy import func
+    from app.main import app
+    from app.database import SessionLocal, async_engine
+    from app.models import User, UserRole, Category, Event, Inscription
+    from app.services.inscription_writer import inscription_writer
+    from app.utils.security import create_access_token
+    
+    db = SessionLocal()
+    category = Category(nombre="Verificación")
+    db.add(category)
+    db.flush()
+    category_id = category.id
+    db.commit()
+    db.close()
+    
+    def prepare(mode: str):
+        """Evento y usuarios propios de cada modo (usuarios nuevos: el cache de usuarios empieza vacío)"""
+        db = SessionLocal()
+        event = Event(
+            nombre=f"Lanzamiento ({mode})",
+            fecha_inicio=date.today() + timedelta(days=30),
+            fecha_fin=date.today() + timedelta(days=31),
+            lugar="Estadio",
+            cupos=args.cupos,
+            categoria_id=category_id
+        )
+        db.add(event)
+        users = [
+            User(nombre=f"Usuario {i}", email=f"{mode}_{i}@example.com", contraseña="x", rol=UserRole.CLIENTE)
+            for i in range(args.usuarios)
+        ]
+        db.add_all(users)
+        db.commit()
+        tokens = {
+            user.id: create_access_token({"sub": user.email, "role": user.rol.value, "user_id": user.id, "tv": 0})
+            for user in users
+        }
+        event_id = event.id
+        db.close()
+        return event_id, tokens
+    
+    async def burst(event_id: int, tokens: dict) -> Counter:
+        requests = [
+            post(app, "/inscriptions/", {"evento_id": event_id}, token)
+            for token in tokens.values()
+            for _ in range(args.reintentos)
+        ]
+        return Counter(await asyncio.wait_for(asyncio.gather(*requests), args.timeout))
+    
+    async def run_modes() -> list:
+        # Un solo event loop: las conexiones del pool asíncrono quedan ligadas a él
+        results = []
+        for mode, group_commit in (("directo", False), ("group_commit", True)):
+            event_id, tokens = prepare(mode)
+            inscription_writer.enabled = group_commit
+            await inscription_writer.start()
+            try:
+                statuses = await burst(event_id, tokens)
+            except asyncio.TimeoutError:
+                statuses = None
+            finally:
+                await inscription_writer.stop()
+            results.append((mode, event_id, statuses))
+        # Cerrar las conexiones de aiosqlite (cada una tiene su hilo)
+        await async_engine.dispose()
+        return results
+    
+    failures = []
+    for mode, event_id, statuses in asyncio.run(run_modes()):
+        if statuses is None:
+            failures.append(f"{mode}: los pedidos no terminaron en {args.timeout} s")
+            continue
+        
+        db = SessionLocal()
+        inscriptions = db.query(func.count(Inscription.id)).filter(Inscription.evento_id == event_id).scalar()
+        distinct_users = db.query(func.count(func.distinct(Inscription.usuario_id))).filter(
+            Inscription.evento_id == event_id
+        ).scalar()
+        counter = db.query(Event.inscripciones_count).filter(Event.id == event_id).scalar()
+        db.close()
+        
+        summary = ", ".join(f"{count}×{code}" for code, count in sorted(statuses.items()))
+        print(f"{mode}: {summary} | inscripciones: {inscriptions} | contador: {counter}")
+        
+        expected = min(args.cupos, args.usuarios)
+        checks = [
+            (not any(code >= 500 for code in statuses), "hubo errores del servidor"),
+            (set(statuses) <= {201, 409}, f"códigos inesperados: {sorted(statuses)}"),
+            (inscriptions <= args.cupos, f"sobreventa: {inscriptions} inscripciones para {args.cupos} cupos"),
+            (inscriptions == distinct_users, "hay inscripciones duplicadas"),
+            (counter == inscriptions, f"contador inconsistente: {counter} != {inscriptions}"),
+            (statuses[201] == inscriptions, "las respuestas 201 no coinciden con las inscripciones guardadas"),
+            (inscriptions == expected, f"se esperaban {expected} inscripciones y hay {inscriptions}"),
+        ]
+        failures += [f"{mode}: {message}" for ok, message in checks if not ok]
+    
+    if failures:
+        for failure in failures:
+            print(f"FALLA {failure}")
+        sys.exit(1)
+    print("OK: sin sobreventa, duplicados ni errores del servidor")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+# scripts/explain_queries.py
+"""
+Muestra el plan de ejecución de las consultas de los services.
+
+Ejecuta cada método de EventService, InscriptionService, CategoryService y
+UserService con argumentos de ejemplo, captura las sentencias SQL que emiten y
+las vuelve a enviar con EXPLAIN QUERY PLAN (SQLite) o EXPLAIN (otros motores).
+Los recorridos completos de tabla se marcan con "!!" para que una regresión
+de índices sea visible; con --fallar-si-recorre el script termina con error.
+
+Uso (desde el directorio backend):
+    python scripts/explain_queries.py
+    python scripts/explain_queries.py --database-url sqlite:///./eventos.db
+
+Por defecto usa una base SQLite temporal con las migraciones aplicadas.
+Las escrituras se ejecutan dentro de una transacción que se descarta.
+"""
+import argparse
+import os
+import sys
+import tempfile
+from datetime import date
+
+# Recorridos completos esperados: (consulta, detalle del plan)
+EXPECTED_SCANS = {
+    # Primera página: recorre la clave primaria en orden y corta con LIMIT
+    ("CategoryService.get_categories_page (sin conteos)", "SCAN categorias"),
+    # El registro de categorías carga la tabla completa (solo cuando cambia su versión)
+    ("CategoryRegistry (carga)", "SCAN categorias"),
+    # Tabla de resumen con unas pocas claves fijas: se lee completa
+    ("StatsService.get_summary", "SCAN contadores_resumen"),
+}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Planes de ejecución de las consultas de los services")
+    parser.add_argument("--database-url", default=None, help="URL de la base (por defecto SQLite temporal)")
+    parser.add_argument("--fallar-si-recorre", action="store_true", help="Terminar con error si alguna consulta recorre una tabla completa")
+    return parser.parse_args()
+
+def build_cases():
+    from app.services import EventService, CategoryService, InscriptionService, StatsService
+    from app.services.users_service import UserService
+    from app.services.auth_service import AuthService
+    from app.services.category_registry import category_registry
+    from app.utils.pagination import encode_cursor
+    
+    today = date.today()
+    return [
+        ("EventService.get_event_listing", lambda db: EventService.get_event_listing(db, 20)),
+        ("EventService.get_event_listing (cursor)", lambda db: EventService.get_event_listing(db, 20, encode_cursor([today, 1]))),
+        ("EventService.get_event_listing (categoría)", lambda db: EventService.get_event_listing(db, 20, category_id=1)),
+        ("EventService.get_event_listing (activos)", lambda db: EventService.get_event_listing(db, 20, only_active=True)),
+        ("EventService.search_events", lambda db: EventService.search_events(db, "concierto", 20)),
+        ("EventService.get_event_by_id", lambda db: EventService.get_event_by_id(db, 1)),
+        ("EventService.get_event_version", lambda db: EventService.get_event_version(db, 1)),
+        ("EventService.get_event_available_spots", lambda db: EventService.get_event_available_spots(db, 1)),
+        ("EventService.get_available_events", lambda db: EventService.get_available_events(db)),
+        ("EventService.get_events_by_category", lambda db: EventService.get_events_by_category(db, 1)),
+        ("EventService.get_event_with_most_inscriptions", lambda db: EventService.get_event_with_most_inscriptions(db)),
+        ("EventService.adjust_inscription_count", lambda db: EventService.adjust_inscription_count(db, 1, 1)),
+        ("InscriptionService._reserve_seat", lambda db: InscriptionService._reserve_seat(db, 1, 1)),
+        ("InscriptionService._is_registered", lambda db: InscriptionService._is_registered(db, 1, 1)),
+        ("InscriptionService.get_event_inscriptions", lambda db: InscriptionService.get_event_inscriptions(db, 1)),
+        ("InscriptionService.get_event_attendees_page", lambda db: InscriptionService.get_event_attendees_page(db, 1, 20)),
+        ("InscriptionService.get_event_attendees_page (cursor)", lambda db: InscriptionService.get_event_attendees_page(db, 1, 20, encode_cursor([1]))),
+        ("InscriptionService.get_user_active_inscriptions", lambda db: InscriptionService.get_user_active_inscriptions(db, 1)),
+        ("InscriptionService.get_user_inscription_history", lambda db: InscriptionService.get_user_inscription_history(db, 1)),
+        ("InscriptionService.get_total_active_inscriptions_count", lambda db: InscriptionService.get_total_active_inscriptions_count(db)),
+        ("CategoryService.get_categories_page", lambda db: CategoryService.get_categories_page(db, 20)),
+        ("CategoryService.get_categories_page (sin conteos)", lambda db: CategoryService.get_categories_page(db, 20, fields=("id", "nombre"))),
+        ("CategoryService.get_category_summary", lambda db: CategoryService.get_category_summary(db, 1)),
+        ("CategoryService.get_category_events_page", lambda db: CategoryService.get_category_events_page(db, 1, 20)),
+        ("CategoryService.get_category_events_page (cursor)", lambda db: CategoryService.get_category_events_page(db, 1, 20, encode_cursor([date.today(), 1]))),
+        ("CategoryRegistry (carga)", lambda db: (category_registry.invalidate(), category_registry.all(db))),
+        ("CategoryRegistry (verificación de versión)", lambda db: category_registry.refresh(db)),
+        ("CategoryService.get_category_events", lambda db: CategoryService.get_category_events(db, 1)),
+        ("UserService.get_user_active_inscriptions", lambda db: UserService.get_user_active_inscriptions(db, 1)),
+        ("UserService.get_user_inscriptions_history", lambda db: UserService.get_user_inscriptions_history(db, 1)),
+        ("UserService.get_user_inscriptions_history (cursor)", lambda db: UserService.get_user_inscriptions_history(db, 1, 20, encode_cursor([date.today(), 1_000_000]))),
+        ("UserService.get_user_inscriptions_history (estado)", lambda db: UserService.get_user_inscriptions_history(db, 1, 20, estado="finalizado")),
+        ("UserService.get_user_active_inscription_count", lambda db: UserService.get_user_active_inscription_count(db, 1)),
+        ("StatsService.get_summary", lambda db: StatsService.get_summary(db)),
+        ("StatsService.record_inscription", lambda db: StatsService.record_inscription(db, 1, 1, True)),
+        ("AuthService.get_user_by_email", lambda db: AuthService.get_user_by_email(db, "admin@example.com")),
+    ]
+
+def main():
+    args = parse_args()
+    
+    # La URL debe definirse antes de importar app.database
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        db_path = os.path.join(tempfile.mkdtemp(), "explain_queries.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    
+    from sqlalchemy import event
+    from app.database import SessionLocal, engine, Base
+    from app.migrations import run_migrations
+    
+    run_migrations(engine)
+    is_sqlite = engine.dialect.name == "sqlite"
+    explain_prefix = "EXPLAIN QUERY PLAN " if is_sqlite else "EXPLAIN "
+    app_tables = set(Base.metadata.tables)
+    
+    # Capturar las sentencias que emite cada método
+    captured = []
+    
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith(("EXPLAIN", "PRAGMA")):
+            captured.append((statement, parameters))
+    
+    event.listen(engine, "before_cursor_execute", capture)
+    
+    full_scans = []
+    for name, call in build_cases():
+        captured.clear()
+        db = SessionLocal()
+        try:
+            print(f"\n=== {name}")
+            db.begin()
+            try:
+                call(db)
+            except Exception as exc:
+                # Los errores de negocio (evento inexistente, etc.) no impiden ver el plan
+                print(f"  ({type(exc).__name__})")
+            statements = list(captured)
+            
+            for statement, parameters in statements:
+                print("  " + " ".join(statement.split())[:160])
+                plan = db.connection().exec_driver_sql(explain_prefix + statement, parameters).fetchall()
+                for row in plan:
+                    detail = row[-1] if is_sqlite else row[0]
+                    # SQLite: "SCAN tabla" sin índice es un recorrido completo de la tabla
+                    parts = detail.split()
+                    is_full_scan = (
+                        is_sqlite and parts[0] == "SCAN" and parts[1] in app_tables
+                        and " USING " not in detail and (name, detail) not in EXPECTED_SCANS
+                    )
+                    if is_full_scan:
+                        full_scans.append((name, detail))
+                    print(f"    {'!!' if is_full_scan else '  '} {detail}")
+        finally:
+            db.rollback()
+            db.close()
+    
+    event.remove(engine, "before_cursor_execute", capture)
+    
+    print(f"\nRecorridos completos de tabla: {len(full_scans)}")
+    for name, detail in full_scans:
+        print(f"  {name}: {detail}")
+    if args.fallar_si_recorre and full_scans:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
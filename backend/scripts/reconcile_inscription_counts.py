@@ -0,0 +1,31 @@
+# scripts/reconcile_inscription_counts.py
+"""
+Recalcula el contador de inscripciones (eventos.inscripciones_count) de todos
+los eventos a partir de la tabla de inscripciones, y después los agregados
+del dashboard (contadores_resumen y resumen_categorias).
+
+Uso (desde el directorio backend):
+    python scripts/reconcile_inscription_counts.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.services.event_service import EventService
+from app.services.stats_service import StatsService
+
+def main():
+    db = SessionLocal()
+    try:
+        corrected = EventService.reconcile_inscription_counts(db)
+        stats_corrected = StatsService.reconcile(db)
+    finally:
+        db.close()
+    
+    print(f"Contadores de inscripciones corregidos: {corrected} evento(s)")
+    print(f"Agregados del dashboard corregidos: {stats_corrected}")
+
+if __name__ == "__main__":
+    main()